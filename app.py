@@ -1,17 +1,13 @@
 import streamlit as st
 import pandas as pd
-import xgboost as xgb
 import altair as alt
 from datetime import datetime, timedelta
 import os
 import sys
 import subprocess
-import time
-import requests
-import json
-from nba_api.stats.static import teams
+from concurrent.futures import ThreadPoolExecutor
 from nba_api.stats.endpoints import scoreboardv2, leaguestandingsv3, leaguegamefinder
-from src import train_nba
+from src import predictor, prediction_cache, nba_cache, supabase_client, teams_registry, history_store, cloud_history, vote_queue
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(page_title="NBA | AGENT PREDiKTOR", page_icon="🏀", layout="wide")
@@ -86,6 +82,7 @@ st.markdown("""
 
 # --- 2. SESSIONS ---
 if 'schedule_data' not in st.session_state: st.session_state['schedule_data'] = {}
+if 'schedule_errors' not in st.session_state: st.session_state['schedule_errors'] = []
 if 'edit_modes' not in st.session_state: st.session_state['edit_modes'] = {}
 
 DATA_DIR = "data"
@@ -104,58 +101,75 @@ REASONS_LIST = [
 
 # --- 3. FONCTIONS ---
 
-@st.cache_data(ttl=60)
+@st.cache_resource
+def get_supabase():
+    """Client REST Supabase unique (session poolée, keep-alive) pour toute l'app"""
+    return supabase_client.SupabaseClient(SUPABASE_URL, SUPABASE_KEY)
+
+@st.cache_resource
+def get_cloud_history():
+    """Copie locale de bets_history (colonnes des onglets MATCHS et STATS), rafraîchie par delta"""
+    return cloud_history.CloudHistory(get_supabase(), cloud_history.APP_COLUMNS)
+
+@st.cache_resource(max_entries=1)
+def build_history_store(version):
+    """Index reconstruit seulement quand la copie locale a changé"""
+    return history_store.HistoryStore(get_cloud_history().frame())
+
+@st.cache_resource(ttl=60)
+def refresh_cloud_history():
+    """Delta Cloud au plus une fois par minute : seules les lignes modifiées sont téléchargées.
+
+    Si le cloud ne répond pas, on garde la dernière copie connue.
+    """
+    try: get_cloud_history().refresh()
+    except: pass
+    return True
+
+@st.cache_resource
+def get_vote_queue():
+    """Journal local des votes + envoi groupé en arrière-plan (write-behind)"""
+    return vote_queue.VoteQueue(get_supabase())
+
 def load_history_from_supabase():
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json"
-    }
-    url = f"{SUPABASE_URL}/rest/v1/bets_history?select=*"
+    """Historique Cloud indexé (HistoryStore), partagé en lecture seule entre les sessions.
+
+    Les écritures de l'app sont déjà dans la copie locale (write-through) : pas de rechargement.
+    Les votes encore dans la file sont réappliqués, un delta Cloud ne les efface pas avant l'envoi.
+    """
+    refresh_cloud_history()
+    cloud = get_cloud_history()
     try:
-        r = requests.get(url, headers=headers)
-        if r.status_code == 200:
-            data = r.json()
-            if not data: return pd.DataFrame()
-            df = pd.DataFrame(data)
-            if 'type' not in df.columns: df['type'] = 'Auto'
-            rename_map = {
-                'game_date': 'Date', 'home_team': 'Home', 'away_team': 'Away',
-                'predicted_winner': 'Predicted_Winner', 'confidence': 'Confidence',
-                'result_ia': 'Result', 'real_winner': 'Real_Winner',
-                'user_prediction': 'User_Prediction', 'user_result': 'User_Result',
-                'user_reason': 'User_Reason', 'type': 'Type'
-            }
-            df = df.rename(columns=rename_map)
-            return df
-        return pd.DataFrame()
-    except: return pd.DataFrame()
+        for v in get_vote_queue().pending():
+            cloud.apply_local((v['game_date'], v['home_team'], v['away_team']),
+                              {'user_prediction': v['user_prediction'], 'user_reason': v['user_reason']})
+    except: pass
+    return build_history_store(cloud.version)
 
 def save_user_vote_cloud(date_str, h_name, a_name, user_choice, reason, match_key):
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal"
-    }
-    url = f"{SUPABASE_URL}/rest/v1/bets_history?game_date=eq.{date_str}&home_team=eq.{h_name}&away_team=eq.{a_name}"
     payload = { "user_prediction": user_choice, "user_reason": reason }
     try:
-        r = requests.patch(url, headers=headers, json=payload)
-        if r.status_code in [200, 204]:
-            st.toast("Vote enregistré ☁️", icon="✅")
-            st.session_state['edit_modes'][match_key] = False
-            load_history_from_supabase.clear()
+        # Vote journalisé sur disque et visible tout de suite ; l'envoi groupé se fait en arrière-plan
+        get_vote_queue().enqueue(date_str, h_name, a_name, user_choice, reason)
+        get_cloud_history().apply_local((date_str, h_name, a_name), payload)
+        st.toast("Vote enregistré ☁️", icon="✅")
+        st.session_state['edit_modes'][match_key] = False
     except: pass
 
+@st.fragment(run_every=5)
+def show_vote_status():
+    """Indicateur de la file des votes (rafraîchi seul, toutes les 5s)"""
+    try: s = get_vote_queue().status()
+    except: return
+    if s['pending']:
+        retry = f" — nouvel essai dans {s['retry_in']}s" if s['retry_in'] is not None else ""
+        st.caption(f"⏳ {s['pending']} vote(s) en attente d'envoi{retry}")
+    elif s['flushed']:
+        st.caption(f"☁️ {s['flushed']} vote(s) envoyé(s)")
+    if s['dropped']:
+        st.caption(f"⚠️ {s['dropped']} vote(s) abandonné(s) : pari absent du cloud")
+
 def save_bet_manual_cloud(date, h_name, a_name, w_name, conf):
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal"
-    }
-    url = f"{SUPABASE_URL}/rest/v1/bets_history"
     payload = {
         "game_date": date,
         "home_team": h_name,
@@ -165,34 +179,28 @@ def save_bet_manual_cloud(date, h_name, a_name, w_name, conf):
         "type": "Manual"
     }
     try:
-        r = requests.post(url, headers=headers, json=payload)
-        if r.status_code in [200, 201, 204]:
-            st.toast("Match ajouté au Cloud ☁️", icon="✅")
-            load_history_from_supabase.clear() 
+        get_cloud_history().insert(payload)
+        st.toast("Match ajouté au Cloud ☁️", icon="✅")
     except: pass
 
-def get_teams_dict():
-    nba_teams = teams.get_teams()
-    return {t['id']: {'full': t['full_name'], 'code': t['abbreviation'], 'nick': t['nickname']} for t in nba_teams}
-
-TEAMS_DB = get_teams_dict()
-
 @st.cache_resource
 def load_resources():
-    model = xgb.XGBClassifier()
-    df = None
+    model, team_state = None, None
     try:
-        if os.path.exists(MODEL_FILE): model.load_model(MODEL_FILE)
-        if os.path.exists(GAMES_FILE):
-            df = pd.read_csv(GAMES_FILE)
-            df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+        model = predictor.load_model(MODEL_FILE)
+        team_state = predictor.load_team_state()
     except: pass
-    return model, df
+    return model, team_state
+
+@st.cache_resource
+def get_prediction_cache():
+    # Partagé entre sessions et reruns, persistant sur disque (data/predictions_cache.json)
+    return prediction_cache.PredictionCache()
 
 @st.cache_data(ttl=3600)
 def get_standings_db():
     try:
-        standings = leaguestandingsv3.LeagueStandingsV3()
+        standings = nba_cache.fetch(leaguestandingsv3.LeagueStandingsV3)
         df = standings.standings.get_data_frame()
         res = {}
         for _, row in df.iterrows():
@@ -214,47 +222,27 @@ def show_logo(team_id, width=50):
     else: st.write("🏀")
 
 def get_clean_name(name_input):
-    name_str = str(name_input)
-    parts = name_str.split(' ')
-    if len(parts) > 0:
-        code = parts[0]
-        for tid, info in TEAMS_DB.items():
-            if info['code'] == code: return info['full']
-    return name_str
+    # Nom complet canonique ("OKC Thunder" -> "Oklahoma City Thunder"), sinon inchangé
+    return teams_registry.full_name(name_input, default=str(name_input))
 
 def get_short_code(name_full):
-    for tid, info in TEAMS_DB.items():
-        if info['full'] == name_full: return info['code']
-    return str(name_full)[:3].upper()
-
-def get_prediction(model, df_history, h_id, a_id):
-    if df_history is None or model is None: return None, None
-    h_games = df_history[df_history['TEAM_ID'] == h_id].sort_values('GAME_DATE')
-    a_games = df_history[df_history['TEAM_ID'] == a_id].sort_values('GAME_DATE')
-    if h_games.empty or a_games.empty: return None, None
-    lh, la = h_games.iloc[-1], a_games.iloc[-1]
-    today = pd.to_datetime(datetime.now().strftime('%Y-%m-%d'))
-    rh, ra = (today - lh['GAME_DATE']).days, (today - la['GAME_DATE']).days
-    row = pd.DataFrame([{
-        'EFG_PCT_LAST_5_HOME': lh['EFG_PCT_LAST_5'], 'EFG_PCT_LAST_5_AWAY': la['EFG_PCT_LAST_5'],
-        'TOV_PCT_LAST_5_HOME': lh['TOV_PCT_LAST_5'], 'TOV_PCT_LAST_5_AWAY': la['TOV_PCT_LAST_5'],
-        'ORB_RAW_LAST_5_HOME': lh['ORB_RAW_LAST_5'], 'ORB_RAW_LAST_5_AWAY': la['ORB_RAW_LAST_5'],
-        'DIFF_EFG': lh['EFG_PCT_LAST_5'] - la['EFG_PCT_LAST_5'],
-        'DIFF_TOV': lh['TOV_PCT_LAST_5'] - la['TOV_PCT_LAST_5'],
-        'DIFF_ORB': lh['ORB_RAW_LAST_5'] - la['ORB_RAW_LAST_5'],
-        'DIFF_WIN': lh['WIN_LAST_5'] - la['WIN_LAST_5'],
-        'DIFF_REST': min(rh, 7) - min(ra, 7)
-    }])
-    return model.predict_proba(row)[0][1], {'rh': rh, 'ra': ra}
+    return teams_registry.code(name_full, default=str(name_full)[:3].upper())
+
+def get_predictions(model, team_state, matchups):
+    """Probabilités domicile pour une liste de (h_id, a_id) : un seul appel au modèle"""
+    if team_state is None or model is None or not matchups: return [None] * len(matchups)
+    today = datetime.now().strftime('%Y-%m-%d')
+    res = predictor.predict_slate(model, team_state, [(h, a, today) for h, a in matchups], cache=get_prediction_cache())
+    return [p if v else None for p, v in zip(res['PROB_HOME'], res['VALID'])]
+
+def get_prediction(model, team_state, h_id, a_id):
+    if team_state is None or model is None: return None, None
+    today = datetime.now().strftime('%Y-%m-%d')
+    res = predictor.predict_slate(model, team_state, [(h_id, a_id, today)], cache=get_prediction_cache()).iloc[0]
+    if not res['VALID']: return None, None
+    return res['PROB_HOME'], {'rh': int(res['REST_HOME']), 'ra': int(res['REST_AWAY'])}
 
 def save_bet_auto_cloud(date, h_name, a_name, w_name, conf):
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal"
-    }
-    url = f"{SUPABASE_URL}/rest/v1/bets_history"
     payload = {
         "game_date": date,
         "home_team": h_name,
@@ -264,8 +252,7 @@ def save_bet_auto_cloud(date, h_name, a_name, w_name, conf):
         "type": "Auto"
     }
     try:
-        requests.post(url, headers=headers, json=payload)
-        load_history_from_supabase.clear()
+        get_cloud_history().insert(payload)
     except: pass
 
 def get_last_mod(filepath):
@@ -276,106 +263,137 @@ def clean_id_hard(val):
     try: return str(int(float(val))).lstrip('0')
     except: return str(val).lstrip('0')
 
-# --- SCANNER V10.4 (SEEKER LOGIC) ---
+# --- SCANNER V11 (SEEKER LOGIC, sondes concurrentes) ---
+SCAN_DAYS = 5
+SCAN_WORKERS = 6
+
+def probe_past_day(target_date):
+    """Soirée passée : affiches + scores. Retourne le DataFrame si au moins un match est fini, sinon None.
+
+    Les erreurs d'API (budget, timeout, retries épuisés) remontent : ce n'est pas un jour sans match.
+    """
+    str_date = target_date.strftime('%Y-%m-%d')
+    finder_date = target_date.strftime('%m/%d/%Y')
+    # Squelette
+    board = nba_cache.fetch(scoreboardv2.ScoreboardV2, game_date=str_date)
+    raw = board.game_header.get_data_frame()
+    clean = raw.dropna(subset=['HOME_TEAM_ID', 'VISITOR_TEAM_ID'])
+    if clean.empty: return None
+
+    # Finder pour Scores
+    finder = nba_cache.fetch(leaguegamefinder.LeagueGameFinder,
+        date_from_nullable=finder_date, date_to_nullable=finder_date, league_id_nullable='00'
+    )
+    results = finder.get_data_frames()[0]
+
+    score_map = {}
+    if not results.empty:
+        for _, r in results.iterrows():
+            try:
+                gid = clean_id_hard(r['GAME_ID'])
+                tid = clean_id_hard(r['TEAM_ID'])
+                pts = int(r['PTS'])
+                score_map[f"{gid}_{tid}"] = pts
+            except: continue
+
+    def get_score(row, is_home):
+        try:
+            g_id = clean_id_hard(row['GAME_ID'])
+            t_id = clean_id_hard(row['HOME_TEAM_ID']) if is_home else clean_id_hard(row['VISITOR_TEAM_ID'])
+            return score_map.get(f"{g_id}_{t_id}", None)
+        except: return None
+
+    clean['PTS_HOME'] = clean.apply(lambda row: get_score(row, True), axis=1)
+    clean['PTS_AWAY'] = clean.apply(lambda row: get_score(row, False), axis=1)
+
+    def force_status(row):
+        if pd.notna(row['PTS_HOME']) and pd.notna(row['PTS_AWAY']): return 3
+        return row.get('GAME_STATUS_ID', 1)
+
+    clean['GAME_STATUS_ID'] = clean.apply(force_status, axis=1)
+
+    # Check si on a des résultats "finis" ou "avec scores"
+    has_finished = clean[clean['GAME_STATUS_ID'] == 3].shape[0] > 0
+    return clean if has_finished else None
+
+def probe_future_day(target_date):
+    """Soirée à venir : affiches du jour, ou None s'il n'y a pas de match (erreurs d'API : remontent)"""
+    board = nba_cache.fetch(scoreboardv2.ScoreboardV2, game_date=target_date.strftime('%Y-%m-%d'))
+    raw = board.game_header.get_data_frame()
+    clean = raw.dropna(subset=['HOME_TEAM_ID', 'VISITOR_TEAM_ID'])
+    if clean.empty: return None
+
+    # On prépare pour l'affichage
+    clean['PTS_HOME'] = None
+    clean['PTS_AWAY'] = None
+    clean['GAME_STATUS_ID'] = 1 # Futur
+    return clean
+
+def first_in_order(futures):
+    """(date, DataFrame, erreur) de la première sonde non vide dans l'ordre des dates.
+
+    Une sonde en erreur n'est pas un jour sans match : on s'arrête sur elle (DataFrame None)
+    au lieu de retomber sur une soirée plus ancienne. Les sondes suivantes non démarrées sont annulées.
+    """
+    for i, (str_date, fut) in enumerate(futures):
+        try: res, error = fut.result(), None
+        except Exception as e: res, error = None, e
+        if res is not None or error is not None:
+            for _, later in futures[i + 1:]: later.cancel()
+            return str_date, res, error
+    return None, None, None
+
 def scan_schedule():
-    found_days = {}
+    """({date: [DataFrames]}, erreurs) : soirées trouvées et sondes en échec à signaler"""
+    found_days, errors = {}, []
     
     # 1. Chargement Historique Cloud
     hist_data = load_history_from_supabase()
-    
-    # MISSION PASSÉ (Résultats)
-    target_date = datetime.now() - timedelta(days=1)
-    for _ in range(5): # Recule max 5 jours
-        str_date = target_date.strftime('%Y-%m-%d')
-        finder_date = target_date.strftime('%m/%d/%Y')
-        try:
-            # Squelette
-            board = scoreboardv2.ScoreboardV2(game_date=str_date)
-            raw = board.game_header.get_data_frame()
-            clean = raw.dropna(subset=['HOME_TEAM_ID', 'VISITOR_TEAM_ID'])
-            
-            if not clean.empty:
-                # Finder pour Scores
-                finder = leaguegamefinder.LeagueGameFinder(
-                    date_from_nullable=finder_date, date_to_nullable=finder_date, league_id_nullable='00'
-                )
-                results = finder.get_data_frames()[0]
-                
-                score_map = {}
-                if not results.empty:
-                    for _, r in results.iterrows():
-                        try:
-                            gid = clean_id_hard(r['GAME_ID'])
-                            tid = clean_id_hard(r['TEAM_ID'])
-                            pts = int(r['PTS'])
-                            score_map[f"{gid}_{tid}"] = pts
-                        except: continue
-                
-                def get_score(row, is_home):
-                    try:
-                        g_id = clean_id_hard(row['GAME_ID'])
-                        t_id = clean_id_hard(row['HOME_TEAM_ID']) if is_home else clean_id_hard(row['VISITOR_TEAM_ID'])
-                        return score_map.get(f"{g_id}_{t_id}", None)
-                    except: return None
-
-                clean['PTS_HOME'] = clean.apply(lambda row: get_score(row, True), axis=1)
-                clean['PTS_AWAY'] = clean.apply(lambda row: get_score(row, False), axis=1)
-                
-                def force_status(row):
-                    if pd.notna(row['PTS_HOME']) and pd.notna(row['PTS_AWAY']): return 3
-                    return row.get('GAME_STATUS_ID', 1)
 
-                clean['GAME_STATUS_ID'] = clean.apply(force_status, axis=1)
-                
-                # Check si on a des résultats "finis" ou "avec scores"
-                has_finished = clean[clean['GAME_STATUS_ID'] == 3].shape[0] > 0
-                if has_finished:
-                    found_days[str_date] = [clean]
-                    break # STOP, on a trouvé la dernière soirée jouée
-        except: pass
-        target_date -= timedelta(days=1)
-        
-    # MISSION FUTUR (Affiches)
-    target_date = datetime.now()
-    for _ in range(5): # Avance max 5 jours
-        str_date = target_date.strftime('%Y-%m-%d')
-        try:
-            board = scoreboardv2.ScoreboardV2(game_date=str_date)
-            raw = board.game_header.get_data_frame()
-            clean = raw.dropna(subset=['HOME_TEAM_ID', 'VISITOR_TEAM_ID'])
-            
-            if not clean.empty:
-                # On prépare pour l'affichage
-                clean['PTS_HOME'] = None
-                clean['PTS_AWAY'] = None
-                clean['GAME_STATUS_ID'] = 1 # Futur
-                
-                if str_date in found_days: found_days[str_date].append(clean)
-                else: found_days[str_date] = [clean]
-                break # STOP, on a trouvé la prochaine soirée
-        except: pass
-        target_date += timedelta(days=1)
+    # Les 2 missions (recule / avance de SCAN_DAYS jours max) sont sondées en parallèle,
+    # puis résolues dans l'ordre des dates : on garde la première soirée trouvée de chaque côté.
+    now = datetime.now()
+    past = [now - timedelta(days=k) for k in range(1, SCAN_DAYS + 1)]
+    future = [now + timedelta(days=k) for k in range(SCAN_DAYS)]
+    pool = ThreadPoolExecutor(max_workers=SCAN_WORKERS)
+    try:
+        past_f = [(d.strftime('%Y-%m-%d'), pool.submit(probe_past_day, d)) for d in past]
+        future_f = [(d.strftime('%Y-%m-%d'), pool.submit(probe_future_day, d)) for d in future]
+
+        # MISSION PASSÉ (Résultats) : dernière soirée jouée
+        str_date, clean, error = first_in_order(past_f)
+        if error is not None: errors.append(f"Résultats du {str_date} indisponibles ({error})")
+        if clean is not None: found_days[str_date] = [clean]
+
+        # MISSION FUTUR (Affiches) : prochaine soirée
+        str_date, clean, error = first_in_order(future_f)
+        if error is not None: errors.append(f"Affiches du {str_date} indisponibles ({error})")
+        if clean is not None:
+            if str_date in found_days: found_days[str_date].append(clean)
+            else: found_days[str_date] = [clean]
+    finally:
+        # On n'attend pas les sondes devenues inutiles (déjà lancées) pour afficher
+        pool.shutdown(wait=False, cancel_futures=True)
     
     # AJOUT MANUEL (Si existe dans hist pour ces dates trouvées)
     if not hist_data.empty:
         for d in found_days.keys():
-            try:
-                manual = hist_data[(hist_data['Date'] == d) & (hist_data['Type'] == 'Manual')].copy()
-                if not manual.empty:
-                    # Simule structure
-                    manual['GAME_STATUS_ID'] = 1
-                    manual['PTS_HOME'] = None
-                    manual['PTS_AWAY'] = None
-                    # Si resultat connu
-                    mask_done = manual['Result'].isin(['GAGNE', 'PERDU'])
-                    manual.loc[mask_done, 'GAME_STATUS_ID'] = 3
-                    found_days[d].append(manual)
-            except: pass
-
-    return dict(sorted(found_days.items()))
+            # Index par date du HistoryStore : pas de masque sur tout l'historique
+            manual = pd.DataFrame([r for r in hist_data.day(d) if r.get('Type') == 'Manual'])
+            if not manual.empty:
+                # Simule structure
+                manual['GAME_STATUS_ID'] = 1
+                manual['PTS_HOME'] = None
+                manual['PTS_AWAY'] = None
+                # Si resultat connu
+                if 'Result' in manual.columns:
+                    manual.loc[manual['Result'].isin(['GAGNE', 'PERDU']), 'GAME_STATUS_ID'] = 3
+                found_days[d].append(manual)
+
+    return dict(sorted(found_days.items())), errors
 
 # --- INIT ---
-model, df_stats = load_resources()
+model, team_state = load_resources()
 
 # --- HEADER ---
 c_head1, c_head2 = st.columns([1, 8])
@@ -384,6 +402,7 @@ with c_head1:
     else: st.title("🏀")
 with c_head2:
     st.markdown("<h3 style='margin:0; padding-top:10px;'>NBA AGENT PREDIKTOR</h3>", unsafe_allow_html=True)
+    show_vote_status()
 
 # --- NAVIGATION ---
 tab1, tab2, tab3 = st.tabs(["MATCHS", "STATS", "ADMIN"])
@@ -394,10 +413,16 @@ tab1, tab2, tab3 = st.tabs(["MATCHS", "STATS", "ADMIN"])
 with tab1:
     if not st.session_state['schedule_data']:
         with st.spinner("Chargement Cloud..."):
-            st.session_state['schedule_data'] = scan_schedule()
+            st.session_state['schedule_data'], st.session_state['schedule_errors'] = scan_schedule()
+    for err in st.session_state['schedule_errors']:
+        st.warning(f"📡 API NBA : {err}. Rechargez pour réessayer.")
 
     schedule = st.session_state.get('schedule_data', {})
-    hist_df = load_history_from_supabase()
+    history = load_history_from_supabase()
+    hist_df = history.df
+    for err in get_cloud_history().pop_errors():
+        st.error(f"☁️ Écriture Cloud annulée — {err}")
+    missing_bets = []
 
     if schedule:
         for date_key, dfs_list in schedule.items():
@@ -408,7 +433,7 @@ with tab1:
             st.markdown(f"#### {'🔥 Ce Soir' if is_today else '📅 ' + d_fmt}")
             
             matches_to_display = []
-            seen = []
+            seen = set()
             for df_source in dfs_list:
                 for index, row in df_source.iterrows():
                     h_id, a_id = 0, 0
@@ -420,27 +445,23 @@ with tab1:
                     
                     if 'HOME_TEAM_ID' in row: 
                         h_id, a_id = row['HOME_TEAM_ID'], row['VISITOR_TEAM_ID']
-                        if h_id in TEAMS_DB: h_name = TEAMS_DB[h_id]['full']
-                        if a_id in TEAMS_DB: a_name = TEAMS_DB[a_id]['full']
+                        h_name = teams_registry.full_name(h_id, default=h_name)
+                        a_name = teams_registry.full_name(a_id, default=a_name)
                     elif 'Home' in row:
                         h_name, a_name = row['Home'], row['Away']
-                        h_id = next((k for k, v in TEAMS_DB.items() if v['full'] == get_clean_name(h_name)), 0)
-                        a_id = next((k for k, v in TEAMS_DB.items() if v['full'] == get_clean_name(a_name)), 0)
+                        h_id = teams_registry.team_id(h_name, default=0)
+                        a_id = teams_registry.team_id(a_name, default=0)
                     
                     mid = f"{h_name}vs{a_name}"
                     if mid in seen: continue
-                    seen.append(mid)
+                    seen.add(mid)
 
                     # LOGIQUE HYBRIDE: Check Cloud History pour vote/prono existant
-                    existing_bet = pd.DataFrame()
                     user_bet_val = None
                     user_reason_val = None
+                    saved_row = history.get(date_key, h_name, a_name)
                     
-                    if not hist_df.empty:
-                        existing_bet = hist_df[(hist_df['Date'] == date_key) & (hist_df['Home'] == h_name) & (hist_df['Away'] == a_name)]
-                    
-                    if not existing_bet.empty:
-                        saved_row = existing_bet.iloc[0]
+                    if saved_row is not None:
                         winner = saved_row['Predicted_Winner']
                         if 'User_Prediction' in saved_row and pd.notna(saved_row['User_Prediction']):
                             user_bet_val = saved_row['User_Prediction']
@@ -453,14 +474,8 @@ with tab1:
                             prob = conf_val if is_h_win else (1-conf_val)
                         except: prob = None
                     else:
-                        # Si pas dans l'historique, on calcule et ON SAUVEGARDE SUR CLOUD
-                        if h_id != 0:
-                            prob, det = get_prediction(model, df_stats, h_id, a_id)
-                            if prob:
-                                w = h_name if prob > 0.5 else a_name
-                                c = prob*100 if prob > 0.5 else (1-prob)*100
-                                save_bet_auto_cloud(date_key, h_name, a_name, w, c)
-                                st.rerun() # Refresh pour afficher
+                        # Si pas dans l'historique : calcul groupé en fin de page puis SAUVEGARDE SUR CLOUD
+                        if h_id != 0: missing_bets.append((date_key, h_id, a_id, h_name, a_name))
                     
                     if prob is not None and h_id != 0:
                         matches_to_display.append({
@@ -488,7 +503,7 @@ with tab1:
                             c_sa = "#4ade80" if 'W' in inf_a['strk'] else "#f87171"
                             is_h_win = m['prob'] > 0.5
                             ia_conf = m['prob']*100 if is_h_win else (1-m['prob'])*100
-                            ia_code = TEAMS_DB.get(m['hid'] if is_h_win else m['aid'], {}).get('code', 'IA')
+                            ia_code = teams_registry.code(m['hid'] if is_h_win else m['aid'], default='IA')
                             
                             has_voted = (m['u'] is not None and m['u'] != "")
                             is_editing = st.session_state['edit_modes'].get(m['mid'], False)
@@ -510,14 +525,14 @@ with tab1:
                             <div class='card-header'>
                                 <div class='team-box'>
                                     <img src='https://cdn.nba.com/logos/nba/{m['hid']}/global/L/logo.svg' width='40'>
-                                    <span class='t-code'>{TEAMS_DB.get(m['hid'],{}).get('code', 'H')}</span>
+                                    <span class='t-code'>{teams_registry.code(m['hid'], default='H')}</span>
                                     <span class='score-val {h_cls}'>{d_score_h}</span>
                                     <span class='t-meta'>#{inf_h['rank']} ({inf_h['rec']}) <b style='color:{c_sh}'>{inf_h['strk']}</b></span>
                                 </div>
                                 {score_vs_block}
                                 <div class='team-box'>
                                     <img src='https://cdn.nba.com/logos/nba/{m['aid']}/global/L/logo.svg' width='40'>
-                                    <span class='t-code'>{TEAMS_DB.get(m['aid'],{}).get('code', 'A')}</span>
+                                    <span class='t-code'>{teams_registry.code(m['aid'], default='A')}</span>
                                     <span class='score-val {a_cls}'>{d_score_a}</span>
                                     <span class='t-meta'>#{inf_a['rank']} ({inf_a['rec']}) <b style='color:{c_sa}'>{inf_a['strk']}</b></span>
                                 </div>
@@ -533,7 +548,7 @@ with tab1:
                                 
                                 html_user = ""
                                 if has_voted:
-                                    u_code = TEAMS_DB.get(next((k for k,v in TEAMS_DB.items() if v['full'] == m['u']),0), {}).get('code', m['u'])
+                                    u_code = teams_registry.code(m['u'], default=m['u'])
                                     u_win = (m['u'] == real_winner)
                                     u_res = "res-badge-win" if u_win else "res-badge-loss"
                                     u_txt = "GAGNÉ" if u_win else "PERDU"
@@ -544,7 +559,7 @@ with tab1:
                                 html_ia = f"<div class='prono-row'><span class='p-lbl'>IA</span><span class='p-val'>{ia_code}</span><span class='p-conf'>{ia_conf:.0f}%</span></div>"
                                 html_user = ""
                                 if has_voted and not is_editing:
-                                    u_code = TEAMS_DB.get(next((k for k,v in TEAMS_DB.items() if v['full'] == m['u']),0), {}).get('code', m['u'])
+                                    u_code = teams_registry.code(m['u'], default=m['u'])
                                     reason_disp = f"<div class='reason-text'>({m['reason']})</div>" if m['reason'] else ""
                                     html_user = f"<div class='user-choice-row'><div class='prono-row' style='justify-content:center;'><span class='p-lbl'>IK</span><span class='p-val'>{u_code}</span></div>{reason_disp}</div>"
                             
@@ -561,8 +576,8 @@ with tab1:
                                 else:
                                     reason_choice = st.selectbox("Justification", REASONS_LIST, key=f"reason_{m['mid']}", label_visibility="collapsed")
                                     b1, b2 = st.columns(2)
-                                    ch = TEAMS_DB.get(m['hid'], {}).get('code', 'H')
-                                    ca = TEAMS_DB.get(m['aid'], {}).get('code', 'A')
+                                    ch = teams_registry.code(m['hid'], default='H')
+                                    ca = teams_registry.code(m['aid'], default='A')
                                     if b1.button(ch, key=f"bh_{m['mid']}", width="stretch"):
                                         save_user_vote_cloud(m['d'], m['h'], m['a'], m['h'], reason_choice, m['mid'])
                                         st.rerun()
@@ -571,26 +586,35 @@ with tab1:
                                         st.rerun()
                                 st.markdown('</div>', unsafe_allow_html=True)
 
-    elif st.session_state['schedule_data'] == {}:
+        # PRONOS MANQUANTS : toute l'affiche en un seul appel modèle, puis un seul refresh
+        if missing_bets:
+            probs = get_predictions(model, team_state, [(b[1], b[2]) for b in missing_bets])
+            saved = 0
+            for (date_key, h_id, a_id, h_name, a_name), prob in zip(missing_bets, probs):
+                if prob:
+                    w = h_name if prob > 0.5 else a_name
+                    c = prob*100 if prob > 0.5 else (1-prob)*100
+                    save_bet_auto_cloud(date_key, h_name, a_name, w, c)
+                    saved += 1
+            if saved: st.rerun() # Refresh pour afficher
+
+    elif st.session_state['schedule_data'] == {} and not st.session_state['schedule_errors']:
         st.info("Aucun match.")
 
     # 4. RESULTATS
-    if not hist_df.empty:
-        finished = hist_df[hist_df['Result'].isin(['GAGNE', 'PERDU'])].copy()
+    if not history.empty:
+        dates = history.result_dates(limit=2)
         
-        if not finished.empty:
+        if dates:
             st.write("")
             st.markdown("#### 🏁 Derniers Résultats")
             c_res_main, _ = st.columns([1, 1]) 
             with c_res_main:
-                dates = sorted(finished['Date'].unique(), reverse=True)[:2]
                 first_open = True
                 for d in dates:
-                    day_rows = finished[finished['Date'] == d]
-                    ia_wins = len(day_rows[day_rows['Result'] == 'GAGNE'])
-                    user_wins = 0
-                    if 'User_Result' in day_rows.columns:
-                        user_wins = len(day_rows[day_rows['User_Result'] == 'GAGNE'])
+                    day_rows = history.results(d)
+                    ia_wins = sum(1 for r in day_rows if r['Result'] == 'GAGNE')
+                    user_wins = sum(1 for r in day_rows if r.get('User_Result') == 'GAGNE')
                     
                     try: d_fmt = datetime.strptime(d, '%Y-%m-%d').strftime('%d.%m')
                     except: d_fmt = d
@@ -598,7 +622,7 @@ with tab1:
                     with st.expander(f"📅 {d_fmt} | IA: {ia_wins}/{len(day_rows)} | IK: {user_wins}/{len(day_rows)}", expanded=first_open):
                         first_open = False
                         html_table = "<table class='res-table'><tr><th>MATCH</th><th>WIN</th><th>IA</th><th>IK</th></tr>"
-                        for _, r in day_rows.iterrows():
+                        for r in day_rows:
                             match_str = f"{get_short_code(r['Home'])}-{get_short_code(r['Away'])}"
                             win_str = get_short_code(r['Real_Winner']) if pd.notna(r['Real_Winner']) else "?"
                             col_ia = "#4ade80" if r['Result'] == 'GAGNE' else "#f87171"
@@ -674,9 +698,11 @@ with tab2:
                 return f"{icon} {code}"
 
             # Noms courts pour compacité
-            df_disp['Home'] = df_disp['Home'].apply(lambda x: get_short_code(get_clean_name(x)))
-            df_disp['Away'] = df_disp['Away'].apply(lambda x: get_short_code(get_clean_name(x)))
-            df_disp['Winner'] = df_disp['Real_Winner'].apply(lambda x: get_short_code(get_clean_name(x)) if x not in ["En attente...", ""] else "...")
+            # Noms -> abréviations en une passe par colonne (une résolution par nom distinct)
+            df_disp['Home'] = teams_registry.code_column(df_disp['Home'])
+            df_disp['Away'] = teams_registry.code_column(df_disp['Away'])
+            pending = df_disp['Real_Winner'].isin(["En attente...", ""])
+            df_disp['Winner'] = teams_registry.code_column(df_disp['Real_Winner']).where(~pending, "...")
             
             df_disp['Prono IA'] = df_disp.apply(lambda x: merge_prono_res(x['Predicted_Winner'], x['Result']), axis=1)
             
@@ -718,6 +744,7 @@ with tab3:
     with r2_c2:
         if st.button("Entraînement", width="stretch"):
             with st.status("Training...") as s:
+                from src import train_nba
                 succ, msg, acc = train_nba.train_model()
                 if succ:
                     run_script('src/features_nba.py', "Stats", s)
@@ -728,7 +755,7 @@ with tab3:
     st.markdown("---")
     st.subheader("🔮 Ajout Manuel")
     cm1, cm2, cm3 = st.columns(3)
-    team_names = [f"{v['code']} - {v['full']}" for k,v in TEAMS_DB.items()]
+    team_names = [f"{t.code} - {t.full}" for t in teams_registry.TEAMS]
     hm = cm1.selectbox("Home", team_names, index=None)
     aw = cm2.selectbox("Away", team_names, index=None)
     dt = cm3.date_input("Date", value=datetime.now())
@@ -737,15 +764,16 @@ with tab3:
         if st.button("Analyser & Ajouter"):
             h_code = hm.split(' - ')[0]
             a_code = aw.split(' - ')[0]
-            h_id = next(k for k,v in TEAMS_DB.items() if v['code'] == h_code)
-            a_id = next(k for k,v in TEAMS_DB.items() if v['code'] == a_code)
-            prob, _ = get_prediction(model, df_stats, h_id, a_id)
+            h_id = teams_registry.BY_CODE[h_code].id
+            a_id = teams_registry.BY_CODE[a_code].id
+            prob, _ = get_prediction(model, team_state, h_id, a_id)
             if prob:
-                win_name = TEAMS_DB[h_id]['full'] if prob > 0.5 else TEAMS_DB[a_id]['full']
+                h_full, a_full = teams_registry.BY_ID[h_id].full, teams_registry.BY_ID[a_id].full
+                win_name = h_full if prob > 0.5 else a_full
                 conf = prob*100 if prob > 0.5 else (1-prob)*100
                 st.success(f"Vainqueur : {win_name} ({conf:.1f}%)")
-                save_bet_auto_local(dt.strftime('%Y-%m-%d'), TEAMS_DB[h_id]['full'], TEAMS_DB[a_id]['full'], win_name, conf)
-                save_bet_manual_cloud(dt.strftime('%Y-%m-%d'), TEAMS_DB[h_id]['full'], TEAMS_DB[a_id]['full'], win_name, conf)
+                save_bet_auto_local(dt.strftime('%Y-%m-%d'), h_full, a_full, win_name, conf)
+                save_bet_manual_cloud(dt.strftime('%Y-%m-%d'), h_full, a_full, win_name, conf)
                 
                 st.session_state['schedule_data'] = {} 
                 st.rerun()
\ No newline at end of file
@@ -1,32 +1,24 @@
+import argparse
+import importlib
 import subprocess
 import sys
 import time
-import os
 from datetime import datetime
 
-def run_step(script_path, description):
-    print(f"\n{'='*50}")
-    print(f"🚀 ÉTAPE : {description}")
-    print(f"{'='*50}")
-    
-    # On vérifie que le fichier existe avant de lancer
-    if not os.path.exists(script_path):
-        print(f"❌ ERREUR : Le fichier {script_path} est introuvable.")
-        return False
+from src import pipeline, sync_stage
 
-    try:
-        # On lance le script et on attend qu'il finisse
-        subprocess.run([sys.executable, script_path], check=True)
-        print(f"✅ {description} terminé avec succès.")
-        return True
-    except subprocess.CalledProcessError:
-        print(f"❌ ERREUR CRITIQUE dans {script_path}.")
-        return False
+# --- CHEMINS ---
+GAMES_FILE = "data/nba_games.csv"
+READY_FILE = "data/nba_games_ready.csv"
+TEAM_STATE_FILE = "data/team_state.csv"
+BETS_FILE = "data/bets_history.csv"
+
+# --- CONFIG ---
+# Fraîcheur max (s) de la réponse LeagueGameFinder pour l'étape data : le démon relance la
+# routine toutes les INGEST_RETRY tant que la soirée manque, il faut une réponse neuve à chaque fois
+DATA_MAX_AGE = 60
 
 def run_git_sync():
-    print(f"\n{'='*50}")
-    print(f"☁️ SYNCHRONISATION GITHUB")
-    print(f"{'='*50}")
     try:
         subprocess.run(["git", "add", "."], check=True)
         date_msg = datetime.now().strftime('%Y-%m-%d %H:%M')
@@ -35,42 +27,80 @@ def run_git_sync():
         print("Envoi vers GitHub...")
         subprocess.run(["git", "push"], check=True)
         print("✅ Code & Data sécurisés sur GitHub !")
+        return True
     except Exception as e:
         print(f"⚠️ Attention : Erreur Git ({e}), mais on continue.")
+        return False
 
-# --- DÉMARRAGE NBA Agent ---
-
-print("\n🏀 --- NBA AGENT: ROUTINE --- 🏀\n")
+def task(module, func, **kwargs):
+    """Étape exécutée dans ce process : module importé à la première exécution, fonction -> succès"""
+    return lambda: getattr(importlib.import_module(module), func)(**kwargs) is not False
 
-# 1. Mise à jour des scores et calendrier
-if not run_step('src/data_nba.py', "Mise à jour des Scores"):
-    input("Entrée pour quitter...")
-    exit()
+def sync_step(table):
+    return task(*sync_stage.SYNCS[table])
 
-# 2. Calcul des stats
-run_step('src/features_nba.py', "Recalcul Stats")
+# --- ÉTAPES ---
+# Les fichiers d'entrée décident si une étape doit retourner : même contenu qu'au dernier
+# succès -> sautée. data_nba n'a pas d'entrée (il interroge l'API) : il tourne toujours.
+# Toutes les étapes tournent dans ce process (un seul démarrage Python, imports partagés).
+STEPS = [
+    # 1. Mise à jour des scores et calendrier (bloquant : sans données, rien ne sert de continuer)
+    pipeline.Step('data', task('src.data_nba', 'get_nba_data', max_age=DATA_MAX_AGE), "Mise à jour des Scores",
+                  outputs=[GAMES_FILE], critical=True),
+    # 2. Calcul des stats
+    pipeline.Step('features', task('src.features_nba', 'run_features'), "Recalcul Stats",
+                  inputs=[GAMES_FILE], outputs=[READY_FILE, TEAM_STATE_FILE], deps=['data']),
+    # 3. Vérification des paris (Gagné/Perdu)
+    pipeline.Step('verify', task('src.verify_bets', 'verify'), "Vérification Paris",
+                  inputs=[BETS_FILE, GAMES_FILE], outputs=[BETS_FILE], deps=['data']),
+    # 4. Envoi vers Supabase (Cloud Database) : paris, scores NBA et classements, en parallèle.
+    # Avant Git pour être sûr que la base est à jour pour les apps externes.
+    pipeline.Step('sync_bets_history', sync_step('bets_history'), "Synchro Supabase",
+                  inputs=[BETS_FILE], deps=['verify']),
+    pipeline.Step('sync_nba_games', sync_step('nba_games'), "Sync Scores NBA → Supabase",
+                  inputs=[GAMES_FILE], deps=['data']),
+    pipeline.Step('sync_nba_standings', sync_step('nba_standings'), "Sync Classements → Supabase",
+                  inputs=[GAMES_FILE], deps=['data']),
+    # 5. Sauvegarde du code et du CSV sur GitHub (après toutes les synchros : elles écrivent
+    # le manifeste de synchro, `git add .` ne doit pas prendre un état à moitié écrit)
+    pipeline.Step('git', run_git_sync, "Synchronisation GitHub",
+                  inputs=[GAMES_FILE, READY_FILE, TEAM_STATE_FILE, BETS_FILE],
+                  deps=['features', 'verify', 'sync_bets_history', 'sync_nba_games', 'sync_nba_standings']),
+]
 
-# 3. Vérification des paris (Gagné/Perdu)
-run_step('src/verify_bets.py', "Vérification Paris")
+def run_routine(force=False):
+    """Exécute le DAG de la routine, affiche le rapport de temps et retourne les résultats par étape"""
+    start = time.perf_counter()
+    results = pipeline.Pipeline(STEPS).run(force=force)
+    pipeline.print_report(results, time.perf_counter() - start)
+    return results
 
-# 4. NOUVEAU : Envoi vers Supabase (Cloud Database)
-# On le fait avant Git pour être sûr que la base est à jour pour les apps externes
-run_step('src/sync_cloud.py', "Synchro Supabase")
+def main(force=False, launch_app=True):
+    """Routine interactive : DAG puis interface. False si la mise à jour des données a échoué."""
+    print("\n🏀 --- NBA AGENT: ROUTINE --- 🏀\n")
 
-# 4b. NOUVEAU : Sync des scores et classements officiels NBA
-run_step('portable_sync_nba_games.py', "Sync Scores NBA → Supabase")
-run_step('portable_sync_standings.py', "Sync Classements → Supabase")
+    results = run_routine(force=force)
+    if results['data']['status'] == 'failed':
+        if launch_app and sys.stdin.isatty(): input("Entrée pour quitter...")
+        return False
+    if not launch_app: return True
 
-# 5. Sauvegarde du code et du CSV sur GitHub
-run_git_sync()
+    # 6. Lancement de l'interface
+    print(f"\n{'='*50}")
+    print("✨ LANCEMENT DE L'INTERFACE")
+    print(f"{'='*50}")
+    time.sleep(2)
 
-# 6. Lancement de l'interface
-print(f"\n{'='*50}")
-print("✨ LANCEMENT DE L'INTERFACE")
-print(f"{'='*50}")
-time.sleep(2)
+    try:
+        subprocess.run([sys.executable, "-m", "streamlit", "run", "app.py"])
+    except KeyboardInterrupt:
+        print("\n[INFO] Fermeture de l'application. À demain !")
+    return True
 
-try:
-    subprocess.run([sys.executable, "-m", "streamlit", "run", "app.py"])
-except KeyboardInterrupt:
-    print("\n[INFO] Fermeture de l'application. À demain !")
\ No newline at end of file
+# --- DÉMARRAGE NBA Agent ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Routine quotidienne NBA Agent")
+    parser.add_argument('--force', action='store_true', help="Relance toutes les étapes, même à jour")
+    parser.add_argument('--no-app', action='store_true', help="Ne lance pas l'interface à la fin")
+    args = parser.parse_args()
+    sys.exit(0 if main(force=args.force, launch_app=not args.no_app) else 1)
@@ -1,32 +1,34 @@
-import subprocess
 import sys
 import time
 
-def run_script(script_name):
+import nba
+
+def run_command(argv):
+    name = " ".join(argv)
     print(f"\n{'='*40}")
-    print(f"🚀 LANCEMENT DE : {script_name}")
+    print(f"🚀 LANCEMENT DE : nba {name}")
     print(f"{'='*40}\n")
-    try:
-        subprocess.run([sys.executable, script_name], check=True)
-        print(f"\n✅ {script_name} terminé.")
-    except subprocess.CalledProcessError:
-        print(f"\n❌ Erreur dans {script_name}. Arrêt.")
+    # Même process pour toutes les étapes : pas de redémarrage Python entre elles
+    if nba.run(argv):
+        print(f"\n✅ {name} terminé.")
+    else:
+        print(f"\n❌ Erreur dans {name}. Arrêt.")
         sys.exit(1)
 
 print("--- ROUTINE NBA ---")
 
 # 1. Mise à jour des données (Récupère les scores d'hier)
-run_script('data_nba.py')
+run_command(['data'])
 
 # 2. Calculs stats
-run_script('features_nba.py')
+run_command(['features'])
 
 # 3. VÉRIFICATION DES RÉSULTATS (NOUVEAU !)
 # On regarde si nos paris d'hier étaient bons
-run_script('verify_bets.py')
+run_command(['verify'])
 
 # Pause lecture
 time.sleep(2)
 
 # 4. Prédictions pour aujourd'hui
-run_script('predict_nba.py')
\ No newline at end of file
+run_command(['predict'])
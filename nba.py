@@ -0,0 +1,111 @@
+import argparse
+import os
+import sys
+import time
+
+# Point d'entrée unique : python nba.py <commande>. Chaque commande importe ses dépendances
+# lourdes (pandas, nba_api, xgboost) seulement quand elle tourne, et toutes appellent les
+# fonctions des modules src/ : une routine complète se fait dans un seul process.
+
+# Forces le dossier de travail sur celui du script (chemins data/, models/ relatifs)
+os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+def cmd_data(args):
+    from src import data_nba
+    return data_nba.get_nba_data(full_refresh=args.full_refresh)
+
+def cmd_features(args):
+    from src import features_nba
+    return features_nba.run_features(full=args.full)
+
+def cmd_verify(args):
+    from src import verify_bets
+    return verify_bets.verify()
+
+def cmd_sync(args):
+    from src import sync_stage
+    syncs = {t: sync_stage.SYNCS[t] for t in args.tables} if args.tables else sync_stage.SYNCS
+    return all(r['ok'] for r in sync_stage.run_sync_stage(syncs).values())
+
+def cmd_status(args):
+    from src import check_status
+    return check_status.check_nba_status() is not False
+
+def cmd_votes(args):
+    from src import pull_votes
+    return pull_votes.pull_votes_from_cloud()
+
+def cmd_predict(args):
+    from src import predict_today
+    return predict_today.predict_today()
+
+def cmd_train(args):
+    from src import train_nba
+    ok, message, accuracy = train_nba.train_model()
+    print(f"{message} Precision: {accuracy:.1%}")
+    return ok
+
+def cmd_logos(args):
+    from src import setup_logos
+    setup_logos.download_logos()
+    return True
+
+def cmd_routine(args):
+    import daily_routine
+    return daily_routine.main(force=args.force, launch_app=args.app)
+
+def cmd_daemon(args):
+    import nba_master
+    try:
+        nba_master.run_daemon()
+    except KeyboardInterrupt:
+        nba_master.log("Démon arrêté.")
+    return True
+
+def cmd_app(args):
+    import subprocess
+    return subprocess.run([sys.executable, "-m", "streamlit", "run", "app.py"]).returncode == 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="nba", description="NBA Agent : données, features, paris, synchro, routine")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("data", help="Mise à jour des scores (nba_games.csv)")
+    p.add_argument('--full-refresh', action='store_true', help="Retélécharge tout l'historique")
+    p.set_defaults(func=cmd_data)
+
+    p = sub.add_parser("features", help="Recalcul des Four Factors")
+    p.add_argument('--full', action='store_true', help="Ignore l'état et recalcule tout")
+    p.set_defaults(func=cmd_features)
+
+    sub.add_parser("verify", help="Vérification des paris (Gagné/Perdu)").set_defaults(func=cmd_verify)
+
+    p = sub.add_parser("sync", help="Synchro Supabase (toutes les tables en parallèle)")
+    p.add_argument('tables', nargs='*', choices=['bets_history', 'nba_games', 'nba_standings'], help="Tables à synchroniser (défaut : toutes)")
+    p.set_defaults(func=cmd_sync)
+
+    sub.add_parser("status", help="Les matchs d'hier sont-ils terminés ?").set_defaults(func=cmd_status)
+    sub.add_parser("votes", help="Récupération des votes (Supabase -> CSV)").set_defaults(func=cmd_votes)
+    sub.add_parser("predict", help="Pronostics des matchs du jour").set_defaults(func=cmd_predict)
+    sub.add_parser("train", help="Entraînement du modèle XGBoost").set_defaults(func=cmd_train)
+    sub.add_parser("logos", help="Téléchargement des logos").set_defaults(func=cmd_logos)
+
+    p = sub.add_parser("routine", help="Routine complète (DAG, étapes à jour sautées)")
+    p.add_argument('--force', action='store_true', help="Relance toutes les étapes, même à jour")
+    p.add_argument('--app', action='store_true', help="Lance l'interface à la fin")
+    p.set_defaults(func=cmd_routine)
+
+    sub.add_parser("daemon", help="Surveille la soirée et lance la routine au dernier buzzer").set_defaults(func=cmd_daemon)
+    sub.add_parser("app", help="Lance l'interface Streamlit").set_defaults(func=cmd_app)
+    return parser
+
+def run(argv=None):
+    """Exécute une commande dans le process courant ; True si succès"""
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+    ok = args.func(args) is not False
+    print(f"\n⏱️  nba {args.command} : {time.perf_counter() - start:.1f}s")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if run() else 1)
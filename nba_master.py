@@ -1,35 +1,44 @@
-import subprocess
+import contextlib
+import io
 import os
 import sys
 # Forces le dossier de travail sur celui du script
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 import time
-from datetime import datetime
+import json
+import argparse
+from datetime import datetime, timedelta
+
+# --- CONFIG (mode démon) ---
+DAEMON_STATE_FILE = "data/daemon_state.json"
+GAME_DURATION = timedelta(hours=2, minutes=15)   # entre-deux -> buzzer final, en moyenne
+MIN_POLL = 120          # secondes : dernier match en cours, on serre la surveillance
+MAX_POLL = 600          # plafond du backoff quand rien ne bouge
+IDLE_POLL = 3600        # sommeil max d'un coup (journée, soirée déjà traitée)
+LIVE_MAX_AGE = 60       # fraîcheur max du scoreboard pendant le suivi
+INGEST_RETRY = 300      # matchs finis mais pas encore visibles dans LeagueGameFinder
+INGEST_ATTEMPTS = 6
+REGULAR_SEASON_PREFIX = "002"   # GAME_ID de saison régulière : seuls matchs ingérés par data_nba
 
 def check_games_finished():
     """Vérifie si les matchs d'hier sont terminés via l'API NBA"""
     print("\n🔍 Vérification de l'état des matchs...")
     try:
-        import os # Security
-        # On cherche d'abord dans src/ (le dossier normal de la V0)
-        script_check = "src/check_status.py" if os.path.exists("src/check_status.py") else "check_status.py"
-        result = subprocess.run([sys.executable, script_check], 
-                              capture_output=True, text=True, timeout=30)
-        
-        # Si le script retourne 0, les matchs sont finis
-        if result.returncode == 0:
+        from src import check_status
+        # Sortie détaillée gardée de côté, affichée seulement si on met en pause
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            finished = check_status.check_nba_status()
+
+        if finished is None:
+            print("⚠️ API NBA muette lors du check, on continue quand même...")
+            return True
+        if finished:
             print("✅ Tous les matchs d'hier sont terminés !")
             return True
-        else:
-            print("⏳ Certains matchs ne sont pas encore terminés.")
-            print(f"   Message: {result.stdout}")
-            return False
-    except subprocess.TimeoutExpired:
-        print("⚠️ Timeout lors de la vérification (API lente?)")
+        print("⏳ Certains matchs ne sont pas encore terminés.")
+        print(f"   Message: {output.getvalue()}")
         return False
-    except FileNotFoundError:
-        print("⚠️ Fichier check_status.py introuvable, on continue quand même...")
-        return True
     except Exception as e:
         print(f"⚠️ Erreur lors du check: {e}")
         print("   On continue quand même...")
@@ -39,39 +48,177 @@ def pull_user_votes():
     """Récupère les votes utilisateurs depuis Supabase vers le CSV local"""
     print("\n📥 Récupération des votes utilisateurs (Supabase → CSV)...")
     try:
-        # Cherche d'abord pull_votes.py, sinon essaie src/pull_votes.py
-        script = "pull_votes.py" if os.path.exists("pull_votes.py") else "src/pull_votes.py"
-        result = subprocess.run([sys.executable, script], 
-                              capture_output=True, text=True, timeout=30)
-        
-        if result.returncode == 0:
+        from src import pull_votes
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            ok = pull_votes.pull_votes_from_cloud()
+
+        if ok:
             print("✅ Votes récupérés avec succès !")
         else:
-            print(f"⚠️ Erreur lors de la récupération: {result.stderr}")
-    except FileNotFoundError:
-        print("⚠️ Script pull_votes introuvable, on continue sans...")
+            print(f"⚠️ Erreur lors de la récupération: {output.getvalue()}")
     except Exception as e:
         print(f"⚠️ Erreur: {e}")
         print("   On continue sans les votes...")
 
 def run_main_routine():
-    """Lance la routine principale (data, stats, sync, git, streamlit)"""
+    """Lance la routine principale (data, stats, sync, git, streamlit) dans ce process"""
     print("\n🚀 Lancement de la routine principale...")
     print("="*60)
     
     try:
-        # Lance daily_routine.py et laisse l'output visible
-        subprocess.run([sys.executable, "daily_routine.py"], check=False)
+        import daily_routine
+        daily_routine.main()
     except KeyboardInterrupt:
         print("\n⚠️ Routine interrompue par l'utilisateur.")
     except Exception as e:
         print(f"❌ Erreur lors de la routine: {e}")
 
-# === IMPORTS TARDIFS ===
-import os
+# === MODE DÉMON ===
+def log(msg):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+def load_daemon_state():
+    try:
+        with open(DAEMON_STATE_FILE, 'r') as f: return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_daemon_state(state):
+    tmp = DAEMON_STATE_FILE + ".tmp"
+    with open(tmp, 'w') as f: json.dump(state, f)
+    os.replace(tmp, DAEMON_STATE_FILE)
+
+def next_delay(status, tips, now, unchanged):
+    """Attente (s) avant le prochain contrôle d'une soirée pas encore finie.
+
+    Tant que le dernier entre-deux + durée d'un match n'est pas atteint, on dort jusque-là.
+    Ensuite on contrôle souvent (d'autant plus qu'il reste peu de matchs) et on espace
+    exponentiellement tant que l'état ne bouge pas.
+    """
+    if tips:
+        expected_end = max(tips.values()) + GAME_DURATION
+        if now < expected_end - timedelta(seconds=MIN_POLL):
+            return min(IDLE_POLL, (expected_end - now).total_seconds())
+    remaining = status['scheduled'] + status['live']
+    return min(MAX_POLL, MIN_POLL * min(remaining, 3) * 2 ** unchanged)
+
+def until_next_night(check_status, now):
+    """Secondes jusqu'au début de la soirée suivante (bascule à NIGHT_CUTOFF_HOUR, heure de New York)"""
+    night = check_status.current_night(now)
+    start = datetime(night.year, night.month, night.day, check_status.NIGHT_CUTOFF_HOUR, tzinfo=check_status.ET) + timedelta(days=1)
+    return min(IDLE_POLL, max(MIN_POLL, (start - now).total_seconds()))
+
+def games_ingested(game_ids, games_file="data/nba_games.csv"):
+    """Les matchs de saison régulière de la soirée sont dans nba_games.csv (LeagueGameFinder a parfois
+    quelques minutes de retard). Présaison, play-in, playoffs, All-Star, finale de la NBA Cup : jamais
+    ingérés par data_nba, donc pas attendus ; une soirée sans match de saison régulière est intégrée.
+    """
+    game_ids = [str(g) for g in game_ids if str(g).startswith(REGULAR_SEASON_PREFIX)]
+    if not game_ids: return True
+    import pandas as pd
+    try:
+        stored = set(pd.read_csv(games_file, usecols=['GAME_ID'], dtype={'GAME_ID': str})['GAME_ID'])
+    except (OSError, ValueError):
+        return False
+    return all(g in stored for g in game_ids)
+
+def run_night(game_ids):
+    """Votes cloud + routine complète (sans interface) ; True si la soirée est bien intégrée"""
+    import daily_routine
+    pull_user_votes()
+    results = daily_routine.run_routine()
+    if results['data']['status'] == 'failed': return False
+    return games_ingested(game_ids)
+
+def close_night(state, night):
+    state['last_night'] = str(night)
+    save_daemon_state(state)
+
+def run_daemon():
+    """Surveille la soirée NBA en continu et lance la routine dès le dernier buzzer. Jamais d'input()."""
+    from src import check_status, nba_client
+    state = load_daemon_state()
+    night, tips, last_seen, unchanged, attempts, final_ids = None, {}, None, 0, 0, []
+    log("🤖 Mode démon démarré (Ctrl+C pour arrêter).")
+
+    while True:
+        # Chaque réveil est une nouvelle "exécution" pour le budget d'appels NBA
+        nba_client.STATS.reset_budget()
+        now = datetime.now(check_status.ET)
+        current = check_status.current_night(now)
+        if current != night:
+            # Soirée pas réglée à l'heure de bascule (scoreboard figé, match jamais clos...) :
+            # on intègre ce qui est fini plutôt que de l'abandonner en silence
+            if night is not None and state.get('last_night') != str(night):
+                log(f"⚠️ Soirée du {night} pas terminée à {check_status.NIGHT_CUTOFF_HOUR}h (New York) : lancement de la routine quand même.")
+                try:
+                    done = run_night(final_ids)
+                except Exception as e:
+                    log(f"❌ Erreur pendant la routine : {e}")
+                    done = False
+                close_night(state, night)
+                log("✅ Soirée intégrée." if done else f"⚠️ Soirée du {night} incomplète, on passe à la suivante.")
+            night, tips, last_seen, unchanged, attempts, final_ids = current, {}, None, 0, 0, []
+
+        if state.get('last_night') == str(night):
+            time.sleep(until_next_night(check_status, now))
+            continue
+
+        try:
+            status = check_status.night_status(night, max_age=LIVE_MAX_AGE)
+        except Exception as e:
+            log(f"⚠️ Scoreboard indisponible ({e}), nouvel essai dans {MAX_POLL // 60} min.")
+            time.sleep(MAX_POLL)
+            continue
+
+        # Les heures d'entre-deux ne sont visibles qu'avant le début des matchs : on les garde
+        tips.update(status['tips'])
+        final_ids = status['final_ids']
+        seen = (status['live'], status['settled'])
+        unchanged = unchanged + 1 if seen == last_seen else 0
+        last_seen = seen
+
+        if status['total'] == 0:
+            log(f"📅 Soirée du {night} : aucun match.")
+            close_night(state, night)
+            continue
+
+        # Réglé = fini, reporté ou annulé (un match reporté reste "à venir" sur le scoreboard)
+        if status['settled'] < status['total']:
+            delay = next_delay(status, tips, now, unchanged)
+            log(f"⏳ Soirée du {night} : {status['final']}/{status['total']} finis, {status['live']} en cours. Prochain contrôle dans {delay / 60:.0f} min.")
+            time.sleep(delay)
+            continue
+
+        called_off = f", {status['called_off']} reporté(s)/annulé(s)" if status['called_off'] else ""
+        log(f"🏁 Soirée du {night} terminée ({status['total']} matchs{called_off}) : lancement de la routine.")
+        attempts += 1
+        try:
+            done = run_night(final_ids)
+        except Exception as e:
+            log(f"❌ Erreur pendant la routine : {e}")
+            done = False
+        if done or attempts >= INGEST_ATTEMPTS:
+            if not done: log(f"⚠️ Soirée du {night} incomplète après {attempts} essais, on passe à la suivante.")
+            close_night(state, night)
+            log("✅ Soirée intégrée.")
+        else:
+            log(f"⏳ Données de la soirée pas encore complètes, nouvel essai dans {INGEST_RETRY // 60} min.")
+            time.sleep(INGEST_RETRY)
 
 # === WORKFLOW PRINCIPAL ===
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NBA Agent - routine maître")
+    parser.add_argument('--daemon', action='store_true', help="Tourne en continu et lance la routine au dernier buzzer")
+    args = parser.parse_args()
+    if args.daemon:
+        try:
+            run_daemon()
+        except KeyboardInterrupt:
+            log("Démon arrêté.")
+        exit(0)
+
     print("\n" + "="*60)
     print("🏀 NBA AGENT - MASTER ROUTINE")
     print("="*60)
@@ -88,8 +235,9 @@ if __name__ == "__main__":
         print("\nOptions:")
         print("  1. Attendez quelques heures et relancez ce script")
         print("  2. Forcez la routine: python daily_routine.py")
+        print("  3. Mode automatique: python nba_master.py --daemon")
         print("━" * 60)
-        input("\n[Appuyez sur Entrée pour quitter]")
+        if sys.stdin.isatty(): input("\n[Appuyez sur Entrée pour quitter]")
         exit(0)
 
     # 2. Récupération des votes cloud
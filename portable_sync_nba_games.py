@@ -1,10 +1,11 @@
 
 import os
+import sys
 import pandas as pd
+import numpy as np
 import requests
-import json
-import time
 from dotenv import load_dotenv
+from src import sync_manifest, supabase_client
 
 # 1. CONFIG
 load_dotenv() 
@@ -13,17 +14,8 @@ load_dotenv()
 URL = os.environ.get("NEXT_PUBLIC_SUPABASE_URL") or os.environ.get("SUPABASE_URL")
 KEY = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY") or os.environ.get("SUPABASE_KEY")
 
-if not URL or not KEY:
-    print("❌ ERREUR: Variables d'environnement manquantes.")
-    print("   Attendu: NEXT_PUBLIC_SUPABASE_URL / ANON_KEY  ou  SUPABASE_URL / SUPABASE_KEY")
-    exit(1)
-
-Headers = {
-    "apikey": KEY,
-    "Authorization": f"Bearer {KEY}",
-    "Content-Type": "application/json",
-    "Prefer": "resolution=merge-duplicates"
-}
+# Importable sans clés (daily_routine) : l'absence est signalée au moment de la sync
+CLIENT = supabase_client.get_client(URL, KEY)
 
 # 2. SOURCE
 # On cherche le fichier dans plusieurs endroits possibles
@@ -42,113 +34,110 @@ def find_csv_path():
     
     return None
 
-ENDPOINT = f"{URL}/rest/v1/nba_games"
+TABLE = "nba_games"
+KEY_FIELDS = ['id']
+
+STAT_INT = ['pts', 'reb', 'ast', 'tov', 'stl', 'blk']
+STAT_FLOAT = ['fg_pct', 'fg3_pct', 'ft_pct', 'plus_minus']
+
+def build_records(df):
+    """Une ligne Supabase par match, construite colonne par colonne.
+
+    Les lignes "vs." sont le domicile, les autres l'extérieur ; on les fusionne sur GAME_ID.
+    Un match sans ses deux équipes est ignoré.
+    """
+    game_id = df['GAME_ID'].astype(str)
+    # ID parfois lu comme entier : on remet le format '002...'
+    game_id = game_id.where(~(game_id.str.startswith('2') & (game_id.str.len() < 10)), "00" + game_id)
+    is_home = df['MATCHUP'].astype(str).str.contains("vs.", regex=False) # ex: "PHX @ NYK" or "CLE vs. CHI"
+
+    # Stats Object (valeurs manquantes -> 0)
+    stats = pd.DataFrame({c: df[c.upper()].fillna(0).astype(int) for c in STAT_INT})
+    for c in STAT_FLOAT: stats[c] = df[c.upper()].fillna(0.0).astype(float)
+    stats['wl'] = df['WL']
+    stats = stats[['pts', 'fg_pct', 'fg3_pct', 'ft_pct', 'reb', 'ast', 'tov', 'stl', 'blk', 'plus_minus', 'wl']]
+
+    rows = pd.DataFrame({
+        'id': game_id.to_numpy(),
+        'team': df['TEAM_ABBREVIATION'].to_numpy(),
+        'score': stats['pts'].to_numpy(),
+        'stats': stats.to_dict('records'),
+        'is_home': is_home.to_numpy(),
+    })
+
+    # Infos de base (date, statut) : première ligne rencontrée pour chaque match
+    first = ~game_id.duplicated().to_numpy()
+    base = pd.DataFrame({
+        'game_date': pd.to_datetime(df['GAME_DATE']).dt.strftime('%Y-%m-%d').to_numpy()[first],
+        'id': game_id.to_numpy()[first],
+        'status': np.where(df['WL'].notna().to_numpy()[first], 'Final', 'Scheduled'),
+    })
+
+    side_cols = lambda side: {'team': f'{side}_team', 'score': f'{side}_score', 'stats': f'{side}_stats'}
+    home = rows[rows['is_home']].drop_duplicates('id', keep='last').drop(columns='is_home').rename(columns=side_cols('home'))
+    away = rows[~rows['is_home']].drop_duplicates('id', keep='last').drop(columns='is_home').rename(columns=side_cols('away'))
+    games = base.merge(home, on='id', how='inner').merge(away, on='id', how='inner')
+    return games.to_dict('records')
 
 def sync_games():
+    """Pousse les matchs nouveaux ou modifiés ; retourne True si tout est à jour côté Supabase"""
+    if CLIENT is None:
+        print("❌ ERREUR: Variables d'environnement manquantes.")
+        print("   Attendu: NEXT_PUBLIC_SUPABASE_URL / ANON_KEY  ou  SUPABASE_URL / SUPABASE_KEY")
+        return False
+
     csv_path = find_csv_path()
     if not csv_path:
         print(f"⚠️ Fichier 'nba_games.csv' introuvable (Cherché dans data/ et racine).")
-        return
+        return False
 
     print(f"📖 Lecture du fichier de stats: {csv_path}...")
     try:
+        # Tout le fichier est relu : le manifeste de sync décide ensuite quoi envoyer
         df = pd.read_csv(csv_path)
-        # DELTA OPTIMIZATION: Only sync the last 200 rows (approx 100 matches)
-        # This keeps Supabase light while preserving all historical data in the cloud (upsert)
-        if len(df) > 200:
-            print(f"⚡ Delta Sync: Traitement des 200 dernières lignes uniquement.")
-            df = df.tail(200)
     except Exception as e:
         print(f"❌ Erreur lecture CSV: {e}")
-        return
+        return False
 
     if df.empty:
         print("⚠️ CSV vide.")
-        return
+        return True
 
     # Nettoyage et Aggregation par GAME_ID
     # Le fichier contient 2 lignes par match (Home / Away)
     # Nous devons les fusionner en 1 seule ligne DB
     
     print("⚙️ Traitement et fusion des données (Home/Away)...")
-    
-    games_map = {}
-    
-    for _, row in df.iterrows():
-        game_id = str(row['GAME_ID'])
-        if game_id.startswith('2'): # ID sometimes treated as int, ensure format '002...' if needed or just use str
-             game_id = f"00{game_id}" if len(game_id) < 10 else game_id
-
-        if game_id not in games_map:
-            games_map[game_id] = {}
-        
-        # Identification Home/Away
-        matchup = str(row['MATCHUP']) # ex: "PHX @ NYK" or "CLE vs. CHI"
-        is_home_row = "vs." in matchup
-        
-        # Stats Object
-        stats = {
-            "pts": int(row['PTS']) if pd.notna(row['PTS']) else 0,
-            "fg_pct": float(row['FG_PCT']) if pd.notna(row['FG_PCT']) else 0.0,
-            "fg3_pct": float(row['FG3_PCT']) if pd.notna(row['FG3_PCT']) else 0.0,
-            "ft_pct": float(row['FT_PCT']) if pd.notna(row['FT_PCT']) else 0.0,
-            "reb": int(row['REB']) if pd.notna(row['REB']) else 0,
-            "ast": int(row['AST']) if pd.notna(row['AST']) else 0,
-            "tov": int(row['TOV']) if pd.notna(row['TOV']) else 0,
-            "stl": int(row['STL']) if pd.notna(row['STL']) else 0,
-            "blk": int(row['BLK']) if pd.notna(row['BLK']) else 0,
-            "plus_minus": float(row['PLUS_MINUS']) if pd.notna(row['PLUS_MINUS']) else 0.0,
-            "wl": row['WL']
-        }
-        
-        team_abbr = row['TEAM_ABBREVIATION']
-        
-        # Populate Game Record
-        # Base info should be same for both rows (Date, ID)
-        if 'game_date' not in games_map[game_id]:
-            games_map[game_id]['game_date'] = pd.to_datetime(row['GAME_DATE']).strftime('%Y-%m-%d')
-            games_map[game_id]['id'] = game_id
-            games_map[game_id]['status'] = 'Final' if pd.notna(row['WL']) else 'Scheduled'
-
-        if is_home_row:
-            games_map[game_id]['home_team'] = team_abbr
-            games_map[game_id]['home_score'] = stats['pts']
-            games_map[game_id]['home_stats'] = stats
-        else:
-            games_map[game_id]['away_team'] = team_abbr
-            games_map[game_id]['away_score'] = stats['pts']
-            games_map[game_id]['away_stats'] = stats
-
-    # Preparation Payload Supabase
-    records_to_upsert = []
-    
-    for gid, gdata in games_map.items():
-        # Validation: On a besoin des deux équipes pour une ligne valide
-        if 'home_team' in gdata and 'away_team' in gdata:
-            records_to_upsert.append(gdata)
-            
+    records_to_upsert = build_records(df)
+
     if not records_to_upsert:
         print("⚠️ Aucune donnée match complète trouvée.")
-        return
+        return True
+
+    # Delta par empreinte : seuls les matchs nouveaux ou modifiés depuis le dernier envoi réussi
+    manifest = sync_manifest.SyncManifest()
+    total = len(manifest.changed(TABLE, records_to_upsert, KEY_FIELDS))
+    print(f"🚀 Synchronisation de {total} matchs officiels ({len(records_to_upsert)} au total)...")
 
-    print(f"🚀 Synchronisation de {len(records_to_upsert)} matchs officiels...")
-    
     # Batch Upload
-    batch_size = 500
-    total = len(records_to_upsert)
-    
-    for i in range(0, total, batch_size):
-        batch = records_to_upsert[i:i+batch_size]
+    progress = {'done': 0}
+    def send_batch(batch):
+        start = progress['done']
+        progress['done'] += len(batch)
         try:
-            r = requests.post(ENDPOINT, headers=Headers, data=json.dumps(batch))
-            if r.status_code in [200, 201, 204]:
-                print(f"   Matches {i} à {min(i+batch_size, total)} : ✅ Succès")
-            else:
-                print(f"   Matches {i}: ⚠️ Erreur {r.status_code} - {r.text[:100]}")
+            CLIENT.upsert(TABLE, batch, on_conflict=KEY_FIELDS)
+            print(f"   Matches {start} à {progress['done']} : ✅ Succès")
+            return True
+        except requests.HTTPError as e:
+            print(f"   Matches {start}: ⚠️ Erreur {e.response.status_code} - {e.response.text[:100]}")
         except Exception as e:
             print(f"❌ Erreur réseau: {e}")
+        return False
+
+    sent, failed = manifest.push(TABLE, records_to_upsert, KEY_FIELDS, send_batch, batch_size=500)
 
-    print("✅ Terminé.")
+    print("✅ Terminé." if not failed else f"⚠️ Terminé avec {failed} matchs en échec (renvoyés au prochain passage).")
+    return not failed
 
 if __name__ == "__main__":
-    sync_games()
+    sys.exit(0 if sync_games() else 1)
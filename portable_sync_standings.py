@@ -1,61 +1,58 @@
 import os
+import sys
 import requests
-import json
-import time
 from dotenv import load_dotenv
 from nba_api.stats.endpoints import leaguestandingsv3
-from nba_api.stats.static import teams
+from src import nba_cache, supabase_client, teams_registry
 
 # 1. CONFIG
-# Try loading from local .env or frontend .env.local
-env_path = ".env"
-if not os.path.exists(env_path):
-    # Try sibling frontend folder
-    potential_path = os.path.join(os.path.dirname(os.getcwd()), "frontend", ".env.local")
-    if os.path.exists(potential_path):
-        env_path = potential_path
-    else:
-        # Try current dir's parent/frontend if running from backend
-        potential_path = os.path.join(os.getcwd(), "..", "frontend", ".env.local")
+TABLE = "nba_standings"
+KEY_FIELDS = ['team_id']   # une ligne par équipe
+
+def find_env_path():
+    # Try loading from local .env or frontend .env.local
+    env_path = ".env"
+    if not os.path.exists(env_path):
+        # Try sibling frontend folder
+        potential_path = os.path.join(os.path.dirname(os.getcwd()), "frontend", ".env.local")
         if os.path.exists(potential_path):
             env_path = potential_path
+        else:
+            # Try current dir's parent/frontend if running from backend
+            potential_path = os.path.join(os.getcwd(), "..", "frontend", ".env.local")
+            if os.path.exists(potential_path):
+                env_path = potential_path
+    return env_path
 
-print(f"🌍 Loading env from: {env_path}")
-load_dotenv(dotenv_path=env_path)
-
-URL = os.environ.get("NEXT_PUBLIC_SUPABASE_URL") or os.environ.get("SUPABASE_URL")
-KEY = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY") or os.environ.get("SUPABASE_KEY")
-
-if not URL or not KEY:
-    print("❌ ERREUR: Variables d'environnement manquantes (SUPABASE_URL / KEY).")
-    exit(1)
-
-Headers = {
-    "apikey": KEY,
-    "Authorization": f"Bearer {KEY}",
-    "Content-Type": "application/json",
-    "Prefer": "resolution=merge-duplicates"
-}
+def connect():
+    """Client Supabase à partir du .env trouvé (rien n'est fait à l'import), None si clés absentes"""
+    env_path = find_env_path()
+    print(f"🌍 Loading env from: {env_path}")
+    load_dotenv(dotenv_path=env_path)
 
-ENDPOINT = f"{URL}/rest/v1/nba_standings"
+    url = os.environ.get("NEXT_PUBLIC_SUPABASE_URL") or os.environ.get("SUPABASE_URL")
+    key = os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY") or os.environ.get("SUPABASE_KEY")
+    return supabase_client.get_client(url, key)
 
 def sync_standings():
+    """Pousse le classement courant ; retourne True si l'envoi a réussi"""
+    client = connect()
+    if client is None:
+        print("❌ ERREUR: Variables d'environnement manquantes (SUPABASE_URL / KEY).")
+        return False
+
     print("🏀 Récupération des classements NBA via nba_api...")
     
-    # Get full team names mapping
-    nba_teams = teams.get_teams()
-    team_map = {t['id']: t['full_name'] for t in nba_teams}
-    
     try:
-        standings = leaguestandingsv3.LeagueStandingsV3()
+        standings = nba_cache.fetch(leaguestandingsv3.LeagueStandingsV3)
         df = standings.standings.get_data_frame()
     except Exception as e:
         print(f"❌ Erreur nba_api: {e}")
-        return
+        return False
 
     if df.empty:
         print("⚠️ Aucune donnée de classement trouvée.")
-        return
+        return False
 
     records_to_upsert = []
     
@@ -65,7 +62,7 @@ def sync_standings():
         team_id = int(row['TeamID'])
         
         # Get FULL team name (e.g., "Oklahoma City Thunder" not "Thunder")
-        full_name = team_map.get(team_id, row['TeamName'])
+        full_name = teams_registry.full_name(team_id, default=row['TeamName'])
         
         # Parsing Streak
         streak_origin = row['CurrentStreak']
@@ -91,13 +88,14 @@ def sync_standings():
     print(f"🚀 Envoi de {len(records_to_upsert)} lignes vers Supabase...")
     
     try:
-        r = requests.post(ENDPOINT, headers=Headers, data=json.dumps(records_to_upsert))
-        if r.status_code in [200, 201, 204]:
-            print("✅ Succès !")
-        else:
-            print(f"⚠️ Erreur {r.status_code} - {r.text}")
+        client.upsert(TABLE, records_to_upsert, on_conflict=KEY_FIELDS)
+        print("✅ Succès !")
+        return True
+    except requests.HTTPError as e:
+        print(f"⚠️ Erreur {e.response.status_code} - {e.response.text}")
     except Exception as e:
         print(f"❌ Erreur réseau: {e}")
+    return False
 
 if __name__ == "__main__":
-    sync_standings()
+    sys.exit(0 if sync_standings() else 1)
@@ -1,10 +1,9 @@
 import pandas as pd
-import xgboost as xgb
 from datetime import datetime
 from nba_api.stats.endpoints import scoreboardv2
-from nba_api.stats.static import teams
 import os
 import csv
+from src import predictor, prediction_cache, nba_cache, teams_registry
 
 # --- CONFIGURATION ---
 TARGET_DATE = datetime.now().strftime('%Y-%m-%d')
@@ -16,14 +15,14 @@ print(f"Date cible : {TARGET_DATE}")
 # 1. Chargement
 print("Chargement du cerveau et de l'historique...")
 try:
-    model = xgb.XGBClassifier()
-    model.load_model("nba_predictor.json")
+    model = predictor.load_model("nba_predictor.json")
+    if model is None: raise FileNotFoundError("nba_predictor.json")
     
-    df_history = pd.read_csv('nba_games_ready.csv')
-    df_history['GAME_DATE'] = pd.to_datetime(df_history['GAME_DATE'])
+    team_state = predictor.load_team_state()
+    if team_state is None: raise FileNotFoundError(predictor.TEAM_STATE_FILE)
+    cache = prediction_cache.PredictionCache()
     
-    nba_teams = teams.get_teams()
-    team_lookup = {team['id']: team['abbreviation'] for team in nba_teams}
+    team_lookup = {team.id: team.code for team in teams_registry.TEAMS}
     
 except Exception as e:
     print(f"❌ Erreur critique de chargement : {e}")
@@ -44,17 +43,15 @@ def save_to_history(date, home, away, winner, conf, model_type="Auto"):
 def get_team_stats(team_abbr_or_id, target_date_str):
     if str(team_abbr_or_id).isdigit():
         team_id = int(team_abbr_or_id)
-        team_games = df_history[df_history['TEAM_ID'] == team_id].sort_values('GAME_DATE')
         team_name = team_lookup.get(team_id, str(team_id))
     else:
-        team_abbr = str(team_abbr_or_id).upper()
-        team_games = df_history[df_history['MATCHUP'].str.contains(team_abbr)].sort_values('GAME_DATE')
-        team_name = team_abbr
+        team_name = str(team_abbr_or_id).upper()
+        team_id = predictor.find_team_id(team_state, team_name)
 
-    if len(team_games) == 0:
+    last_game = predictor.get_team_row(team_state, team_id)
+    if last_game is None:
         return None
         
-    last_game = team_games.iloc[-1]
     last_game_date = last_game['GAME_DATE']
     
     target_date = pd.to_datetime(target_date_str)
@@ -62,6 +59,7 @@ def get_team_stats(team_abbr_or_id, target_date_str):
     
     # ICI : On récupère les Four Factors au lieu des Points
     return {
+        'TEAM_ID': team_id,
         'NAME': team_name,
         'EFG_PCT_LAST_5': last_game['EFG_PCT_LAST_5'],
         'TOV_PCT_LAST_5': last_game['TOV_PCT_LAST_5'],
@@ -71,11 +69,24 @@ def get_team_stats(team_abbr_or_id, target_date_str):
         'LAST_GAME_DATE': last_game_date
     }
 
-def make_prediction(home_id_or_name, away_id_or_name, mode="Auto"):
-    stats_home = get_team_stats(home_id_or_name, TARGET_DATE)
-    stats_away = get_team_stats(away_id_or_name, TARGET_DATE)
-    
-    if stats_home and stats_away:
+def make_predictions(matchups, mode="Auto"):
+    """matchups : liste de (domicile, extérieur) en id ou abréviation. Un seul appel au modèle."""
+    ready = []
+    for home_id_or_name, away_id_or_name in matchups:
+        stats_home = get_team_stats(home_id_or_name, TARGET_DATE)
+        stats_away = get_team_stats(away_id_or_name, TARGET_DATE)
+        if stats_home and stats_away:
+            ready.append((stats_home, stats_away))
+        else:
+            print(f"❌ Données manquantes pour {home_id_or_name} ou {away_id_or_name}")
+
+    if not ready: return []
+
+    # Les features sont construites par predictor.py (mêmes colonnes que train_nba.py)
+    probs = predictor.predict_slate(model, team_state, [(h['TEAM_ID'], a['TEAM_ID'], TARGET_DATE) for h, a in ready], cache=cache)
+
+    results = []
+    for (stats_home, stats_away), prob_home in zip(ready, probs['PROB_HOME']):
         home_name = stats_home['NAME']
         away_name = stats_away['NAME']
         
@@ -85,27 +96,6 @@ def make_prediction(home_id_or_name, away_id_or_name, mode="Auto"):
         if stats_home['DAYS_REST'] <= 1: print(f"  ⚠️ FATIGUE : {home_name} est en Back-to-back !")
         if stats_away['DAYS_REST'] <= 1: print(f"  ⚠️ FATIGUE : {away_name} est en Back-to-back !")
         
-        # MISE À JOUR : On construit le DataFrame avec les Four Factors
-        # Cela doit correspondre EXACTEMENT aux colonnes de train_nba.py
-        input_data = pd.DataFrame([{
-            'EFG_PCT_LAST_5_HOME': stats_home['EFG_PCT_LAST_5'],
-            'EFG_PCT_LAST_5_AWAY': stats_away['EFG_PCT_LAST_5'],
-            'TOV_PCT_LAST_5_HOME': stats_home['TOV_PCT_LAST_5'],
-            'TOV_PCT_LAST_5_AWAY': stats_away['TOV_PCT_LAST_5'],
-            'ORB_RAW_LAST_5_HOME': stats_home['ORB_RAW_LAST_5'],
-            'ORB_RAW_LAST_5_AWAY': stats_away['ORB_RAW_LAST_5'],
-            
-            'DIFF_EFG': stats_home['EFG_PCT_LAST_5'] - stats_away['EFG_PCT_LAST_5'],
-            'DIFF_TOV': stats_home['TOV_PCT_LAST_5'] - stats_away['TOV_PCT_LAST_5'],
-            'DIFF_ORB': stats_home['ORB_RAW_LAST_5'] - stats_away['ORB_RAW_LAST_5'],
-            'DIFF_WIN': stats_home['WIN_LAST_5'] - stats_away['WIN_LAST_5'],
-            'DIFF_REST': stats_home['DAYS_REST'] - stats_away['DAYS_REST']
-        }])
-        
-        # Prédiction
-        probs = model.predict_proba(input_data)[0]
-        prob_home = probs[1]
-        
         if prob_home > 0.5:
             conf = prob_home * 100
             winner = home_name
@@ -116,24 +106,25 @@ def make_prediction(home_id_or_name, away_id_or_name, mode="Auto"):
             print(f"🏆 VAINQUEUR : {away_name} ({conf:.1f}%)")
             
         save_to_history(TARGET_DATE, home_name, away_name, winner, conf, mode)
-        return winner, conf
-    else:
-        print(f"❌ Données manquantes pour {home_id_or_name} ou {away_id_or_name}")
-        return None, None
+        results.append((winner, conf))
+    return results
+
+def make_prediction(home_id_or_name, away_id_or_name, mode="Auto"):
+    results = make_predictions([(home_id_or_name, away_id_or_name)], mode)
+    return results[0] if results else (None, None)
 
 # --- BOUCLES D'EXÉCUTION ---
 
 print("\n🔄 Tentative automatique...")
 try:
-    board = scoreboardv2.ScoreboardV2(game_date=TARGET_DATE, timeout=5)
+    board = nba_cache.fetch(scoreboardv2.ScoreboardV2, game_date=TARGET_DATE, timeout=5)
     games = board.game_header.get_data_frame()
     games = games.dropna(subset=['HOME_TEAM_ID', 'VISITOR_TEAM_ID'])
     
     if len(games) > 0:
         print(f"✅ {len(games)} matchs trouvés via l'API !\n")
-        for _, game in games.iterrows():
-            make_prediction(game['HOME_TEAM_ID'], game['VISITOR_TEAM_ID'], "Auto")
-            print("-" * 20)
+        make_predictions(list(zip(games['HOME_TEAM_ID'], games['VISITOR_TEAM_ID'])), "Auto")
+        print("-" * 20)
     else:
         print("⚠️ Aucun match trouvé automatiquement.")
 except Exception as e:
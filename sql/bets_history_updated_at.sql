@@ -0,0 +1,25 @@
+-- Colonne updated_at de bets_history, tenue à jour par la base (pas par les clients).
+-- Utilisée par src/pull_votes.py et src/cloud_history.py pour les pulls incrémentaux :
+-- sans le trigger, un vote (PATCH / upsert) ne changerait pas updated_at et ne serait jamais relu.
+-- À exécuter une fois dans l'éditeur SQL Supabase (idempotent).
+
+alter table public.bets_history
+    add column if not exists updated_at timestamptz not null default now();
+
+create or replace function public.set_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at = now();
+    return new;
+end;
+$$;
+
+drop trigger if exists bets_history_set_updated_at on public.bets_history;
+create trigger bets_history_set_updated_at
+    before update on public.bets_history
+    for each row execute function public.set_updated_at();
+
+-- Filtre updated_at=gte.<high water> des pulls incrémentaux
+create index if not exists bets_history_updated_at_idx on public.bets_history (updated_at);
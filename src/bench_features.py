@@ -0,0 +1,105 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Permet l'exécution directe (python src/bench_features.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import features_nba
+
+# --- CHEMINS ---
+SOURCE_FILE = "data/nba_games.csv"
+
+# --- CONFIG ---
+ROWS_PER_SEASON = 2460  # 1230 matchs x 2 équipes
+
+def build_history(n_seasons):
+    """Historique multi-saisons : le CSV réel recopié bout à bout puis tronqué à n saisons"""
+    base = pd.read_csv(SOURCE_FILE, dtype={'GAME_ID': str})
+    base['GAME_DATE'] = pd.to_datetime(base['GAME_DATE'])
+    span = base['GAME_DATE'].max() - base['GAME_DATE'].min() + pd.Timedelta(days=1)
+    n_copies = -(-n_seasons * ROWS_PER_SEASON // len(base))
+    copies = []
+    for k in range(n_copies):
+        c = base.copy()
+        c['GAME_DATE'] = c['GAME_DATE'] - span * k
+        copies.append(c)
+    history = pd.concat(copies).sort_values('GAME_DATE', kind='stable')
+    return history.tail(n_seasons * ROWS_PER_SEASON)
+
+def timed(func, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+def bench_incremental(n_seasons, windows, spans):
+    """Ajout d'une soirée : recalcul complet vs moteur incrémental (sorties comparées à l'octet)"""
+    history = build_history(n_seasons)
+    last_night = history['GAME_DATE'].max()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        p = lambda name: os.path.join(tmp, name)
+        history[history['GAME_DATE'] < last_night].to_csv(p("games_yesterday.csv"), index=False)
+        history.to_csv(p("games_today.csv"), index=False)
+
+        # État "hier" puis ajout de la dernière soirée en incrémental
+        os.makedirs(p("inc")); os.makedirs(p("full"))
+        features_nba.build_features(p("games_yesterday.csv"), p("inc/ready.csv"), p("inc/state.json"),
+                                    full=True, windows=windows, spans=spans)
+        t_inc, _ = timed(features_nba.build_features, p("games_today.csv"), p("inc/ready.csv"), p("inc/state.json"),
+                         windows=windows, spans=spans)
+
+        # Référence : recalcul complet sur le même historique
+        t_full, _ = timed(features_nba.build_features, p("games_today.csv"), p("full/ready.csv"), p("full/state.json"),
+                          full=True, windows=windows, spans=spans)
+
+        identical = True
+        for name in ["ready.csv", os.path.basename(features_nba.TEAM_STATE_FILE)]:
+            with open(p("inc/" + name), 'rb') as a, open(p("full/" + name), 'rb') as b:
+                identical = identical and a.read() == b.read()
+
+    return len(history), t_full, t_inc, 'OUI' if identical else 'NON'
+
+def groupby_lambda(df, windows, spans):
+    """Ancienne méthode : un transform(lambda) par équipe, par facteur et par fenêtre"""
+    out = {}
+    for factor in features_nba.FACTORS:
+        for w in windows:
+            out[f"{factor}_LAST_{w}"] = df.groupby('TEAM_ID')[factor].transform(lambda x: x.shift(1).rolling(w).mean())
+        for s in spans:
+            out[f"{factor}_EWM_{s}"] = df.groupby('TEAM_ID')[factor].transform(lambda x: x.shift(1).ewm(span=s).mean())
+    return out
+
+def bench_kernel(n_seasons, windows, spans):
+    """Noyau vectorisé vs groupby().transform(lambda), écart max entre les deux"""
+    df = features_nba.add_four_factors(history_sorted(n_seasons))
+    t_old, ref = timed(groupby_lambda, df, windows, spans)
+    t_new, (res, _) = timed(features_nba.compute_features, df.copy(deep=False), windows=windows, spans=spans)
+    diff = max(np.nanmax(np.abs(ref[c] - res[c])) for c in ref)
+    return len(df), t_old, t_new, f"{diff:.1e}"
+
+def history_sorted(n_seasons):
+    return build_history(n_seasons).sort_values(by=['TEAM_ID', 'GAME_DATE'])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark du calcul des features")
+    parser.add_argument('--mode', choices=['incremental', 'kernel'], default='incremental')
+    parser.add_argument('--seasons', type=int, nargs='+', default=[2, 5, 10, 20, 40])
+    parser.add_argument('--windows', type=int, nargs='+', default=features_nba.WINDOWS)
+    parser.add_argument('--ewm', type=int, nargs='*', default=features_nba.EWM_SPANS)
+    args = parser.parse_args()
+
+    if args.mode == 'incremental':
+        bench, labels = bench_incremental, ('complet', 'increm.', 'identique')
+    else:
+        bench, labels = bench_kernel, ('lambda', 'noyau', 'ecart max')
+
+    results = [bench(n, args.windows, args.ewm) for n in args.seasons]
+
+    print(f"\n--- RESULTATS ({args.mode}, fenetres {args.windows}, ewm {args.ewm}) ---")
+    print(f"{'saisons':>7} | {'lignes':>7} | {labels[0]:>9} | {labels[1]:>9} | {'gain':>6} | {labels[2]}")
+    for n, (n_rows, t_ref, t_new, check) in zip(args.seasons, results):
+        print(f"{n:>7} | {n_rows:>7} | {t_ref:>8.3f}s | {t_new:>8.3f}s | {t_ref / t_new:>5.1f}x | {check}")
@@ -0,0 +1,95 @@
+import pandas as pd
+import numpy as np
+import argparse
+import itertools
+import os
+import subprocess
+import sys
+import time
+
+# Permet l'exécution directe (python src/bench_predict.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import predictor
+
+def load_wrapper(path):
+    """Chemin historique : XGBClassifier (wrapper sklearn) + predict_proba sur DataFrame"""
+    import xgboost as xgb
+    model = xgb.XGBClassifier()
+    model.load_model(path)
+    return model
+
+def build_games(team_state, n_games):
+    """n affiches (home, away, date) tirées de toutes les paires d'équipes connues"""
+    pairs = list(itertools.permutations(team_state.index, 2))
+    date = (team_state['GAME_DATE'].max() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+    return [(h, a, date) for h, a in itertools.islice(itertools.cycle(pairs), n_games)]
+
+def latencies(func, repeat):
+    """Durées (ms) de `repeat` appels, après un appel de chauffe"""
+    func()
+    out = np.empty(repeat)
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        out[i] = (time.perf_counter() - t0) * 1000
+    return out
+
+def bench(wrapper, booster, ensemble, X, repeat):
+    """p50/p99 wrapper vs booster natif vs évaluateur NumPy sur la même matrice, et écarts max"""
+    X_np = np.ascontiguousarray(X, dtype=np.float32)
+    ref = wrapper.predict_proba(X)[:, 1]
+    t_old = latencies(lambda: wrapper.predict_proba(X)[:, 1], repeat)
+    t_new = latencies(lambda: booster.inplace_predict(X_np), repeat)
+    t_np = latencies(lambda: ensemble.predict(X_np), repeat)
+    diff = np.max(np.abs(ref - predictor.predict_proba_home(booster, X)))
+    diff_np = np.max(np.abs(ref - predictor.predict_proba_home(ensemble, X)))
+    return t_old, t_new, t_np, diff, diff_np
+
+# Démarrage à froid : nouvel interpréteur, import + chargement du modèle + une prédiction
+STARTUP_SNIPPETS = {
+    'xgboost': "import pandas as pd; import xgboost as xgb; from src import predictor; m = xgb.XGBClassifier(); "
+               "m.load_model({path!r}); m.predict_proba(pd.DataFrame([[0.0] * 11], columns=predictor.FEATURES))",
+    'numpy': "import pandas as pd; from src import predictor; m = predictor.load_model({path!r}); "
+             "predictor.predict_proba_home(m, pd.DataFrame([[0.0] * 11], columns=predictor.FEATURES))",
+}
+
+def bench_startup(path, repeat):
+    """Médiane (ms) du démarrage à froid pour chaque chemin"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = {}
+    for name, snippet in STARTUP_SNIPPETS.items():
+        code = snippet.format(path=path)
+        out[name] = np.median(latencies(lambda: subprocess.run([sys.executable, "-c", code], cwd=root, check=True), repeat))
+    return out
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de latence de prédiction")
+    parser.add_argument('--mode', choices=['latency', 'startup'], default='latency')
+    parser.add_argument('--model', default=predictor.MODEL_FILE)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 15, 100, 870])
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    if args.mode == 'startup':
+        res = bench_startup(args.model, min(args.repeat, 10))
+        print(f"\n--- DEMARRAGE A FROID (import + chargement + 1 prédiction, médiane) ---")
+        for name, t in res.items():
+            print(f"{name:>8} : {t:>7.0f} ms")
+        print(f"{'gain':>8} : {res['xgboost'] / res['numpy']:>6.1f}x")
+        exit(0)
+
+    team_state = predictor.load_team_state()
+    if team_state is None:
+        print(f"❌ Erreur : {predictor.TEAM_STATE_FILE} introuvable.")
+        exit(1)
+    wrapper, booster = load_wrapper(args.model), predictor.load_booster(args.model)
+    ensemble = predictor.load_model(args.model)
+
+    print(f"\n--- RESULTATS ({args.repeat} appels par taille, en ms) ---")
+    print(f"{'matchs':>6} | {'wrap p50':>8} | {'wrap p99':>8} | {'nat. p50':>8} | {'nat. p99':>8} | "
+          f"{'np p50':>8} | {'np p99':>8} | {'ecart nat.':>10} | ecart np")
+    for n in args.sizes:
+        X, _ = predictor.build_feature_matrix(team_state, build_games(team_state, n))
+        t_old, t_new, t_np, diff, diff_np = bench(wrapper, booster, ensemble, X, args.repeat)
+        p = [np.percentile(t, [50, 99]) for t in (t_old, t_new, t_np)]
+        print(f"{n:>6} | " + " | ".join(f"{v[0]:>8.3f} | {v[1]:>8.3f}" for v in p) + f" | {diff:>10.1e} | {diff_np:.1e}")
@@ -1,9 +1,60 @@
+import os
+import re
 import sys
 from datetime import datetime, timedelta
-from nba_api.stats.endpoints import leaguegamefinder
+from zoneinfo import ZoneInfo
+from nba_api.stats.endpoints import leaguegamefinder, scoreboardv2
 import pandas as pd
 
+# Permet l'exécution directe (python src/check_status.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import nba_cache
+
+# --- CONFIG ---
+ET = ZoneInfo("America/New_York")
+NIGHT_CUTOFF_HOUR = 6     # une soirée NBA (heure de New York) se termine au plus tard à 6h
+TIP_RE = re.compile(r'(\d{1,2}):(\d{2})\s*([ap]m)', re.IGNORECASE)
+# Match reporté / annulé : ScoreboardV2 le laisse en GAME_STATUS_ID 1 avec ce texte, il ne sera jamais fini
+CALLED_OFF_RE = re.compile(r'\bppd\b|postpon|cancel', re.IGNORECASE)
+
+def current_night(now=None):
+    """Date (heure de New York) de la soirée en cours ou qui vient de se terminer"""
+    now = now or datetime.now(ET)
+    return (now.astimezone(ET) - timedelta(hours=NIGHT_CUTOFF_HOUR)).date()
+
+def parse_tip(night, status_text):
+    """Heure d'entre-deux d'un match programmé ('7:30 pm ET'), ou None (match commencé / fini)"""
+    m = TIP_RE.search(str(status_text))
+    if not m: return None
+    hour = int(m.group(1)) % 12 + (12 if m.group(3).lower() == 'pm' else 0)
+    return datetime(night.year, night.month, night.day, hour, int(m.group(2)), tzinfo=ET)
+
+def night_status(night, max_age=None):
+    """État des matchs d'une soirée via ScoreboardV2 (GAME_STATUS_ID 1 = à venir, 2 = en cours, 3 = fini).
+
+    Un match reporté ou annulé (statut 1, texte 'PPD' / 'Postponed' / 'Cancelled') compte dans
+    `called_off` et non dans `scheduled` : la soirée est réglée quand final + called_off == total.
+    Retourne un dict : total, scheduled, live, final, called_off, settled, game_ids (tous les matchs),
+    final_ids (matchs finis) et tips {GAME_ID: heure d'entre-deux}.
+    """
+    board = nba_cache.fetch(scoreboardv2.ScoreboardV2, max_age=max_age, game_date=night.strftime('%Y-%m-%d'))
+    games = board.game_header.get_data_frame().drop_duplicates(subset=['GAME_ID'])
+    status = games['GAME_STATUS_ID'].astype(int)
+    called_off = (status == 1) & games['GAME_STATUS_TEXT'].astype(str).str.contains(CALLED_OFF_RE)
+    scheduled = (status == 1) & ~called_off
+    tips = {gid: parse_tip(night, txt) for gid, txt, st in zip(games['GAME_ID'], games['GAME_STATUS_TEXT'], scheduled) if st}
+    final = status == 3
+    return {
+        'total': len(games), 'scheduled': int(scheduled.sum()),
+        'live': int((status == 2).sum()), 'final': int(final.sum()),
+        'called_off': int(called_off.sum()), 'settled': int((final | called_off).sum()),
+        'game_ids': list(games['GAME_ID'].astype(str)),
+        'final_ids': list(games.loc[final, 'GAME_ID'].astype(str)),
+        'tips': {gid: tip for gid, tip in tips.items() if tip is not None},
+    }
+
 def check_nba_status():
+    """Contrôle des matchs d'hier : True si tout est fini (ou aucun match), False sinon, None si API muette"""
     # 1. Date cible : Hier
     yesterday = datetime.now() - timedelta(days=1)
     date_str = yesterday.strftime('%m/%d/%Y') # Format requis par GameFinder (MM/DD/YYYY)
@@ -15,7 +66,7 @@ def check_nba_status():
     try:
         # 2. Recherche des matchs joués à cette date précise
         # C'est la même méthode que ton script de mise à jour, donc 100% aligné.
-        gamefinder = leaguegamefinder.LeagueGameFinder(
+        gamefinder = nba_cache.fetch(leaguegamefinder.LeagueGameFinder,
             date_from_nullable=date_str,
             date_to_nullable=date_str,
             league_id_nullable='00' # 00 = NBA
@@ -25,7 +76,7 @@ def check_nba_status():
         if games.empty:
             print(f"[INFO] Aucun match trouvé pour le {date_disp}.")
             print(">> FEU VERT (Rien à faire).")
-            return
+            return True
 
         # On a souvent 2 lignes par match (Home et Away), on dédoublonne par GAME_ID
         unique_games = games.drop_duplicates(subset=['GAME_ID'])
@@ -57,14 +108,17 @@ def check_nba_status():
         if finished_games >= total_games and total_games > 0:
             print("\n>>> FEU VERT : TOUT EST PRET <<<")
             print("Tu peux lancer GO_NBA.bat")
+            return True
         elif finished_games == 0:
             print("\n>>> FEU ROUGE : AUCUN RÉSULTAT <<<")
         else:
             print(f"\n>>> FEU ORANGE : {finished_games}/{total_games} terminés <<<")
             print("Certains scores manquent encore.")
+        return False
 
     except Exception as e:
         print(f"[ERREUR] API inaccessible : {e}")
+        return None   # état inconnu : on ne bloque pas la routine
 
 if __name__ == "__main__":
-    check_nba_status()
\ No newline at end of file
+    sys.exit(1 if check_nba_status() is False else 0)
\ No newline at end of file
@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+
+# Copie locale de la table bets_history pour l'app. Le premier chargement lit la table
+# (colonnes utiles seulement, page par page), ensuite on ne redemande que les lignes dont
+# updated_at a bougé depuis le dernier passage : un vote ou un pari auto ne relance plus
+# le téléchargement de tout l'historique.
+# Les écritures de l'app passent aussi par ici (write-through) : la ligne est appliquée tout
+# de suite à la copie locale, envoyée en arrière-plan, puis remplacée par la version du serveur
+# (ou annulée si l'envoi échoue).
+
+# --- CONFIG ---
+TABLE = "bets_history"
+KEY_FIELDS = ('game_date', 'home_team', 'away_team')   # contrainte unique (cf. sync_cloud)
+UPDATED_COL = "updated_at"   # tenue à jour par un trigger (sql/bets_history_updated_at.sql)
+FULL_RELOAD_EVERY = 30 * 60   # secondes : rechargement complet (lignes supprimées côté cloud)
+
+# Colonnes cloud lues par onglet
+MATCHS_COLUMNS = ('game_date', 'home_team', 'away_team', 'predicted_winner', 'confidence',
+                  'user_prediction', 'user_reason', 'result_ia', 'real_winner', 'user_result')
+STATS_COLUMNS = ('game_date', 'home_team', 'away_team', 'predicted_winner', 'confidence', 'type',
+                 'result_ia', 'real_winner', 'user_prediction', 'user_result', 'user_reason')
+# Projection de la copie locale : union des deux onglets, choix délibéré. Les onglets partagent
+# la même copie (un seul delta, un seul index) et ne diffèrent que par `type` ; deux copies
+# projetées séparément doubleraient les requêtes pour quelques octets par ligne.
+APP_COLUMNS = tuple(dict.fromkeys(MATCHS_COLUMNS + STATS_COLUMNS))
+
+# Colonnes cloud -> colonnes de l'app
+RENAME_MAP = {
+    'game_date': 'Date', 'home_team': 'Home', 'away_team': 'Away',
+    'predicted_winner': 'Predicted_Winner', 'confidence': 'Confidence',
+    'result_ia': 'Result', 'real_winner': 'Real_Winner',
+    'user_prediction': 'User_Prediction', 'user_result': 'User_Result',
+    'user_reason': 'User_Reason', 'type': 'Type'
+}
+
+class CloudHistory:
+    """Lignes de bets_history indexées par (date, domicile, extérieur), rafraîchies par delta.
+
+    `version` n'augmente que si une ligne a réellement changé : l'appelant peut garder ce
+    qu'il a construit à partir de frame() tant que la version est la même.
+    Sans colonne updated_at côté cloud, chaque refresh refait un chargement complet.
+    Les insertions partent une par une, dans l'ordre, sur un thread dédié ;
+    les échecs sont gardés dans `errors` jusqu'à ce que l'appelant les lise (pop_errors).
+    """
+    def __init__(self, client, columns=STATS_COLUMNS, table=TABLE):
+        self.client, self.table = client, table
+        self.columns = list(dict.fromkeys([*KEY_FIELDS, *columns]))
+        self.rows = {}
+        self.high_water = None
+        self.incremental = True
+        self.loaded_at = 0.0
+        self.version = 0
+        self.errors = []
+        self.lock = threading.Lock()
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cloud-history")
+
+    def key(self, row):
+        return tuple(row.get(k) for k in KEY_FIELDS)
+
+    def fields(self):
+        return self.columns + [UPDATED_COL] if self.incremental else self.columns
+
+    def project(self, row):
+        """Ligne réduite aux colonnes de la copie locale (comme celles lues par select)"""
+        return {c: row.get(c) for c in self.fields()}
+
+    def select(self, **params):
+        return self.client.select(self.table, columns=",".join(self.fields()), **params)
+
+    def full_reload(self):
+        # Ordre sur la clé unique : pagination stable même si la table bouge entre deux pages
+        order = ",".join(f"{k}.asc" for k in KEY_FIELDS)
+        try:
+            rows = self.select(order=order)
+        except requests.HTTPError:
+            if not self.incremental: raise
+            print(f"[CLOUD] Pas de colonne {UPDATED_COL} sur {self.table} : chargements complets uniquement.")
+            self.incremental = False
+            rows = self.select(order=order)
+
+        self.rows = {self.key(r): r for r in rows}
+        marks = [r[UPDATED_COL] for r in rows if r.get(UPDATED_COL)]
+        self.high_water = max(marks) if marks else None
+        self.loaded_at = time.time()
+        self.version += 1
+        return len(rows)
+
+    def fetch_changes(self):
+        # gte : une ligne écrite dans la même milliseconde que le high water n'est pas perdue
+        # Clé unique en second tri : pagination stable quand plusieurs lignes partagent un updated_at
+        order = ",".join([f"{UPDATED_COL}.asc"] + [f"{k}.asc" for k in KEY_FIELDS])
+        rows = self.select(filters={UPDATED_COL: f"gte.{self.high_water}"}, order=order)
+        changed = 0
+        for r in rows:
+            k = self.key(r)
+            if self.rows.get(k) != r:
+                self.rows[k] = r
+                changed += 1
+        self.high_water = max((r[UPDATED_COL] for r in rows if r.get(UPDATED_COL)), default=self.high_water)
+        if changed: self.version += 1
+        return changed
+
+    def refresh(self):
+        """Met la copie locale à jour ; retourne le nombre de lignes chargées (complet) ou modifiées (delta)"""
+        with self.lock:
+            stale = time.time() - self.loaded_at > FULL_RELOAD_EVERY
+            if not self.incremental or self.high_water is None or stale:
+                return self.full_reload()
+            return self.fetch_changes()
+
+    def write_through(self, key, optimistic, send, description):
+        """Applique `optimistic` (ou rien si None) à la clé, puis envoie `send()` en arrière-plan"""
+        with self.lock:
+            previous = self.rows.get(key)
+            if optimistic is not None:
+                self.rows[key] = optimistic
+                self.version += 1
+        future = self.writer.submit(send)
+        future.add_done_callback(lambda f: self.reconcile(key, previous, optimistic, f, description))
+        return future
+
+    def reconcile(self, key, previous, optimistic, future, description):
+        # Le high water ne bouge pas : le prochain delta relira cette ligne, identique, sans nouvelle version
+        error = future.exception()
+        with self.lock:
+            if error is None:
+                for r in future.result() or []:
+                    row = self.project(r)
+                    if self.rows.get(self.key(row)) != row:
+                        self.rows[self.key(row)] = row
+                        self.version += 1
+            else:
+                # Annulation seulement si personne n'a réécrit la ligne entre-temps
+                if optimistic is not None and self.rows.get(key) is optimistic:
+                    if previous is None: del self.rows[key]
+                    else: self.rows[key] = previous
+                    self.version += 1
+                self.errors.append(f"{description} : {error}")
+
+    def apply_local(self, key_values, payload):
+        """Applique un changement à la copie locale seulement (ex : vote encore dans la file d'envoi)"""
+        key = tuple(key_values)
+        with self.lock:
+            current = self.rows.get(key)
+            if current is None: return False
+            row = self.project({**current, **payload})
+            if row == current: return False
+            self.rows[key] = row
+            self.version += 1
+            return True
+
+    def insert(self, row):
+        """Ajoute une ligne (colonnes cloud) ; retourne le Future de l'envoi"""
+        key = self.key(row)
+        send = lambda: self.client.insert(self.table, row, returning=True)
+        return self.write_through(key, self.project(row), send, f"Ajout {' / '.join(key)}")
+
+    def pop_errors(self):
+        with self.lock:
+            errors, self.errors = self.errors, []
+        return errors
+
+    def frame(self):
+        """DataFrame avec les noms de colonnes de l'app (sans updated_at)"""
+        with self.lock:
+            rows = list(self.rows.values())
+        if not rows: return pd.DataFrame()
+        return pd.DataFrame(rows, columns=self.columns).rename(columns=RENAME_MAP)
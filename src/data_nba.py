@@ -1,30 +1,89 @@
 import pandas as pd
 from nba_api.stats.endpoints import leaguegamefinder
+import argparse
 import os
+import sys
+
+# Permet l'exécution directe (python src/data_nba.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import nba_cache
 
 # --- CHEMINS ---
 DATA_DIR = "data"
 FILE_PATH = os.path.join(DATA_DIR, "nba_games.csv")
 
-def get_nba_data():
+# --- CONFIG ---
+START_DATE = '2023-01-01'
+KEY_COLS = ['GAME_ID', 'TEAM_ID']
+
+def load_existing():
+    """Charge le CSV local (GAME_ID en texte pour garder les zéros de tête)"""
+    if not os.path.exists(FILE_PATH): return None
+    try:
+        df = pd.read_csv(FILE_PATH, dtype={'GAME_ID': str})
+        df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+        return df
+    except Exception as e:
+        print(f"[ATTENTION] CSV local illisible ({e}), rechargement complet.")
+        return None
+
+def fetch_games(date_from=None, max_age=None):
+    """Appel LeagueGameFinder (saison réguliere), optionnellement à partir d'une date.
+
+    Sans DateTo, la réponse est gardée TTL_DEFAULT (1h) par nba_cache : `max_age` (secondes)
+    resserre cette fraîcheur pour la routine, qui attend les matchs finis il y a quelques minutes.
+    """
+    params = {'league_id_nullable': '00', 'season_type_nullable': 'Regular Season', 'timeout': 60}
+    if date_from is not None:
+        params['date_from_nullable'] = date_from.strftime('%m/%d/%Y')
+    gamefinder = nba_cache.fetch(leaguegamefinder.LeagueGameFinder, max_age=max_age, **params)
+    games = gamefinder.get_data_frames()[0]
+    games['GAME_DATE'] = pd.to_datetime(games['GAME_DATE'])
+    return games[games['GAME_DATE'] > START_DATE]
+
+def merge_games(existing, new_games):
+    """Fusion idempotente : une ligne par (GAME_ID, TEAM_ID), la version API la plus récente gagne"""
+    new_games = new_games.astype({'GAME_ID': str})
+    merged = pd.concat([existing, new_games], ignore_index=True)
+    merged = merged.drop_duplicates(subset=KEY_COLS, keep='last')
+    return merged.sort_values('GAME_DATE', kind='stable')
+
+def get_nba_data(full_refresh=False, max_age=None):
+    """Met à jour data/nba_games.csv ; retourne True si succès (y compris sans nouveau match)"""
     print("--- Recuperation des donnees NBA ---")
-    
+
     # Création dossier data si inexistant
     if not os.path.exists(DATA_DIR): os.makedirs(DATA_DIR)
 
+    existing = None if full_refresh else load_existing()
+
     try:
-        gamefinder = leaguegamefinder.LeagueGameFinder(league_id_nullable='00', season_type_nullable='Regular Season', timeout=60)
-        games = gamefinder.get_data_frames()[0]
-        games['GAME_DATE'] = pd.to_datetime(games['GAME_DATE'])
-        games = games[games['GAME_DATE'] > '2023-01-01'].sort_values('GAME_DATE')
-        
+        if existing is None or existing.empty:
+            print("Mode : rechargement complet.")
+            games = fetch_games(max_age=max_age).sort_values('GAME_DATE')
+        else:
+            # On repart du dernier jour stocké (inclus) pour récupérer les matchs finis tard
+            watermark = existing['GAME_DATE'].max()
+            print(f"Mode : incremental depuis le {watermark.strftime('%Y-%m-%d')}.")
+            new_games = fetch_games(date_from=watermark, max_age=max_age)
+            print(f"{len(new_games)} lignes recues de l'API.")
+            if new_games.empty:
+                print("Aucun nouveau match, fichier inchange.")
+                return True
+            games = merge_games(existing, new_games)
+            print(f"{len(games) - len(existing)} nouvelles lignes ajoutees.")
+
         print(f"Succes ! {len(games)} matchs.")
         games.to_csv(FILE_PATH, index=False)
         print(f"Sauvegarde dans {FILE_PATH}")
-        
+        return True
+
     except Exception as e:
         print(f"[ERREUR] {e}")
-        exit(1)
+        return False
 
 if __name__ == "__main__":
-    get_nba_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Mise à jour de data/nba_games.csv")
+    parser.add_argument('--full-refresh', action='store_true', help="Retélécharge tout l'historique")
+    args = parser.parse_args()
+    sys.exit(0 if get_nba_data(full_refresh=args.full_refresh) else 1)
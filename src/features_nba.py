@@ -1,41 +1,322 @@
 import pandas as pd
 import numpy as np
+import argparse
+import hashlib
+import json
 import os
+import sys
 
 # --- CHEMINS ---
 INPUT_FILE = "data/nba_games.csv"
 OUTPUT_FILE = "data/nba_games_ready.csv"
+STATE_FILE = "data/features_state.json"
+TEAM_STATE_FILE = "data/team_state.csv"
 
-print("--- Calcul des FOUR FACTORS ---")
+# --- CONFIG ---
+FACTORS = ['EFG_PCT', 'TOV_PCT', 'FT_RATE', 'ORB_RAW', 'WIN']
+WINDOW = 5          # Fenêtre du modèle : les lignes sans *_LAST_5 complet sont écartées
+WINDOWS = [5]       # Fenêtres glissantes calculées (ex: 5 10 20)
+EWM_SPANS = []      # Moyennes exponentielles calculées (ex: 10)
+TEAM_COLS = ['TEAM_ID', 'TEAM_ABBREVIATION', 'TEAM_NAME', 'GAME_DATE']
 
-if not os.path.exists(INPUT_FILE):
-    print(f"[ERREUR] {INPUT_FILE} introuvable.")
-    exit(1)
-
-try:
-    df = pd.read_csv(INPUT_FILE)
+# --- CALCULS ---
+def load_games(input_file=INPUT_FILE):
+    df = pd.read_csv(input_file)
     df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
-    df['WIN'] = df['WL'].apply(lambda x: 1 if x == 'W' else 0)
-    df = df.sort_values(by=['TEAM_ID', 'GAME_DATE'])
+    return df.sort_values(by=['TEAM_ID', 'GAME_DATE'])
 
+def add_four_factors(df):
     # Calculs (Identiques à la v4)
+    df['WIN'] = df['WL'].apply(lambda x: 1 if x == 'W' else 0)
     df['EFG_PCT'] = (df['FGM'] + 0.5 * df['FG3M']) / df['FGA'].replace(0, np.nan)
     df['TOV_PCT'] = df['TOV'] / (df['FGA'] + 0.44 * df['FTA'] + df['TOV']).replace(0, np.nan)
     df['FT_RATE'] = df['FTM'] / df['FGA'].replace(0, np.nan)
     df['ORB_RAW'] = df['OREB']
+    return df
+
+def rolling_kernel(team_ids, values, windows=WINDOWS, spans=EWM_SPANS, tails=None, ewm_state=None):
+    """Moyennes glissantes et exponentielles décalées (match courant exclu), tous facteurs d'un coup.
+
+    `team_ids` (n,) doit être trié par équipe (puis date), `values` (n, F). Les équipes sont
+    rangées dans un tableau (équipes, historique + matchs, facteurs) : chaque fenêtre est une
+    somme de tranches décalées, dans l'ordre chronologique, et l'EWM une récurrence vectorisée
+    sur toutes les équipes. `tails` (T, max(windows), F) et `ewm_state` (2, S, T, F) reprennent
+    un état précédent : le calcul incrémental donne alors exactement les mêmes flottants.
+
+    Retourne (colonnes, nouvelles tails, nouvel ewm_state).
+    """
+    n, n_factors = values.shape
+    starts = np.flatnonzero(np.r_[True, team_ids[1:] != team_ids[:-1]]) if n else np.array([], dtype=int)
+    counts = np.diff(np.r_[starts, n])
+    n_teams = len(starts)
+    team_idx = np.repeat(np.arange(n_teams), counts)
+    pos = np.arange(n) - np.repeat(starts, counts)
+    h = max(windows) if windows else 0
+    length = counts.max() if n_teams else 0
+
+    padded = np.full((n_teams, h + length, n_factors), np.nan)
+    if tails is not None and h: padded[:, :h] = tails
+    padded[team_idx, h + pos] = values
+
+    columns = {}
+    for w in windows:
+        acc = padded[:, h - w:h - w + length].copy()
+        for i in range(1, w):
+            acc += padded[:, h - w + i:h - w + i + length]
+        columns[('LAST', w)] = (acc / w)[team_idx, pos]
+
+    # EWM (adjust=True, NaN ignorés) : num/den décroissent à chaque match, spans empilés.
+    # hist[..., j, :] = état avant le match j, donc hist[..., counts, :] = état final de l'équipe
+    new_ewm = None
+    if spans:
+        decay = 1 - 2 / (np.asarray(spans, dtype=float) + 1)
+        decay = decay[:, None, None]
+        x = padded[:, h:]
+        valid = ~np.isnan(x)
+        x = np.where(valid, x, 0.0)
+        hist = np.empty((2, len(spans), n_teams, length + 1, n_factors))
+        if ewm_state is not None: num, den = ewm_state[0].copy(), ewm_state[1].copy()
+        else: num, den = np.zeros((2, len(spans), n_teams, n_factors))
+        for j in range(length):
+            hist[0, :, :, j], hist[1, :, :, j] = num, den
+            num *= decay
+            num += x[:, j]
+            den *= decay
+            den += valid[:, j]
+        hist[0, :, :, length], hist[1, :, :, length] = num, den
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = np.where(hist[1] > 0, hist[0] / hist[1], np.nan)
+        for k, s in enumerate(spans):
+            columns[('EWM', s)] = out[k][team_idx, pos]
+        new_ewm = hist[:, :, np.arange(n_teams), counts]
+
+    new_tails = None
+    if h:
+        idx = counts[:, None] + np.arange(h)[None, :]
+        new_tails = padded[np.arange(n_teams)[:, None], idx]
+    return columns, new_tails, new_ewm
+
+def compute_features(df, teams_state=None, windows=WINDOWS, spans=EWM_SPANS):
+    """Ajoute les colonnes glissantes et DAYS_REST à df (trié TEAM_ID, GAME_DATE).
+
+    `teams_state` : état par équipe de l'exécution précédente (mis à jour sur place).
+    """
+    teams_state = {} if teams_state is None else teams_state
+    team_ids = df['TEAM_ID'].to_numpy()
+    unique_ids = pd.unique(team_ids)
+    h = max(windows) if windows else 0
+    previous = [teams_state.get(str(t)) for t in unique_ids]
+
+    tails = np.full((len(unique_ids), h, len(FACTORS)), np.nan)
+    ewm_state = np.zeros((2, len(spans), len(unique_ids), len(FACTORS)))
+    for i, p in enumerate(previous):
+        if not p: continue
+        if h: tails[i] = p['tail']
+        if spans: ewm_state[:, :, i] = p['ewm']
+
+    columns, new_tails, new_ewm = rolling_kernel(
+        team_ids, df[FACTORS].to_numpy(dtype=float), windows, spans, tails, ewm_state
+    )
+    for (kind, size), col in columns.items():
+        for i, factor in enumerate(FACTORS):
+            df[f"{factor}_{kind}_{size}"] = col[:, i]
+
+    # Premier match de chaque équipe : repos calculé depuis la date de l'état précédent
+    first = np.flatnonzero(np.r_[True, team_ids[1:] != team_ids[:-1]])
+    prev = df.groupby('TEAM_ID')['GAME_DATE'].shift(1)
+    prev.iloc[first] = pd.to_datetime([p['last_date'] if p else None for p in previous])
+    df['PREV_GAME_DATE'] = prev
+    df['DAYS_REST'] = (df['GAME_DATE'] - df['PREV_GAME_DATE']).dt.days.fillna(3).clip(upper=7).astype(float)
+
+    last_per_team = df.groupby('TEAM_ID', sort=False)['GAME_DATE'].agg(['max', 'size'])
+    for i, t in enumerate(unique_ids):
+        p = previous[i]
+        teams_state[str(t)] = {
+            'last_date': last_per_team.at[t, 'max'].strftime('%Y-%m-%d'),
+            'n_games': (p['n_games'] if p else 0) + int(last_per_team.at[t, 'size']),
+            'tail': new_tails[i].tolist() if h else [],
+            'ewm': new_ewm[:, :, i].tolist() if spans else []
+        }
+    return df, teams_state
+
+# --- EMPREINTES ---
+def team_digests(df):
+    """Empreinte du contenu brut de chaque équipe (toutes colonnes, lignes dans l'ordre du fichier).
+
+    Une ligne corrigée après coup (box score rectifié) garde le même nombre de matchs mais
+    change l'empreinte de son équipe.
+    """
+    if df.empty: return {}
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    team_ids = df['TEAM_ID'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, team_ids[1:] != team_ids[:-1]])
+    ends = np.r_[starts[1:], len(df)]
+    return {str(team_ids[a]): hashlib.sha1(row_hash[a:b].tobytes()).hexdigest() for a, b in zip(starts, ends)}
+
+# --- ETAT PERSISTANT ---
+def state_config(windows, spans):
+    return {'factors': FACTORS, 'window': WINDOW, 'windows': list(windows), 'spans': list(spans)}
+
+def load_state(state_file=STATE_FILE, windows=WINDOWS, spans=EWM_SPANS):
+    if not os.path.exists(state_file): return None
+    try:
+        with open(state_file, 'r') as f: state = json.load(f)
+    except Exception: return None
+    if any(state.get(k) != v for k, v in state_config(windows, spans).items()): return None
+    return state
+
+def save_state(state, state_file=STATE_FILE):
+    tmp = state_file + ".tmp"
+    with open(tmp, 'w') as f: json.dump(state, f)
+    os.replace(tmp, state_file)
+
+def to_csv_text(df):
+    return df.to_csv(index=False)
+
+# --- ETAT DES EQUIPES (pour les prédictions) ---
+def latest_team_state(df_ready):
+    """Dernière ligne exploitable de chaque équipe (30 lignes) : tout ce que lisent les prédictions"""
+    feature_cols = [c for c in df_ready.columns if '_LAST_' in c or '_EWM_' in c]
+    last = df_ready.sort_values(['TEAM_ID', 'GAME_DATE'], kind='stable').groupby('TEAM_ID').tail(1)
+    return last[TEAM_COLS + feature_cols]
+
+def read_team_rows(path):
+    df = pd.read_csv(path, float_precision='round_trip')
+    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+    return df
+
+def write_team_state(rows, team_state_file):
+    latest_team_state(rows).to_csv(team_state_file, index=False)
+
+def update_team_state(new_rows, team_state_file, output_file):
+    base = team_state_file if os.path.exists(team_state_file) else output_file
+    write_team_state(pd.concat([read_team_rows(base), new_rows]), team_state_file)
+
+# --- MODES ---
+def full_recompute(df, output_file, state_file, team_state_file, windows=WINDOWS, spans=EWM_SPANS):
+    digests = team_digests(df)
+    df = add_four_factors(df)
+    df, teams_state = compute_features(df, windows=windows, spans=spans)
+    for t, digest in digests.items(): teams_state[t]['digest'] = digest
+
+    df_final = df.dropna(subset=[f"{f}_LAST_{WINDOW}" for f in FACTORS])
+    text = to_csv_text(df_final)
+    with open(output_file, 'w', newline='') as f: f.write(text)
+    write_team_state(df_final, team_state_file)
+
+    state = state_config(windows, spans)
+    state.update({'teams': teams_state, 'output_size': os.path.getsize(output_file)})
+    save_state(state, state_file)
+    return len(df_final)
+
+def incremental_update(df, state, output_file, state_file, team_state_file, windows=WINDOWS, spans=EWM_SPANS):
+    """Ne calcule que les matchs postérieurs à l'état de chaque équipe, puis les insère.
+
+    Une équipe dont l'historique déjà traité a changé (box score corrigé, match ajouté ou retiré
+    en arrière) est recalculée entièrement depuis ses données brutes : ses features dépendent
+    seulement de ses propres matchs, le résultat est donc identique à un recalcul complet.
+    Retourne le nombre de lignes écrites, ou None si l'état n'est plus cohérent avec les
+    fichiers (sortie éditée, état d'une ancienne version...) : il faut alors tout recalculer.
+    """
+    if not os.path.exists(output_file) or os.path.getsize(output_file) != state.get('output_size'):
+        return None
+    teams_state = state['teams']
+    if any('digest' not in s for s in teams_state.values()): return None
+
+    last_dates = df['TEAM_ID'].map({int(k): pd.Timestamp(v['last_date']) for k, v in teams_state.items()})
+    is_old = df['GAME_DATE'] <= last_dates
+    old_counts = is_old.groupby(df['TEAM_ID']).sum()
+    old_digests = team_digests(df[is_old])
+    changed = {int(t) for t, s in teams_state.items()
+               if old_counts.get(int(t), 0) != s['n_games'] or old_digests.get(t) != s['digest']}
+
+    rebuilt = df['TEAM_ID'].isin(changed)
+    new_games = df[~is_old & ~rebuilt].copy()
+    if new_games.empty and not changed:
+        if not os.path.exists(team_state_file): write_team_state(read_team_rows(output_file), team_state_file)
+        return 0
+
+    parts = []
+    if not new_games.empty:
+        new_games = add_four_factors(new_games)
+        new_games, teams_state = compute_features(new_games, teams_state, windows, spans)
+        parts.append(new_games)
+    if changed:
+        print(f"[INFO] Historique modifié pour {len(changed)} équipe(s), recalcul de ces équipes.")
+        for t in changed: teams_state.pop(str(t), None)
+        if rebuilt.any():
+            team_games = add_four_factors(df[rebuilt].copy())
+            team_games, teams_state = compute_features(team_games, teams_state, windows, spans)
+            parts.append(team_games)
+    if not parts: return None
+    new_rows = pd.concat(parts).dropna(subset=[f"{f}_LAST_{WINDOW}" for f in FACTORS])
+    touched = df['TEAM_ID'].isin(new_games['TEAM_ID'].unique()) | rebuilt
+    for t, digest in team_digests(df[touched]).items():
+        teams_state[t]['digest'] = digest
+
+    # Insertion texte : chaque ligne existante est conservée à l'octet près, les nouvelles lignes
+    # vont à la fin du bloc de leur équipe (fichier trié TEAM_ID, GAME_DATE) ; le bloc d'une
+    # équipe recalculée est remplacé en entier
+    with open(output_file, 'r', newline='') as f: lines = f.read().splitlines(keepends=True)
+    new_text = to_csv_text(new_rows)
+    new_lines = new_text.splitlines(keepends=True)
+    if not lines or lines[0] != new_lines[0]: return None
+
+    blocks = {}
+    for line in lines[1:]:
+        team = int(line.split(',', 2)[1])
+        if team not in changed: blocks.setdefault(team, []).append(line)
+    for line in new_lines[1:]:
+        blocks.setdefault(int(line.split(',', 2)[1]), []).append(line)
+    text = lines[0] + ''.join(''.join(blocks[t]) for t in sorted(blocks))
+
+    tmp = output_file + ".tmp"
+    with open(tmp, 'w', newline='') as f: f.write(text)
+    os.replace(tmp, output_file)
+    if changed: write_team_state(read_team_rows(output_file), team_state_file)
+    else: update_team_state(new_rows, team_state_file, output_file)
+
+    state['output_size'] = os.path.getsize(output_file)
+    save_state(state, state_file)
+    return len(new_rows)
+
+def build_features(input_file=INPUT_FILE, output_file=OUTPUT_FILE, state_file=STATE_FILE, full=False,
+                   windows=WINDOWS, spans=EWM_SPANS, team_state_file=None):
+    windows = sorted(set(windows) | {WINDOW})
+    if team_state_file is None: team_state_file = os.path.join(os.path.dirname(output_file), os.path.basename(TEAM_STATE_FILE))
+    df = load_games(input_file)
+    state = None if full else load_state(state_file, windows, spans)
+
+    if state is not None:
+        added = incremental_update(df, state, output_file, state_file, team_state_file, windows, spans)
+        if added is not None:
+            print(f"[OK] Mode incremental : {added} lignes écrites dans {output_file}")
+            return added
+        print("[INFO] Etat incoherent avec l'historique, recalcul complet.")
+
+    n_rows = full_recompute(df, output_file, state_file, team_state_file, windows, spans)
+    print(f"[OK] Recalcul complet ({n_rows} lignes), sauvegarde dans {output_file}")
+    return n_rows
 
-    factors = ['EFG_PCT', 'TOV_PCT', 'FT_RATE', 'ORB_RAW', 'WIN']
-    for factor in factors:
-        df[f"{factor}_LAST_5"] = df.groupby('TEAM_ID')[factor].transform(lambda x: x.shift(1).rolling(5).mean())
+def run_features(full=False, windows=WINDOWS, spans=EWM_SPANS):
+    """Étape de la routine : True si les features sont à jour"""
+    print("--- Calcul des FOUR FACTORS ---")
 
-    df['PREV_GAME_DATE'] = df.groupby('TEAM_ID')['GAME_DATE'].shift(1)
-    df['DAYS_REST'] = (df['GAME_DATE'] - df['PREV_GAME_DATE']).dt.days.fillna(3).clip(upper=7)
+    if not os.path.exists(INPUT_FILE):
+        print(f"[ERREUR] {INPUT_FILE} introuvable.")
+        return False
 
-    df_final = df.dropna(subset=[f"{f}_LAST_5" for f in factors])
-    
-    df_final.to_csv(OUTPUT_FILE, index=False)
-    print(f"[OK] Sauvegarde dans {OUTPUT_FILE}")
+    try:
+        build_features(full=full, windows=windows, spans=spans)
+        return True
+    except Exception as e:
+        print(f"[ERREUR] {e}")
+        return False
 
-except Exception as e:
-    print(f"[ERREUR] {e}")
-    exit(1)
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calcul des Four Factors (LAST_N, EWM_N, DAYS_REST)")
+    parser.add_argument('--full', action='store_true', help="Ignore l'état et recalcule tout")
+    parser.add_argument('--windows', type=int, nargs='+', default=WINDOWS, help="Fenêtres glissantes (ex: 5 10 20)")
+    parser.add_argument('--ewm', type=int, nargs='*', default=EWM_SPANS, help="Spans EWM (ex: 10)")
+    args = parser.parse_args()
+    sys.exit(0 if run_features(full=args.full, windows=args.windows, spans=args.ewm) else 1)
@@ -1,16 +1,19 @@
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 from nba_api.stats.endpoints import leaguegamefinder
-from nba_api.stats.static import teams
+
+# Permet l'exécution directe (python src/force_fix.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import nba_cache, teams_registry
 
 HISTORY_FILE = 'data/bets_history.csv'
 # On cible uniquement le 28 car le 29 n'est pas joué
 TARGET_DATES = ['2025-12-28'] 
 
 def get_team_map():
-    nba_teams = teams.get_teams()
-    return {t['id']: t['full_name'] for t in nba_teams}
+    return {t.id: t.full for t in teams_registry.TEAMS}
 
 def normalize_date(d_str):
     """Essaie de convertir n'importe quelle date en YYYY-MM-DD"""
@@ -40,7 +43,7 @@ def force_fix():
         
         # 1. API
         d_us = datetime.strptime(date_target, '%Y-%m-%d').strftime('%m/%d/%Y')
-        finder = leaguegamefinder.LeagueGameFinder(
+        finder = nba_cache.fetch(leaguegamefinder.LeagueGameFinder,
             date_from_nullable=d_us, date_to_nullable=d_us, league_id_nullable='00'
         )
         results = finder.get_data_frames()[0]
@@ -0,0 +1,64 @@
+import pandas as pd
+
+# Historique des paris indexé une fois au chargement : la page MATCHS interroge l'historique
+# pour chaque match affiché et le bloc des résultats par date. Au lieu d'un masque booléen
+# sur toute la table à chaque fois, on répond en O(1) quelle que soit la taille de l'historique.
+
+KEY_COLUMNS = ['Date', 'Home', 'Away']
+RESULT_VALUES = ('GAGNE', 'PERDU')
+
+class HistoryStore:
+    """DataFrame de l'historique + index (date, domicile, extérieur) et regroupement par date.
+
+    Lecture seule : `df` reste le DataFrame d'origine (onglet STATS), les index pointent
+    vers ses positions.
+    """
+    def __init__(self, df):
+        self.df = df if df is not None else pd.DataFrame()
+        # Colonnes en listes Python : une ligne se reconstruit en O(nb colonnes), sans to_dict('records') sur toute la table
+        self.columns = {c: self.df[c].tolist() for c in self.df.columns}
+        self.by_key = {}
+        self.by_date = {}
+        self.results_by_date = {}
+        self.dates_desc = []
+        if self.df.empty or not set(KEY_COLUMNS).issubset(self.df.columns): return
+
+        # Premier pari connu pour un match (équivalent de l'ancien existing_bet.iloc[0]) :
+        # on remplit à l'envers pour que la première occurrence l'emporte
+        keys = list(zip(*(self.columns[c] for c in KEY_COLUMNS)))
+        self.by_key = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+
+        self.by_date = self.df.groupby('Date', sort=False).indices
+        if 'Result' in self.df.columns:
+            finished = self.df['Result'].isin(RESULT_VALUES).to_numpy()
+            for d, positions in self.by_date.items():
+                done = positions[finished[positions]]
+                if len(done): self.results_by_date[d] = done
+        self.dates_desc = sorted(self.results_by_date, reverse=True)
+
+    @property
+    def empty(self):
+        return self.df.empty
+
+    def __len__(self):
+        return len(self.df)
+
+    def row(self, pos):
+        return {c: values[pos] for c, values in self.columns.items()}
+
+    def get(self, date, home, away):
+        """Pari enregistré pour ce match (dict colonne -> valeur), None si absent"""
+        pos = self.by_key.get((date, home, away))
+        return None if pos is None else self.row(pos)
+
+    def day(self, date):
+        """Tous les paris d'une date (dicts)"""
+        return [self.row(p) for p in self.by_date.get(date, ())]
+
+    def result_dates(self, limit=None):
+        """Dates ayant au moins un pari vérifié (GAGNE / PERDU), la plus récente d'abord"""
+        return list(self.dates_desc if limit is None else self.dates_desc[:limit])
+
+    def results(self, date):
+        """Paris vérifiés d'une date (dicts)"""
+        return [self.row(p) for p in self.results_by_date.get(date, ())]
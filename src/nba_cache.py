@@ -0,0 +1,112 @@
+from datetime import datetime
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+from nba_api.stats.library.http import NBAStatsResponse
+from src import nba_client
+
+# Cache disque des réponses nba_api (stats.nba.com), partagé par l'app et les scripts.
+# On stocke la réponse brute compressée et on la recharge dans l'objet endpoint : l'appelant
+# garde exactement la même API (board.game_header, finder.get_data_frames()...).
+
+# --- CHEMINS ---
+CACHE_DIR = "data/cache/nba_api"
+
+# --- CONFIG (secondes) ---
+TTL_LIVE = 5 * 60          # soirée du jour / à venir : les scores bougent
+TTL_PENDING = 10 * 60      # date passée mais matchs pas tous finis
+TTL_DEFAULT = 60 * 60      # classements, plages de dates ouvertes
+SETTLED_DAYS = 3           # LeagueGameFinder : liste figée seulement quand la date a ce nombre de jours
+# Soirée passée finie (ScoreboardV2 tout en GAME_STATUS_ID 3, ou LeagueGameFinder vieux de
+# SETTLED_DAYS jours) : conservé indéfiniment (ttl None)
+
+def cache_key(endpoint):
+    """Clé = nom de l'endpoint + paramètres effectivement envoyés"""
+    raw = endpoint.endpoint + json.dumps(endpoint.parameters, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def parse_date(value):
+    """Date des paramètres nba_api ('YYYY-MM-DD' ou 'MM/DD/YYYY'), None si absente"""
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y'):
+        try: return datetime.strptime(str(value), fmt).date()
+        except ValueError: continue
+    return None
+
+def all_final(endpoint):
+    """Tous les matchs de la réponse sont terminés (et il y en a au moins un).
+
+    Pour LeagueGameFinder, cela ne dit rien des matchs pas encore listés (l'endpoint est en
+    retard sur le scoreboard) : ttl_for ne s'y fie que pour une date assez ancienne.
+    """
+    data = endpoint.nba_response.get_normalized_dict()
+    if 'GameHeader' in data:
+        rows = data['GameHeader']
+        return bool(rows) and all(r.get('GAME_STATUS_ID') == 3 for r in rows)
+    if 'LeagueGameFinderResults' in data:
+        rows = data['LeagueGameFinderResults']
+        return bool(rows) and all(r.get('WL') in ('W', 'L') for r in rows)
+    return False
+
+def ttl_for(endpoint):
+    """Durée de vie selon la donnée : une soirée passée et finie ne change plus"""
+    params = endpoint.parameters
+    day = parse_date(params.get('GameDate') or params.get('DateTo') or '')
+    if day is None: return TTL_DEFAULT
+    today = datetime.now().date()
+    if day >= today: return TTL_LIVE
+    if not all_final(endpoint): return TTL_PENDING
+    if 'LeagueGameFinderResults' in endpoint.nba_response.get_normalized_dict() and (today - day).days < SETTLED_DAYS:
+        return TTL_PENDING
+    return None
+
+def read_entry(path):
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f: return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_entry(path, entry):
+    """Écriture atomique (plusieurs threads / scripts peuvent écrire en même temps)"""
+    if not os.path.exists(CACHE_DIR): os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f: json.dump(entry, f)
+    os.replace(tmp, path)
+
+def load_into(endpoint, entry):
+    endpoint.nba_response = NBAStatsResponse(response=entry['response'], status_code=200, url=entry.get('url'))
+    endpoint.load_response()
+    return endpoint
+
+def fetch(endpoint_cls, max_age=None, **params):
+    """Équivalent de endpoint_cls(**params) servi depuis le cache quand il est frais.
+
+    `max_age` (secondes) resserre la fraîcheur exigée pour cet appel (ex : suivi des scores
+    en direct) ; une soirée finie, conservée indéfiniment, n'est jamais redemandée.
+    Les appels réseau passent par nba_client (throttling, retries, budget). En cas d'erreur,
+    on sert la dernière réponse connue même expirée ; sans copie locale, l'erreur remonte.
+    """
+    endpoint = endpoint_cls(get_request=False, **params)
+    path = os.path.join(CACHE_DIR, cache_key(endpoint) + ".json.gz")
+    entry = read_entry(path)
+
+    if entry is not None:
+        ttl = entry['ttl']
+        if ttl is not None and max_age is not None: ttl = min(ttl, max_age)
+        if ttl is None or time.time() - entry['saved'] < ttl: return load_into(endpoint, entry)
+
+    try:
+        nba_client.STATS.send_endpoint(endpoint)
+    except Exception as e:
+        if entry is None: raise
+        print(f"[CACHE] {endpoint.endpoint} indisponible ({e}), réponse du {datetime.fromtimestamp(entry['saved']):%d.%m %H:%M} utilisée.")
+        return load_into(endpoint, entry)
+
+    write_entry(path, {
+        'endpoint': endpoint.endpoint, 'parameters': endpoint.parameters, 'url': endpoint.nba_response.get_url(),
+        'saved': time.time(), 'ttl': ttl_for(endpoint), 'response': endpoint.nba_response.get_response(),
+    })
+    return endpoint
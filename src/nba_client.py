@@ -0,0 +1,131 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from nba_api.stats.library.http import NBAStatsHTTP
+
+# Client unique pour tous les appels sortants vers la NBA (stats.nba.com via nba_api, cdn.nba.com).
+# Seau à jetons partagé entre threads, retries avec backoff exponentiel + jitter sur timeouts,
+# 429 et 5xx, et budget d'appels sur une fenêtre glissante pour ne jamais se faire bannir
+# (l'app Streamlit et le démon tournent des jours : un budget par process finirait épuisé).
+
+# --- CONFIG (surchargeable par variables d'environnement) ---
+STATS_RATE = float(os.getenv("NBA_API_RATE", 3))        # appels / seconde en régime établi
+STATS_BURST = int(os.getenv("NBA_API_BURST", 8))        # appels immédiats autorisés
+STATS_BUDGET = int(os.getenv("NBA_API_BUDGET", 300))    # appels max par fenêtre
+CDN_RATE = float(os.getenv("NBA_CDN_RATE", 8))
+CDN_BURST = int(os.getenv("NBA_CDN_BURST", 8))
+CDN_BUDGET = int(os.getenv("NBA_CDN_BUDGET", 200))
+BUDGET_WINDOW = float(os.getenv("NBA_API_BUDGET_WINDOW", 3600))   # secondes
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0   # secondes, doublé à chaque tentative
+BACKOFF_MAX = 20.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class BudgetExceeded(RuntimeError):
+    """Le budget d'appels de la fenêtre est épuisé (pas de retry)"""
+
+class RetryableError(RuntimeError):
+    """Réponse HTTP à retenter (429, 5xx, réponse non JSON)"""
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Seau à jetons : `burst` appels immédiats, puis `rate` appels par seconde"""
+    def __init__(self, rate, burst):
+        self.rate, self.burst = rate, burst
+        self.tokens, self.last = float(burst), time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class ApiClient:
+    """Throttling + retries + budget pour un hôte donné, utilisable depuis plusieurs threads"""
+
+    def __init__(self, name, rate, burst, budget, max_retries=MAX_RETRIES, window=BUDGET_WINDOW):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.budget, self.max_retries, self.window = budget, max_retries, window
+        self.calls = deque()   # horodatages (monotonic) des appels de la fenêtre
+        self.lock = threading.Lock()
+
+    def spend(self):
+        """Compte un appel ; au-delà de `budget` appels sur les `window` dernières secondes, refus"""
+        with self.lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] >= self.window: self.calls.popleft()
+            if len(self.calls) >= self.budget:
+                wait = self.window - (now - self.calls[0])
+                raise BudgetExceeded(f"Budget {self.name} épuisé ({self.budget} appels / {self.window:.0f}s, libre dans {wait:.0f}s)")
+            self.calls.append(now)
+
+    def reset_budget(self):
+        """Nouvelle "exécution" pour un process long (démon) : la fenêtre repart à zéro"""
+        with self.lock: self.calls.clear()
+
+    def backoff(self, attempt, retry_after=None):
+        """Attente avant la tentative suivante : Retry-After si fourni, sinon exponentiel avec jitter"""
+        if retry_after is not None: return min(BACKOFF_MAX, retry_after)
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def call(self, send):
+        """Exécute send() (une requête HTTP) avec jeton, budget et retries ; relance la dernière erreur.
+
+        Le budget compte les appels logiques : les retries d'un même appel ne le consomment pas
+        (ils restent limités par max_retries et le seau à jetons).
+        """
+        self.spend()
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                return send()
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, RetryableError) as e:
+                if attempt == self.max_retries: raise
+                wait = self.backoff(attempt, getattr(e, 'retry_after', None))
+                print(f"[{self.name}] {type(e).__name__} ({e}), nouvel essai dans {wait:.1f}s...")
+                time.sleep(wait)
+
+    def get(self, url, **kwargs):
+        """requests.get throttlé (CDN) : 429 et 5xx retentés, autres codes rendus tels quels"""
+        def send():
+            r = requests.get(url, **kwargs)
+            if r.status_code in RETRY_STATUS:
+                retry_after = r.headers.get('Retry-After')
+                raise RetryableError(f"HTTP {r.status_code}", float(retry_after) if retry_after and retry_after.isdigit() else None)
+            return r
+        return self.call(send)
+
+    def send_endpoint(self, endpoint):
+        """Remplace endpoint.get_request() de nba_api : même requête, mais throttlée et vérifiée"""
+        def send():
+            response = NBAStatsHTTP().send_api_request(
+                endpoint=endpoint.endpoint, parameters=endpoint.parameters,
+                proxy=endpoint.proxy, headers=endpoint.headers, timeout=endpoint.timeout,
+            )
+            # nba_api ne lève rien sur un 429 / 5xx : on regarde le code et la validité du JSON
+            status = getattr(response, '_status_code', 200)
+            if status in RETRY_STATUS or not response.valid_json():
+                raise RetryableError(f"HTTP {status} sur {endpoint.endpoint}")
+            return response
+        endpoint.nba_response = self.call(send)
+        endpoint.load_response()
+        return endpoint
+
+STATS = ApiClient("stats.nba.com", STATS_RATE, STATS_BURST, STATS_BUDGET)
+CDN = ApiClient("cdn.nba.com", CDN_RATE, CDN_BURST, CDN_BUDGET)
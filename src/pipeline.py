@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Mini-orchestrateur de la routine : chaque étape déclare ses fichiers d'entrée / sortie et
+# ses dépendances. Les étapes indépendantes tournent en parallèle, et une étape dont les
+# entrées (et sorties) ont exactement le même contenu qu'au dernier succès est sautée.
+
+# --- CHEMINS ---
+STATE_FILE = "data/pipeline_state.json"
+
+# --- CONFIG ---
+MAX_WORKERS = 4
+
+class StepOutput:
+    """sys.stdout pendant le DAG : chaque ligne écrite par une étape est préfixée par son nom.
+
+    Les étapes parallèles écrivent dans le même terminal ; les lignes sont émises entières
+    (sous verrou), donc jamais entremêlées, et on sait toujours quelle étape parle.
+    Hors d'une étape (thread principal), l'écriture passe telle quelle.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def begin(self, name):
+        self.local.name, self.local.pending = name, ''
+
+    def end(self):
+        if getattr(self.local, 'pending', ''): self.write('\n')
+        self.local.name = None
+
+    def write(self, text):
+        name = getattr(self.local, 'name', None)
+        if name is None:
+            with self.lock: return self.stream.write(text)
+        *lines, self.local.pending = (self.local.pending + text).split('\n')
+        if lines:
+            with self.lock: self.stream.write(''.join(f"[{name}] {line}\n" for line in lines))
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, attr):
+        # encoding, isatty, fileno... : ceux du vrai flux
+        return getattr(self.stream, attr)
+
+class Step:
+    """Étape : `action` est un script (lancé en sous-process) ou une fonction qui retourne True si succès.
+
+    Sans `inputs`, l'étape tourne à chaque fois. Une étape `critical` en échec bloque toutes
+    celles qui en dépendent ; sinon elles tournent quand même, comme dans l'ancienne chaîne.
+    """
+    def __init__(self, name, action, description, inputs=(), outputs=(), deps=(), critical=False):
+        self.name, self.action, self.description = name, action, description
+        self.inputs, self.outputs, self.deps = list(inputs), list(outputs), list(deps)
+        self.critical = critical
+
+def file_hash(path):
+    if not os.path.exists(path): return None
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''): h.update(chunk)
+    return h.hexdigest()
+
+def files_digest(paths):
+    """Empreinte du contenu d'une liste de fichiers (un fichier absent compte aussi)"""
+    return hashlib.sha1(json.dumps([[p, file_hash(p)] for p in paths]).encode('utf-8')).hexdigest()
+
+class Pipeline:
+    def __init__(self, steps, state_file=STATE_FILE, max_workers=MAX_WORKERS):
+        self.steps = {s.name: s for s in steps}
+        self.state_file, self.max_workers = state_file, max_workers
+        self.lock = threading.Lock()
+        try:
+            with open(state_file, 'r') as f: self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def fingerprint(self, step):
+        return {'inputs': files_digest(step.inputs), 'outputs': files_digest(step.outputs)}
+
+    def up_to_date(self, step):
+        if not step.inputs or not all(os.path.exists(p) for p in step.outputs): return False
+        return self.state.get(step.name) == self.fingerprint(step)
+
+    def save_state(self):
+        folder = os.path.dirname(self.state_file)
+        if folder and not os.path.exists(folder): os.makedirs(folder, exist_ok=True)
+        tmp = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f: json.dump(self.state, f, indent=1)
+        os.replace(tmp, self.state_file)
+
+    def execute(self, step, force=False):
+        start = time.perf_counter()
+        if not force and self.up_to_date(step):
+            sys.stdout.write(f"⏭️  {step.description} : entrées inchangées, étape sautée.\n")
+            return {'status': 'skipped', 'seconds': time.perf_counter() - start}
+
+        print(f"\n{'='*50}")
+        print(f"🚀 ÉTAPE : {step.description}")
+        print(f"{'='*50}")
+        try:
+            if callable(step.action):
+                ok = bool(step.action())
+            elif not os.path.exists(step.action):
+                print(f"❌ ERREUR : Le fichier {step.action} est introuvable.")
+                ok = False
+            else:
+                # Sortie du script relue ligne à ligne : elle passe par le préfixe de l'étape
+                proc = subprocess.Popen([sys.executable, step.action], stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, env={**os.environ, 'PYTHONUNBUFFERED': '1'})
+                for line in proc.stdout: sys.stdout.write(line)
+                ok = proc.wait() == 0
+        except (Exception, SystemExit) as e:
+            # Les étapes tournent dans le process : un exit() ou une exception ne doit pas tout arrêter
+            print(f"❌ ERREUR dans {step.name} : {e!r}")
+            ok = False
+
+        if ok:
+            # Empreinte prise après l'exécution : une étape peut réécrire ses propres entrées
+            with self.lock:
+                self.state[step.name] = self.fingerprint(step)
+                self.save_state()
+            print(f"✅ {step.description} terminé avec succès.")
+        else:
+            print(f"❌ ERREUR CRITIQUE dans {step.name}." if step.critical else f"⚠️ Échec de {step.name}, on continue.")
+        return {'status': 'ok' if ok else 'failed', 'seconds': time.perf_counter() - start}
+
+    def blocked(self, step, results):
+        for d in step.deps:
+            r = results.get(d)
+            if d not in self.steps or (r and (r['status'] == 'blocked' or (r['status'] == 'failed' and self.steps[d].critical))):
+                return True
+        return False
+
+    def run_step(self, output, step, force):
+        output.begin(step.name)
+        try:
+            return self.execute(step, force)
+        finally:
+            output.end()
+
+    def run(self, force=False):
+        """Exécute le DAG ; retourne {étape: {'status', 'seconds'}} (ok / skipped / failed / blocked)"""
+        pending, running, results = dict(self.steps), {}, {}
+        output = StepOutput(sys.stdout)
+        sys.stdout = output
+        try:
+            self.schedule(output, pending, running, results, force)
+        finally:
+            sys.stdout = output.stream
+        return {name: results[name] for name in self.steps}
+
+    def schedule(self, output, pending, running, results, force):
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name, step in list(pending.items()):
+                    if self.blocked(step, results):
+                        results[name] = {'status': 'blocked', 'seconds': 0.0}
+                        del pending[name]
+                    elif all(d in results for d in step.deps):
+                        running[pool.submit(self.run_step, output, step, force)] = name
+                        del pending[name]
+                if not running:
+                    # Dépendance circulaire : rien ne peut plus démarrer
+                    for name in pending: results[name] = {'status': 'blocked', 'seconds': 0.0}
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in done: results[running.pop(f)] = f.result()
+
+def print_report(results, total):
+    icons = {'ok': '✅', 'skipped': '⏭️ ', 'failed': '❌', 'blocked': '⛔'}
+    print(f"\n{'='*50}")
+    print(f"⏱️  RAPPORT DE LA ROUTINE ({total:.1f}s)")
+    print(f"{'='*50}")
+    for name, r in results.items():
+        print(f"   {icons[r['status']]} {name:<22} {r['status']:<8} {r['seconds']:6.1f}s")
@@ -0,0 +1,79 @@
+from collections import OrderedDict
+import json
+import os
+import threading
+import time
+
+# --- CHEMINS ---
+CACHE_FILE = "data/predictions_cache.json"
+
+# --- CONFIG ---
+MAX_ENTRIES = 5000
+TTL_SECONDS = 3 * 24 * 3600  # un prono ne sert plus une fois le match joué
+
+class PredictionCache:
+    """Cache persistant des probabilités, partagé par l'app, predict_today et predict_nba.
+
+    Clé : (date, home, away, empreinte modèle, empreinte des deux lignes d'état). Un réentraînement
+    change l'empreinte modèle (tout est recalculé), un nouveau match ne change que l'empreinte
+    des équipes concernées. Éviction LRU au-delà de MAX_ENTRIES et TTL, fichier JSON atomique.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.path, self.max_entries, self.ttl = path, max_entries, ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def make_key(date, home_id, away_id, model_digest, state_digest):
+        return f"{date}|{home_id}|{away_id}|{model_digest}|{state_digest}"
+
+    def load(self):
+        """Recharge le fichier (entrées expirées ignorées). Fichier illisible = cache vide."""
+        try:
+            with open(self.path, 'r') as f: raw = json.load(f)
+        except (OSError, ValueError):
+            raw = []
+        now = time.time()
+        with self.lock:
+            self.entries = OrderedDict((k, (p, ts)) for k, p, ts in raw if now - ts < self.ttl)
+
+    def get(self, key):
+        """Probabilité en cache ou None (une lecture remonte l'entrée en tête LRU)"""
+        with self.lock:
+            hit = self.entries.get(key)
+            if hit is None: return None
+            if time.time() - hit[1] >= self.ttl:
+                del self.entries[key]
+                self.dirty = True
+                return None
+            self.entries.move_to_end(key)
+            return hit[0]
+
+    def put(self, key, prob):
+        with self.lock:
+            self.entries[key] = (float(prob), time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
+
+    def save(self):
+        """Écriture atomique si quelque chose a changé depuis le dernier save"""
+        with self.lock:
+            if not self.dirty: return
+            raw = [[k, p, ts] for k, (p, ts) in self.entries.items()]
+            self.dirty = False
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder): os.makedirs(folder)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f: json.dump(raw, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.dirty = True
+        self.save()
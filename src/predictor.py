@@ -0,0 +1,143 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import os
+from src import features_nba, tree_model, prediction_cache
+
+# --- CHEMINS ---
+TEAM_STATE_FILE = features_nba.TEAM_STATE_FILE
+GAMES_FILE = features_nba.OUTPUT_FILE
+MODEL_FILE = "models/nba_predictor.json"
+
+def load_model(path=MODEL_FILE):
+    """Modèle évalué en NumPy pur (tree_model), sans importer xgboost. None si absent."""
+    if not os.path.exists(path) and not os.path.exists(tree_model.export_path(path)): return None
+    return tree_model.TreeEnsemble.load(path)
+
+def load_booster(path=MODEL_FILE):
+    """Booster XGBoost natif (sans le wrapper sklearn), ou None si le fichier est absent"""
+    if not os.path.exists(path): return None
+    import xgboost as xgb
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return booster
+
+def load_team_state(path=TEAM_STATE_FILE, games_file=GAMES_FILE):
+    """Etat courant des 30 équipes indexé par TEAM_ID (dernière ligne de features de chacune).
+
+    Si la table n'a pas encore été produite par features_nba.py, on la reconstruit une fois
+    depuis nba_games_ready.csv.
+    """
+    if os.path.exists(path):
+        df = features_nba.read_team_rows(path)
+    elif os.path.exists(games_file):
+        df = features_nba.latest_team_state(features_nba.read_team_rows(games_file))
+    else:
+        return None
+    return df.set_index('TEAM_ID')
+
+def get_team_row(team_state, team_id):
+    """Ligne de l'équipe (Series) ou None si inconnue"""
+    if team_state is None: return None
+    try: return team_state.loc[int(team_id)]
+    except (KeyError, ValueError, TypeError): return None
+
+def find_team_id(team_state, abbreviation):
+    """TEAM_ID à partir de l'abréviation (ex: 'LAL'), ou None"""
+    if team_state is None: return None
+    match = team_state.index[team_state['TEAM_ABBREVIATION'] == str(abbreviation).upper()]
+    return int(match[0]) if len(match) else None
+
+# --- PREDICTION GROUPEE ---
+# Doit correspondre EXACTEMENT aux colonnes d'entraînement (train_nba.py)
+FEATURES = [
+    'EFG_PCT_LAST_5_HOME', 'EFG_PCT_LAST_5_AWAY', 'TOV_PCT_LAST_5_HOME', 'TOV_PCT_LAST_5_AWAY',
+    'ORB_RAW_LAST_5_HOME', 'ORB_RAW_LAST_5_AWAY', 'DIFF_EFG', 'DIFF_TOV', 'DIFF_ORB', 'DIFF_WIN', 'DIFF_REST'
+]
+
+def build_feature_matrix(team_state, games):
+    """Matrice des 11 features pour une liste de (home_id, away_id, date), construite en une fois.
+
+    Retourne (X, infos) : infos contient HOME_ID, AWAY_ID, DATE, REST_HOME, REST_AWAY et VALID
+    (False si une des deux équipes est absente de l'état).
+    """
+    infos = pd.DataFrame(list(games), columns=['HOME_ID', 'AWAY_ID', 'DATE'])
+    infos['DATE'] = pd.to_datetime(infos['DATE'])
+    h = team_state.reindex(pd.to_numeric(infos['HOME_ID'], errors='coerce'))
+    a = team_state.reindex(pd.to_numeric(infos['AWAY_ID'], errors='coerce'))
+
+    rest_h = pd.Series(infos['DATE'].to_numpy() - h['GAME_DATE'].to_numpy()).dt.days.to_numpy(dtype=float)
+    rest_a = pd.Series(infos['DATE'].to_numpy() - a['GAME_DATE'].to_numpy()).dt.days.to_numpy(dtype=float)
+    infos['REST_HOME'], infos['REST_AWAY'] = rest_h, rest_a
+    infos['VALID'] = h['GAME_DATE'].notna().to_numpy() & a['GAME_DATE'].notna().to_numpy()
+
+    hv = {c: h[f"{c}_LAST_5"].to_numpy() for c in ['EFG_PCT', 'TOV_PCT', 'ORB_RAW', 'WIN']}
+    av = {c: a[f"{c}_LAST_5"].to_numpy() for c in ['EFG_PCT', 'TOV_PCT', 'ORB_RAW', 'WIN']}
+    X = pd.DataFrame({
+        'EFG_PCT_LAST_5_HOME': hv['EFG_PCT'], 'EFG_PCT_LAST_5_AWAY': av['EFG_PCT'],
+        'TOV_PCT_LAST_5_HOME': hv['TOV_PCT'], 'TOV_PCT_LAST_5_AWAY': av['TOV_PCT'],
+        'ORB_RAW_LAST_5_HOME': hv['ORB_RAW'], 'ORB_RAW_LAST_5_AWAY': av['ORB_RAW'],
+        'DIFF_EFG': hv['EFG_PCT'] - av['EFG_PCT'],
+        'DIFF_TOV': hv['TOV_PCT'] - av['TOV_PCT'],
+        'DIFF_ORB': hv['ORB_RAW'] - av['ORB_RAW'],
+        'DIFF_WIN': hv['WIN'] - av['WIN'],
+        'DIFF_REST': np.minimum(rest_h, 7) - np.minimum(rest_a, 7)
+    }, columns=FEATURES)
+    return X, infos
+
+def predict_proba_home(model, X):
+    """Probabilité de victoire à domicile pour chaque ligne de X.
+
+    TreeEnsemble : évaluation NumPy (écart < 1e-6 avec XGBoost). Booster natif : inplace_predict
+    sur un tableau float32 contigu (pas de DMatrix, pas de validation pandas). Sinon
+    (XGBClassifier) : predict_proba classique, valeurs identiques au Booster natif.
+    """
+    if isinstance(model, tree_model.TreeEnsemble):
+        return model.predict(X)
+    if hasattr(model, 'inplace_predict'):
+        return model.inplace_predict(np.ascontiguousarray(X, dtype=np.float32))
+    return model.predict_proba(X)[:, 1]
+
+def model_digest(model):
+    """Empreinte courte du modèle (calculée une fois puis gardée sur l'objet)"""
+    digest = getattr(model, 'digest', None)
+    if digest is None:
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        digest = hashlib.sha1(bytes(booster.save_raw())).hexdigest()[:16]
+        model.digest = digest
+    return digest
+
+def cache_keys(model, team_state, infos):
+    """Clés de cache de chaque ligne : date, équipes, modèle et empreinte des deux lignes d'état"""
+    rows = {int(t): f"{v:x}" for t, v in pd.util.hash_pandas_object(team_state, index=True).items()}
+    row = lambda t: rows.get(int(t), '-') if pd.notna(pd.to_numeric(t, errors='coerce')) else '-'
+    m = model_digest(model)
+    dates = infos['DATE'].dt.strftime('%Y-%m-%d')
+    return [prediction_cache.PredictionCache.make_key(d, h, a, m, row(h) + row(a))
+            for d, h, a in zip(dates, infos['HOME_ID'], infos['AWAY_ID'])]
+
+def predict_slate(model, team_state, games, cache=None):
+    """Probabilité de victoire à domicile pour toute une affiche, en un seul appel au modèle.
+
+    `games` : liste de (home_id, away_id, date). Retourne les infos de build_feature_matrix
+    avec une colonne PROB_HOME (NaN pour les matchs non calculables). Avec un `cache`
+    (PredictionCache), seuls les matchs absents du cache passent par le modèle.
+    """
+    X, infos = build_feature_matrix(team_state, games)
+    infos['PROB_HOME'] = np.nan
+    valid = infos['VALID'].to_numpy()
+    if model is None or not valid.any(): return infos
+
+    if cache is None:
+        infos.loc[valid, 'PROB_HOME'] = predict_proba_home(model, X[valid])
+        return infos
+
+    keys = cache_keys(model, team_state, infos)
+    probs = np.array([cache.get(k) if v else None for k, v in zip(keys, valid)], dtype=float)
+    todo = valid & np.isnan(probs)
+    if todo.any():
+        probs[todo] = predict_proba_home(model, X[todo])
+        for i in np.flatnonzero(todo): cache.put(keys[i], probs[i])
+        cache.save()
+    infos['PROB_HOME'] = probs
+    return infos
@@ -1,14 +1,35 @@
 import pandas as pd
 import requests
+import json
 import os
-import numpy as np
+import sys
 from dotenv import load_dotenv
 
+# Permet l'exécution directe (python src/pull_votes.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import supabase_client
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 CSV_PATH = "data/bets_history.csv"
+STATE_PATH = "data/pull_votes_state.json"
+
+# --- CONFIG ---
+TABLE = "bets_history"
+UPDATED_COL = "updated_at"   # tenue à jour par un trigger (sql/bets_history_updated_at.sql)
+KEY_FIELDS = ['game_date', 'home_team', 'away_team']
+# Tri total pour la pagination limit/offset : updated_at (ou game_date) seuls ne sont pas uniques
+KEY_ORDER = ",".join(f"{k}.asc" for k in KEY_FIELDS)
+
+# Colonnes cloud -> colonnes CSV
+CLOUD_TO_LOCAL = {
+    'game_date': 'Date', 'home_team': 'Home', 'away_team': 'Away',
+    'predicted_winner': 'Predicted_Winner', 'confidence': 'Confidence', 'type': 'Type',
+    'result_ia': 'Result', 'real_winner': 'Real_Winner', 'user_prediction': 'User_Prediction',
+    'user_result': 'User_Result', 'user_reason': 'User_Reason'
+}
 
 def normalize_date(val):
     if pd.isna(val): return ""
@@ -18,103 +39,113 @@ def normalize_str(val):
     if pd.isna(val): return ""
     return str(val).strip()
 
+def match_key(dates, homes, aways):
+    """Clé normalisée date|home|away, calculée sur des colonnes entières"""
+    d = dates.fillna("").astype(str).str.split('T').str[0].str.strip()
+    return d + "|" + homes.fillna("").astype(str).str.strip() + "|" + aways.fillna("").astype(str).str.strip()
+
+def load_high_water():
+    try:
+        with open(STATE_PATH, 'r') as f: return json.load(f).get('high_water')
+    except (OSError, ValueError):
+        return None
+
+def save_high_water(value):
+    tmp = STATE_PATH + ".tmp"
+    with open(tmp, 'w') as f: json.dump({'high_water': value}, f)
+    os.replace(tmp, STATE_PATH)
+
+def fetch_cloud_rows(client, high_water):
+    """Lignes modifiées depuis le dernier pull (updated_at >= high water), sinon tout l'historique.
+
+    Si la table n'a pas (encore) de colonne updated_at, on retombe sur un pull complet.
+    La colonne doit être mise à jour à chaque UPDATE par le trigger de sql/bets_history_updated_at.sql.
+    Retourne (lignes, nouveau high water ou None).
+    """
+    if high_water:
+        try:
+            rows = client.select(TABLE, filters={UPDATED_COL: f"gte.{high_water}"}, order=f"{UPDATED_COL}.asc,{KEY_ORDER}")
+            print(f"[CLOUD] Pull incrémental depuis {high_water}.")
+            return rows, max((r[UPDATED_COL] for r in rows), default=high_water)
+        except requests.HTTPError as e:
+            print(f"[INFO] Pull incrémental impossible ({e.response.status_code}), pull complet.")
+    rows = client.select(TABLE, order=KEY_ORDER)
+    marks = [r.get(UPDATED_COL) for r in rows if r.get(UPDATED_COL)]
+    return rows, (max(marks) if marks else None)
+
 def pull_votes_from_cloud():
+    """Rapatrie votes et matchs du cloud dans le CSV local ; True si succès (même sans changement)"""
     print("--- RÉCUPÉRATION (UPDATE & INSERT) CLOUD -> LOCAL ---")
-    
+
     if not os.path.exists(CSV_PATH):
         print("[ERREUR] Pas de CSV local.")
-        return
-    
+        return False
+
     df_local = pd.read_csv(CSV_PATH)
     print(f"[LOCAL] {len(df_local)} lignes.")
 
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json"
-    }
-    # On récupère TOUT l'historique du cloud pour être sûr de ne rien rater
-    url = f"{SUPABASE_URL}/rest/v1/bets_history?select=*"
-    
+    client = supabase_client.get_client(SUPABASE_URL, SUPABASE_KEY)
+    if client is None:
+        print("[ERREUR] Clés manquantes.")
+        return False
+    # Uniquement ce qui a changé depuis le dernier pull réussi (high water mark sur updated_at)
+    high_water = load_high_water()
+
     try:
-        r = requests.get(url, headers=headers)
-        if r.status_code != 200:
-            print(f"[ERREUR CLOUD] {r.text}")
-            return
-        cloud_data = r.json()
+        cloud_data, new_high_water = fetch_cloud_rows(client, high_water)
         print(f"[CLOUD] {len(cloud_data)} lignes récupérées.")
     except Exception as e:
         print(f"[CRASH] {e}")
-        return
-
-    # Préparation matching
-    df_local['match_date_clean'] = df_local['Date'].apply(normalize_date)
-    df_local['match_home_clean'] = df_local['Home'].apply(normalize_str)
-
-    updates_count = 0
-    new_rows = []
-    
-    for row_cloud in cloud_data:
-        c_date = normalize_date(row_cloud.get('game_date'))
-        c_home = normalize_str(row_cloud.get('home_team'))
-        
-        # Masque de recherche
-        mask = (df_local['match_date_clean'] == c_date) & (df_local['match_home_clean'] == c_home)
-        
-        if mask.any():
-            # --- CAS 1 : MISE A JOUR (Le match existe en local) ---
-            idx = df_local[mask].index[0]
-            
-            # On met à jour les votes si nécessaire
-            c_vote = row_cloud.get('user_prediction')
-            c_reason = row_cloud.get('user_reason')
-            l_vote = df_local.at[idx, 'User_Prediction']
-            
-            if c_vote and (pd.isna(l_vote) or l_vote != c_vote):
-                df_local.at[idx, 'User_Prediction'] = c_vote
-                df_local.at[idx, 'User_Reason'] = c_reason
-                updates_count += 1
-                print(f"   [MAJ] Vote récupéré : {c_home} ({c_date})")
-                
-        else:
-            # --- CAS 2 : INSERTION (Le match manque en local) ---
-            # C'est ce qui manquait pour le 30.12 !
-            print(f"   [NOUVEAU] Import du match : {c_home} vs {row_cloud.get('away_team')} ({c_date})")
-            
-            new_row = {
-                "Date": row_cloud.get('game_date'),
-                "Home": row_cloud.get('home_team'),
-                "Away": row_cloud.get('away_team'),
-                "Predicted_Winner": row_cloud.get('predicted_winner'),
-                "Confidence": row_cloud.get('confidence'),
-                "Type": row_cloud.get('type', 'Auto'),
-                "Result": row_cloud.get('result_ia'),
-                "Real_Winner": row_cloud.get('real_winner'),
-                "User_Prediction": row_cloud.get('user_prediction'),
-                "User_Result": row_cloud.get('user_result'),
-                "User_Reason": row_cloud.get('user_reason')
-            }
-            new_rows.append(new_row)
-
-    # Nettoyage colonnes temp
-    df_local = df_local.drop(columns=['match_date_clean', 'match_home_clean'])
-    
+        return False
+
+    if not cloud_data:
+        print("\n[INFO] Tout est déjà synchro.")
+        return True
+
+    # Préparation matching : une seule jointure sur la clé normalisée (date, home, away)
+    cloud = pd.DataFrame(cloud_data).reindex(columns=list(CLOUD_TO_LOCAL))
+    cloud['KEY'] = match_key(cloud['game_date'], cloud['home_team'], cloud['away_team'])
+    cloud = cloud.drop_duplicates(subset='KEY', keep='last').set_index('KEY')
+    local_key = match_key(df_local['Date'], df_local['Home'], df_local['Away'])
+
+    # --- CAS 1 : MISE A JOUR (Le match existe en local) ---
+    # Première occurrence locale de chaque clé, vote cloud non vide et différent
+    first = ~local_key.duplicated()
+    c_vote = local_key.map(cloud['user_prediction']).where(first)
+    c_reason = local_key.map(cloud['user_reason'])
+    df_local[['User_Prediction', 'User_Reason']] = df_local[['User_Prediction', 'User_Reason']].astype(object)
+    l_vote = df_local['User_Prediction']
+    mask_upd = c_vote.notna() & (c_vote != "") & (l_vote.isna() | (l_vote != c_vote))
+    df_local.loc[mask_upd, 'User_Prediction'] = c_vote[mask_upd]
+    df_local.loc[mask_upd, 'User_Reason'] = c_reason[mask_upd]
+    updates_count = int(mask_upd.sum())
+    for _, row in df_local[mask_upd].iterrows():
+        print(f"   [MAJ] Vote récupéré : {normalize_str(row['Home'])} ({normalize_date(row['Date'])})")
+
+    # --- CAS 2 : INSERTION (Le match manque en local) ---
+    df_new = cloud[~cloud.index.isin(local_key)].rename(columns=CLOUD_TO_LOCAL)[list(CLOUD_TO_LOCAL.values())].copy()
+    df_new['Date'] = df_new['Date'].map(normalize_date)
+    df_new['Type'] = df_new['Type'].fillna('Auto')
+    for _, row in df_new.iterrows():
+        print(f"   [NOUVEAU] Import du match : {row['Home']} vs {row['Away']} ({row['Date']})")
+
     # Fusion
-    if new_rows:
-        df_new = pd.DataFrame(new_rows)
-        df_local = pd.concat([df_local, df_new], ignore_index=True)
+    if len(df_new):
+        df_local = pd.concat([df_local, df_new.reset_index(drop=True)], ignore_index=True)
         # On trie par date pour faire propre
         df_local['Date'] = pd.to_datetime(df_local['Date'])
         df_local = df_local.sort_values('Date')
         # Remise en string YYYY-MM-DD
         df_local['Date'] = df_local['Date'].dt.strftime('%Y-%m-%d')
-        
-    # Sauvegarde
-    if updates_count > 0 or len(new_rows) > 0:
+
+    # Sauvegarde (le high water n'avance qu'une fois le CSV écrit)
+    if updates_count > 0 or len(df_new) > 0:
         df_local.to_csv(CSV_PATH, index=False)
-        print(f"\n[SUCCÈS] {updates_count} mises à jour et {len(new_rows)} ajouts sauvegardés.")
+        print(f"\n[SUCCÈS] {updates_count} mises à jour et {len(df_new)} ajouts sauvegardés.")
     else:
         print("\n[INFO] Tout est déjà synchro.")
+    if new_high_water: save_high_water(new_high_water)
+    return True
 
 if __name__ == "__main__":
-    pull_votes_from_cloud()
\ No newline at end of file
+    sys.exit(0 if pull_votes_from_cloud() else 1)
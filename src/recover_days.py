@@ -1,15 +1,18 @@
 import pandas as pd
 import os
+import sys
 from datetime import datetime
 from nba_api.stats.endpoints import scoreboardv2
-from nba_api.stats.static import teams
+
+# Permet l'exécution directe (python src/recover_days.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import nba_cache, teams_registry
 
 HISTORY_FILE = 'data/bets_history.csv'
 DATES_TO_RECOVER = ['2025-12-28', '2025-12-29']
 
 def get_team_name(tid):
-    try: return teams.find_team_name_by_id(tid)['full_name']
-    except: return "Unknown"
+    return teams_registry.full_name(tid, default="Unknown")
 
 def recover():
     print("--- RATTRAPAGE DES JOURS MANQUANTS ---")
@@ -26,7 +29,7 @@ def recover():
     for d_str in DATES_TO_RECOVER:
         print(f"🔍 Scan du {d_str}...")
         try:
-            board = scoreboardv2.ScoreboardV2(game_date=d_str)
+            board = nba_cache.fetch(scoreboardv2.ScoreboardV2, game_date=d_str)
             games = board.game_header.get_data_frame()
             
             # Filtre les vrais matchs
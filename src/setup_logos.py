@@ -1,53 +1,59 @@
 import os
-import requests
-from nba_api.stats.static import teams
-import time
+import sys
+
+# Permet l'import de src/ quel que soit le dossier de lancement
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import nba_client, teams_registry
 
 # Configuration
 LOGO_DIR = os.path.join("..", "assets", "logos") 
 
-print(f"--- TÉLÉCHARGEMENT DES LOGOS NBA ---")
-
-# 1. Création du dossier s'il n'existe pas
-if not os.path.exists(LOGO_DIR):
-    os.makedirs(LOGO_DIR)
-    print(f"📂 Dossier '{LOGO_DIR}' créé.")
-else:
-    print(f"📂 Dossier '{LOGO_DIR}' existant détecté.")
-
-# 2. Récupération de la liste des équipes
-nba_teams = teams.get_teams()
-print(f"🎯 {len(nba_teams)} équipes trouvées.")
-
-# 3. Boucle de téléchargement
-count = 0
-for team in nba_teams:
-    team_id = team['id']
-    abbrev = team['abbreviation']
-    
-    # URL officielle des logos NBA (Format SVG, très léger et net)
-    url = f"https://cdn.nba.com/logos/nba/{team_id}/global/L/logo.svg"
-    
-    # Nom du fichier local (ex: logos/1610612747.svg)
-    filename = f"{LOGO_DIR}/{team_id}.svg"
-    
-    # On ne télécharge que si on ne l'a pas déjà
-    if not os.path.exists(filename):
-        try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                with open(filename, 'wb') as f:
-                    f.write(response.content)
-                print(f"✅ {abbrev} téléchargé.")
-                count += 1
-            else:
-                print(f"❌ {abbrev} introuvable (Code {response.status_code})")
-        except Exception as e:
-            print(f"⚠️ Erreur pour {abbrev} : {e}")
-        
-        # Petite pause pour être poli avec le serveur
-        time.sleep(0.2)
+def download_logos():
+    """Logos SVG des 30 équipes (seuls les manquants sont téléchargés) ; retourne le nombre récupéré"""
+    print(f"--- TÉLÉCHARGEMENT DES LOGOS NBA ---")
+
+    # 1. Création du dossier s'il n'existe pas
+    if not os.path.exists(LOGO_DIR):
+        os.makedirs(LOGO_DIR)
+        print(f"📂 Dossier '{LOGO_DIR}' créé.")
     else:
-        print(f"➡️ {abbrev} déjà présent.")
+        print(f"📂 Dossier '{LOGO_DIR}' existant détecté.")
+
+    # 2. Récupération de la liste des équipes
+    nba_teams = teams_registry.TEAMS
+    print(f"🎯 {len(nba_teams)} équipes trouvées.")
+
+    # 3. Boucle de téléchargement
+    count = 0
+    for team in nba_teams:
+        team_id = team.id
+        abbrev = team.code
+
+        # URL officielle des logos NBA (Format SVG, très léger et net)
+        url = f"https://cdn.nba.com/logos/nba/{team_id}/global/L/logo.svg"
+
+        # Nom du fichier local (ex: logos/1610612747.svg)
+        filename = f"{LOGO_DIR}/{team_id}.svg"
+
+        # On ne télécharge que si on ne l'a pas déjà
+        if not os.path.exists(filename):
+            try:
+                # Throttling et retries gérés par le client CDN partagé
+                response = nba_client.CDN.get(url, timeout=10)
+                if response.status_code == 200:
+                    with open(filename, 'wb') as f:
+                        f.write(response.content)
+                    print(f"✅ {abbrev} téléchargé.")
+                    count += 1
+                else:
+                    print(f"❌ {abbrev} introuvable (Code {response.status_code})")
+            except Exception as e:
+                print(f"⚠️ Erreur pour {abbrev} : {e}")
+        else:
+            print(f"➡️ {abbrev} déjà présent.")
+
+    print(f"\n✨ Terminé ! {count} nouveaux logos récupérés dans le dossier '{LOGO_DIR}'.")
+    return count
 
-print(f"\n✨ Terminé ! {count} nouveaux logos récupérés dans le dossier '{LOGO_DIR}'.")
\ No newline at end of file
+if __name__ == "__main__":
+    download_logos()
@@ -0,0 +1,122 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Client REST Supabase (PostgREST) partagé par l'app et les scripts de sync.
+# Une seule requests.Session : connexions gardées ouvertes (keep-alive) dans un pool,
+# donc plus de poignée de main TCP+TLS à chaque vote ou à chaque lot envoyé.
+# Timeouts systématiques, retries avec backoff sur erreurs réseau / 429 / 5xx, réponses gzip.
+
+# --- CONFIG ---
+TIMEOUT = (5, 30)           # (connexion, lecture) en secondes
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5        # 0.5s, 1s, 2s... (Retry-After respecté)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+POOL_SIZE = 10              # connexions gardées ouvertes vers l'hôte Supabase
+PAGE_SIZE = 1000            # max-rows par défaut de PostgREST chez Supabase
+BATCH_SIZE = 500
+
+class SupabaseClient:
+    """Accès PostgREST : select paginé, insert, upsert par lots et patch filtré.
+
+    Les filtres sont au format PostgREST : {'game_date': 'eq.2024-01-05', 'updated_at': 'gte.…'}.
+    Toute réponse en erreur (après retries) lève requests.HTTPError.
+    """
+
+    def __init__(self, url, key, timeout=TIMEOUT, max_retries=MAX_RETRIES, pool_size=POOL_SIZE):
+        self.base = f"{url.rstrip('/')}/rest/v1"
+        self.timeout = timeout
+        headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        # Lectures, patchs filtrés et upserts on_conflict (merge-duplicates) sont idempotents :
+        # retentés sur erreur réseau / 429 / 5xx, POST compris.
+        self.session = self.make_session(headers, max_retries, pool_size, ['GET', 'POST', 'PATCH'])
+        # Un insert simple ne l'est pas : après un timeout ou un 5xx, la ligne a peut-être été écrite,
+        # le retenter la doublerait (ou finirait en 409). Seuls les échecs de connexion sont retentés.
+        self.once = self.make_session(headers, max_retries, pool_size, ['GET'])
+
+    @staticmethod
+    def make_session(headers, max_retries, pool_size, methods):
+        session = requests.Session()
+        session.headers.update(headers)
+        retry = Retry(
+            total=max_retries, backoff_factor=BACKOFF_FACTOR, status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset(methods), raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, method, table, params=None, json=None, prefer=None, idempotent=True):
+        """Requête PostgREST ; `idempotent=False` : pas de retry une fois la requête envoyée"""
+        headers = {"Prefer": prefer} if prefer else None
+        session = self.session if idempotent else self.once
+        r = session.request(method, f"{self.base}/{table}", params=params, json=json,
+                            headers=headers, timeout=self.timeout)
+        r.raise_for_status()
+        return r
+
+    def select(self, table, columns="*", filters=None, order=None, page_size=PAGE_SIZE):
+        """Toutes les lignes correspondantes, lues page par page (limit/offset)"""
+        rows, offset = [], 0
+        while True:
+            params = {'select': columns, **(filters or {}), 'limit': page_size, 'offset': offset}
+            if order: params['order'] = order
+            page = self.request("GET", table, params=params).json()
+            rows.extend(page)
+            if len(page) < page_size: return rows
+            offset += page_size
+
+    def insert(self, table, rows, returning=False):
+        """Insertion simple (échoue si la ligne existe déjà) ; `returning` : lignes écrites par le serveur"""
+        r = self.request("POST", table, json=rows, prefer="return=representation" if returning else "return=minimal",
+                         idempotent=False)
+        return r.json() if returning else r
+
+    def upsert(self, table, rows, on_conflict=None, batch_size=BATCH_SIZE):
+        """Insert-or-update par lots de batch_size ; retourne le nombre de lignes envoyées.
+
+        Retenté en cas d'erreur seulement avec `on_conflict` (clé de résolution explicite).
+        """
+        params = {'on_conflict': ",".join(on_conflict)} if on_conflict else None
+        for i in range(0, len(rows), batch_size):
+            self.request("POST", table, params=params, json=rows[i:i + batch_size],
+                         prefer="resolution=merge-duplicates,return=minimal", idempotent=bool(on_conflict))
+        return len(rows)
+
+    def patch(self, table, filters, payload, returning=False):
+        """Mise à jour des lignes correspondant aux filtres (jamais sans filtre) ; `returning` : lignes modifiées"""
+        if not filters: raise ValueError("patch sans filtre refusé")
+        r = self.request("PATCH", table, params=filters, json=payload, prefer="return=representation" if returning else "return=minimal")
+        return r.json() if returning else r
+
+def eq(value):
+    """Filtre d'égalité PostgREST"""
+    return f"eq.{value}"
+
+def env_credentials():
+    """(url, clé) depuis l'environnement : style Python puis style Next.js"""
+    url = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+    return url, key
+
+_clients = {}
+_lock = threading.Lock()
+
+def get_client(url=None, key=None):
+    """Client partagé par (url, clé) dans le process ; None si les clés sont absentes"""
+    if not url or not key:
+        env_url, env_key = env_credentials()
+        url, key = url or env_url, key or env_key
+    if not url or not key: return None
+    with _lock:
+        if (url, key) not in _clients: _clients[(url, key)] = SupabaseClient(url, key)
+        return _clients[(url, key)]
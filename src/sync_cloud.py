@@ -1,10 +1,14 @@
 import pandas as pd
 import requests
-import json
 import os
+import sys
 import numpy as np
 from dotenv import load_dotenv
 
+# Permet l'exécution directe (python src/sync_cloud.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import sync_manifest, supabase_client
+
 # Chargement des secrets
 load_dotenv()
 
@@ -12,17 +16,20 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 CSV_PATH = "data/bets_history.csv"
+TABLE = "bets_history"
+KEY_FIELDS = ['game_date', 'home_team', 'away_team']
 
 def sync_to_supabase():
+    """Pousse bets_history (delta) ; retourne True si tout est à jour côté Supabase"""
     print("--- SYNCHRONISATION VERS SUPABASE (CLEAN & DEDUP) ---")
     
     if not SUPABASE_URL or not SUPABASE_KEY:
         print("[ERREUR] Clés manquantes.")
-        return
+        return False
 
     if not os.path.exists(CSV_PATH):
         print(f"[ERREUR] CSV introuvable : {CSV_PATH}")
-        return
+        return False
 
     # 1. Lecture
     try:
@@ -34,12 +41,6 @@ def sync_to_supabase():
         df = df.drop_duplicates(subset=['Date', 'Home', 'Away'], keep='last')
         count_after = len(df)
         
-        # DELTA OPTIMIZATION: Only sync the last 100 items
-        # This prevents sending 3000+ rows every morning while keeping latest results updated
-        if len(df) > 100:
-            print(f"[INFO] Delta Sync actif : Envoi des 100 derniers paris uniquement.")
-            df = df.tail(100)
-            
         if count_before > count_after:
             print(f"[INFO] {count_before - count_after} doublons supprimés du CSV avant envoi.")
             # Optionnel : Sauvegarder le CSV propre
@@ -49,7 +50,7 @@ def sync_to_supabase():
         
     except Exception as e:
         print(f"[ERREUR] Traitement CSV : {e}")
-        return
+        return False
 
     # 3. Préparation des données (Tout l'historique propre)
     rows = []
@@ -69,27 +70,32 @@ def sync_to_supabase():
         }
         rows.append(row_data)
 
-    # 4. Envoi (Upsert)
-    endpoint = f"{SUPABASE_URL}/rest/v1/bets_history?on_conflict=game_date,home_team,away_team"
-    
-    headers = {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates"
-    }
+    # 4. Envoi (Upsert) : uniquement les lignes nouvelles ou modifiées depuis le dernier envoi réussi
+    client = supabase_client.get_client(SUPABASE_URL, SUPABASE_KEY)
+
+    def send_batch(batch):
+        try:
+            client.upsert(TABLE, batch, on_conflict=KEY_FIELDS)
+            return True
+        except requests.HTTPError as e:
+            print(f"[ERREUR API] {e.response.status_code} - {e.response.text}")
+            return False
 
     try:
-        print(f"[INFO] Envoi de {len(rows)} lignes uniques...")
-        r = requests.post(endpoint, headers=headers, json=rows)
-        
-        if r.status_code in [200, 201]:
-            print(f"[SUCCES] Supabase synchronisé ({len(rows)} matchs) !")
+        manifest = sync_manifest.SyncManifest()
+        print(f"[INFO] {len(rows)} lignes uniques, {len(manifest.changed(TABLE, rows, KEY_FIELDS))} à envoyer (delta par empreinte)...")
+        sent, failed = manifest.push(TABLE, rows, KEY_FIELDS, send_batch)
+        if failed:
+            print(f"[ATTENTION] {failed} lignes non envoyées, nouvel essai au prochain passage.")
+        elif sent:
+            print(f"[SUCCES] Supabase synchronisé ({sent} matchs) !")
         else:
-            print(f"[ERREUR API] {r.status_code} - {r.text}")
+            print("[INFO] Rien de nouveau à envoyer.")
+        return not failed
             
     except Exception as e:
         print(f"[CRASH] {e}")
+        return False
 
 if __name__ == "__main__":
-    sync_to_supabase()
\ No newline at end of file
+    sys.exit(0 if sync_to_supabase() else 1)
\ No newline at end of file
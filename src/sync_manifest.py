@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+
+# Manifeste local de ce qui a déjà été poussé vers Supabase : pour chaque table, l'empreinte
+# du contenu de chaque ligne (par clé). On n'envoie que les lignes nouvelles ou modifiées,
+# quel que soit leur âge, au lieu d'un tail(N) aveugle.
+
+# --- CHEMINS ---
+MANIFEST_FILE = "data/sync_manifest.json"
+
+# --- CONFIG ---
+BATCH_SIZE = 500
+
+# Plusieurs syncs (une par table) peuvent tourner en parallèle dans le même process
+_save_lock = threading.Lock()
+
+def row_key(record, key_fields):
+    return "|".join(str(record.get(k)) for k in key_fields)
+
+def row_hash(record):
+    raw = json.dumps(record, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+class SyncManifest:
+    def __init__(self, path=MANIFEST_FILE):
+        self.path = path
+        try:
+            with open(path, 'r') as f: self.tables = json.load(f)
+        except (OSError, ValueError):
+            self.tables = {}
+        self.touched = set()
+
+    def changed(self, table, records, key_fields):
+        """Lignes dont l'empreinte diffère de la dernière version poussée avec succès"""
+        pushed = self.tables.get(table, {})
+        return [r for r in records if pushed.get(row_key(r, key_fields)) != row_hash(r)]
+
+    def mark(self, table, records, key_fields):
+        pushed = self.tables.setdefault(table, {})
+        self.touched.add(table)
+        for r in records: pushed[row_key(r, key_fields)] = row_hash(r)
+
+    def save(self):
+        """Réécrit uniquement les tables modifiées par cette instance (les autres syncs
+        concurrentes gardent leurs propres marques)"""
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder): os.makedirs(folder, exist_ok=True)
+        with _save_lock:
+            try:
+                with open(self.path, 'r') as f: on_disk = json.load(f)
+            except (OSError, ValueError):
+                on_disk = {}
+            for table in self.touched: on_disk[table] = self.tables[table]
+            tmp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w') as f: json.dump(on_disk, f)
+            os.replace(tmp, self.path)
+
+    def push(self, table, records, key_fields, send_batch, batch_size=BATCH_SIZE):
+        """Envoie uniquement les lignes modifiées, par lots. send_batch(batch) -> True si succès.
+
+        Chaque lot réussi est inscrit au manifeste immédiatement : un échec en cours de route
+        sera simplement renvoyé au prochain passage. Retourne (envoyées, en échec).
+        """
+        todo = self.changed(table, records, key_fields)
+        sent = failed = 0
+        for i in range(0, len(todo), batch_size):
+            batch = todo[i:i + batch_size]
+            if send_batch(batch):
+                self.mark(table, batch, key_fields)
+                self.save()
+                sent += len(batch)
+            else:
+                failed += len(batch)
+        return sent, failed
@@ -0,0 +1,47 @@
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Permet l'exécution directe (python src/sync_stage.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Étape "synchro cloud" de la routine : les trois tables Supabase sont indépendantes,
+# on les pousse en parallèle dans le même process (imports et session HTTP partagés)
+# au lieu de trois sous-process en série. Un échec sur une table n'arrête pas les autres.
+
+# --- CONFIG ---
+# table Supabase -> (module, fonction de sync qui retourne True si la table est à jour)
+SYNCS = {
+    'bets_history': ('src.sync_cloud', 'sync_to_supabase'),
+    'nba_games': ('portable_sync_nba_games', 'sync_games'),
+    'nba_standings': ('portable_sync_standings', 'sync_standings'),
+}
+
+def run_one(table, module, func):
+    """Lance une sync isolée : toute exception est capturée et rapportée pour sa table"""
+    start = time.perf_counter()
+    try:
+        ok = bool(getattr(importlib.import_module(module), func)())
+        error = None if ok else "échec signalé par la sync"
+    except (Exception, SystemExit) as e:
+        ok, error = False, f"{type(e).__name__}: {e}"
+    return {'table': table, 'ok': ok, 'seconds': time.perf_counter() - start, 'error': error}
+
+def run_sync_stage(syncs=SYNCS):
+    """Toutes les syncs en parallèle ; retourne {table: {'ok', 'seconds', 'error'}}"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(syncs)) as pool:
+        futures = [pool.submit(run_one, table, module, func) for table, (module, func) in syncs.items()]
+        results = {f.result()['table']: f.result() for f in futures}
+
+    print(f"\n📊 Synchro cloud : {time.perf_counter() - start:.1f}s au total")
+    for table, r in results.items():
+        status = "✅" if r['ok'] else "❌"
+        print(f"   {status} {table:<14} {r['seconds']:5.1f}s" + (f"  ({r['error']})" if r['error'] else ""))
+    return results
+
+if __name__ == "__main__":
+    results = run_sync_stage()
+    sys.exit(0 if all(r['ok'] for r in results.values()) else 1)
@@ -0,0 +1,81 @@
+from collections import namedtuple
+from types import MappingProxyType
+
+import pandas as pd
+from nba_api.stats.static import teams
+
+# Référentiel unique des 30 équipes, construit une fois à l'import et en lecture seule.
+# Toutes les formes rencontrées dans le projet pointent vers la même fiche en O(1) :
+# id (1610612760 ou "1610612760"), abréviation ("OKC"), nom complet ("Oklahoma City Thunder"),
+# surnom ("Thunder") et l'ancien libellé "OKC Thunder" écrit par predict_today dans bets_history.csv.
+
+class Team(namedtuple('Team', ['id', 'code', 'full', 'nick', 'city'])):
+    __slots__ = ()
+
+    @property
+    def label(self):
+        """Libellé court historique ('OKC Thunder')"""
+        return f"{self.code} {self.nick}"
+
+def normalize_label(value):
+    """Clé de recherche : minuscules, espaces superflus retirés"""
+    return " ".join(str(value).split()).lower()
+
+TEAMS = tuple(sorted((Team(t['id'], t['abbreviation'], t['full_name'], t['nickname'], t['city']) for t in teams.get_teams()),
+                     key=lambda t: t.full))
+
+BY_ID = MappingProxyType({t.id: t for t in TEAMS})
+BY_CODE = MappingProxyType({t.code: t for t in TEAMS})
+BY_FULL = MappingProxyType({t.full: t for t in TEAMS})
+
+_BY_LABEL = {}
+for _t in TEAMS:
+    for _alias in (str(_t.id), _t.code, _t.full, _t.nick, _t.label, f"{_t.city} {_t.nick}"):
+        _BY_LABEL[normalize_label(_alias)] = _t
+BY_LABEL = MappingProxyType(_BY_LABEL)
+del _t, _alias
+
+def lookup(value):
+    """Fiche de l'équipe pour un id, une abréviation, un nom ou un libellé ; None si inconnue.
+
+    Dernier recours (comme l'ancien get_clean_name de l'app) : le premier mot pris comme
+    abréviation, pour des libellés du type "LAL Lakers" mal orthographiés.
+    """
+    if value is None: return None
+    if pd.api.types.is_integer(value) or (pd.api.types.is_float(value) and float(value).is_integer()):
+        return BY_ID.get(int(value))
+    key = normalize_label(value)
+    team = BY_LABEL.get(key)
+    if team is None and key:
+        team = BY_CODE.get(key.split(' ')[0].upper())
+    return team
+
+def team_id(value, default=None):
+    team = lookup(value)
+    return team.id if team else default
+
+def full_name(value, default=None):
+    team = lookup(value)
+    return team.full if team else default
+
+def code(value, default=None):
+    team = lookup(value)
+    return team.code if team else default
+
+def normalize_column(values, field='full'):
+    """Colonne entière (noms, libellés ou ids) -> champ canonique ('id', 'code', 'full', 'nick', 'label').
+
+    Une seule résolution par valeur distincte puis un map vectorisé ; NaN pour les inconnues.
+    """
+    values = pd.Series(values)
+    uniques = pd.unique(values.dropna())
+    resolved = {}
+    for v in uniques:
+        team = lookup(v)
+        if team is not None: resolved[v] = getattr(team, field)
+    return values.map(resolved)
+
+def code_column(values):
+    """Abréviations d'une colonne ; une valeur inconnue garde ses 3 premiers caractères en majuscules"""
+    values = pd.Series(values)
+    return normalize_column(values, 'code').fillna(values.astype(str).str[:3].str.upper())
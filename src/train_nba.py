@@ -3,6 +3,11 @@ import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 import os
+import sys
+
+# Permet l'exécution directe (python src/train_nba.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import tree_model
 
 # --- CHEMINS ---
 DATA_FILE = "data/nba_games_ready.csv"
@@ -41,6 +46,8 @@ def train_model():
         if not os.path.exists("models"): os.makedirs("models")
         
         model.save_model(MODEL_FILE)
+        # Export en tableaux NumPy : l'app et les scripts prédisent sans importer xgboost
+        tree_model.export_trees(MODEL_FILE)
         acc = accuracy_score(y_test, model.predict(X_test))
         return True, "Modele sauvegarde.", acc
 
@@ -0,0 +1,123 @@
+import numpy as np
+import hashlib
+import json
+import os
+
+# Évaluation du modèle XGBoost sans xgboost : les arbres du JSON sont aplatis en tableaux
+# de noeuds (feature, seuil, enfants, feuille) et parcourus pour toutes les lignes à la fois.
+
+def export_path(model_file):
+    """models/nba_predictor.json -> models/nba_predictor.npz"""
+    return os.path.splitext(model_file)[0] + ".npz"
+
+def parse_base_score(raw):
+    """Prior du modèle : '5.88E-1' (xgboost 1.x) ou format vectoriel '[5.88E-1]' (xgboost >= 2)"""
+    values = [float(v) for v in str(raw).strip().strip('[]').split(',') if v.strip()]
+    if len(values) != 1: raise ValueError(f"base_score multi-cibles non supporté : {raw}")
+    return values[0]
+
+def compile_trees(model_file):
+    """Lit le JSON sauvegardé par XGBoost (binary:logistic) et retourne les tableaux de noeuds.
+
+    Les noeuds de tous les arbres sont concaténés (indices globaux). Une feuille pointe vers
+    elle-même à gauche et à droite, ce qui permet un parcours à profondeur fixe.
+    """
+    with open(model_file, 'r', encoding='utf-8') as f:
+        learner = json.load(f)['learner']
+
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Objectif non supporté : {objective}")
+
+    feature, threshold, left, right, default_left, leaf, roots = [], [], [], [], [], [], []
+    depth, offset = 0, 0
+    for tree in learner['gradient_booster']['model']['trees']:
+        l = np.asarray(tree['left_children'], dtype=np.int64)
+        r = np.asarray(tree['right_children'], dtype=np.int64)
+        cond = np.asarray(tree['split_conditions'], dtype=np.float32)
+        is_leaf = l == -1
+        own = np.arange(len(l)) + offset
+
+        feature.append(np.where(is_leaf, 0, tree['split_indices']))
+        threshold.append(np.where(is_leaf, 0, cond))
+        left.append(np.where(is_leaf, own, l + offset))
+        right.append(np.where(is_leaf, own, r + offset))
+        default_left.append(np.asarray(tree['default_left'], dtype=bool))
+        leaf.append(np.where(is_leaf, cond, 0))
+        roots.append(offset)
+
+        # Profondeur de l'arbre (remontée des parents, la racine a un parent hors bornes)
+        parents = np.asarray(tree['parents'], dtype=np.int64)
+        level = np.zeros(len(l), dtype=np.int64)
+        for node in range(1, len(l)):
+            level[node] = level[parents[node]] + 1
+        depth = max(depth, int(level.max()))
+        offset += len(l)
+
+    base_score = parse_base_score(learner['learner_model_param']['base_score'])
+    return {
+        'feature': np.concatenate(feature).astype(np.int32),
+        'threshold': np.concatenate(threshold).astype(np.float32),
+        'left': np.concatenate(left).astype(np.int32),
+        'right': np.concatenate(right).astype(np.int32),
+        'default_left': np.concatenate(default_left),
+        'leaf': np.concatenate(leaf).astype(np.float32),
+        'roots': np.asarray(roots, dtype=np.int32),
+        'depth': np.int32(depth),
+        'base_margin': np.float64(np.log(base_score / (1 - base_score))),
+        'feature_names': np.asarray(learner.get('feature_names', []), dtype=str),
+    }
+
+def export_trees(model_file, out_file=None):
+    """Compile le JSON et écrit les tableaux à côté (.npz), écriture atomique"""
+    out_file = out_file or export_path(model_file)
+    arrays = compile_trees(model_file)
+    tmp = out_file + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, out_file)
+    return out_file
+
+class TreeEnsemble:
+    """Forêt aplatie : predict() reproduit predict_proba(X)[:, 1] de XGBoost"""
+
+    def __init__(self, arrays):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.default_left = arrays['default_left']
+        self.leaf = arrays['leaf']
+        self.roots = arrays['roots']
+        self.depth = int(arrays['depth'])
+        self.base_margin = float(arrays['base_margin'])
+        self.feature_names = [str(n) for n in arrays['feature_names']]
+        # Empreinte du contenu (identique que le modèle vienne du .npz ou du JSON)
+        h = hashlib.sha1()
+        for name in ('feature', 'threshold', 'left', 'right', 'default_left', 'leaf', 'roots'):
+            h.update(np.ascontiguousarray(arrays[name]).tobytes())
+        h.update(np.float64(self.base_margin).tobytes())
+        self.digest = h.hexdigest()[:16]
+
+    @classmethod
+    def load(cls, model_file):
+        """Tableaux exportés (.npz) s'ils sont à jour, sinon compilation directe du JSON"""
+        npz = export_path(model_file)
+        if os.path.exists(npz) and (not os.path.exists(model_file) or os.path.getmtime(npz) >= os.path.getmtime(model_file)):
+            with np.load(npz) as data:
+                return cls({k: data[k] for k in data.files})
+        return cls(compile_trees(model_file))
+
+    def predict(self, X):
+        """Probabilité de la classe 1 pour chaque ligne (entrées ramenées en float32 comme XGBoost)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat, has_nan = X.ravel(), np.isnan(X).any()
+        row_offset = (np.arange(len(X), dtype=np.int32) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.depth):
+            x = flat.take(row_offset + self.feature.take(node))
+            go_left = x < self.threshold.take(node)
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.default_left.take(node), go_left)
+            node = np.where(go_left, self.left.take(node), self.right.take(node))
+        margin = self.base_margin + self.leaf.take(node).sum(axis=1, dtype=np.float64)
+        return 1.0 / (1.0 + np.exp(-margin))
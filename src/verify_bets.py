@@ -1,136 +1,126 @@
 import pandas as pd
 import os
-import time
+import sys
 from datetime import datetime
 from nba_api.stats.endpoints import leaguegamefinder
-from nba_api.stats.static import teams
+
+# Permet l'exécution directe (python src/verify_bets.py) depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src import nba_cache, teams_registry
 
 HISTORY_FILE = 'data/bets_history.csv'
 
 # --- OUTILS ---
-def get_teams_dict():
-    nba_teams = teams.get_teams()
-    return {t['id']: {'full': t['full_name'], 'code': t['abbreviation']} for t in nba_teams}
-
-TEAMS_DB = get_teams_dict()
-
 def clean_id(val):
     """Nettoyage ID robuste (int -> string sans zero)"""
     try: return str(int(float(val))).lstrip('0')
     except: return str(val).lstrip('0')
 
+def blank(col):
+    """Cellule vide : NaN ou chaîne vide"""
+    return col.isna() | (col == "")
+
+def grade(pred, real):
+    return pd.Series(pred.to_numpy() == real.to_numpy(), index=pred.index).map({True: "GAGNE", False: "PERDU"})
+
+def repair_offline(df):
+    """Real_Winner connu mais GAGNE/PERDU pas encore calculé : recalcul par masques. Retourne le nb de lignes"""
+    has_real = ~blank(df['Real_Winner'])
+    fix_ia = has_real & blank(df['Result'])
+    fix_user = has_real & ~blank(df['User_Prediction']) & blank(df['User_Result'])
+    df.loc[fix_ia, 'Result'] = grade(df.loc[fix_ia, 'Predicted_Winner'], df.loc[fix_ia, 'Real_Winner'])
+    df.loc[fix_user, 'User_Result'] = grade(df.loc[fix_user, 'User_Prediction'], df.loc[fix_user, 'Real_Winner'])
+    return int((fix_ia | fix_user).sum())
+
+def fetch_winners(date_from, date_to):
+    """Un seul appel LeagueGameFinder sur toute la plage, puis un vainqueur par GAME_ID.
+
+    Retourne un DataFrame (Date, Home, Away, Real_Winner) avec les noms complets. Chaque match
+    apparaît aussi dans le sens inverse (Home/Away échangés) pour tolérer un CSV inversé.
+    """
+    d_from = datetime.strptime(date_from, '%Y-%m-%d').strftime('%m/%d/%Y')
+    d_to = datetime.strptime(date_to, '%Y-%m-%d').strftime('%m/%d/%Y')
+    finder = nba_cache.fetch(leaguegamefinder.LeagueGameFinder,
+        date_from_nullable=d_from,
+        date_to_nullable=d_to,
+        league_id_nullable='00'
+    )
+    results = finder.get_data_frames()[0]
+    if results.empty: return pd.DataFrame(columns=['Date', 'Home', 'Away', 'Real_Winner'])
+
+    r = results.assign(TEAM=teams_registry.normalize_column(results['TEAM_ID'].astype(int), 'full'))
+    r = r.dropna(subset=['TEAM'])
+    r['SIDE'] = r['MATCHUP'].str.contains(' vs. ').map({True: 'Home', False: 'Away'})
+
+    by_game = r.groupby('GAME_ID')
+    games = r.pivot_table(index='GAME_ID', columns='SIDE', values='TEAM', aggfunc='first')
+    games['Date'] = by_game['GAME_DATE'].first()
+    games['Real_Winner'] = r[r['WL'] == 'W'].groupby('GAME_ID')['TEAM'].first()
+    games = games.dropna(subset=['Home', 'Away', 'Real_Winner'])
+
+    swapped = games.rename(columns={'Home': 'Away', 'Away': 'Home'})
+    both = pd.concat([games, swapped], ignore_index=True)[['Date', 'Home', 'Away', 'Real_Winner']]
+    return both.drop_duplicates(subset=['Date', 'Home', 'Away'])
+
 def verify():
+    """Met à jour les résultats des paris passés ; False seulement si l'historique est absent"""
     print("\n--- VÉRIFICATION DES RÉSULTATS (LIVE API) ---")
     
     if not os.path.exists(HISTORY_FILE):
         print("[ERREUR] Pas d'historique.")
-        return
+        return False
 
     df = pd.read_csv(HISTORY_FILE)
     updates = 0
 
     # --- ÉTAPE 0 : RÉPARATION OFFLINE ---
     # Si on a déjà le Real_Winner mais qu'on a oublié de calculer le GAGNE/PERDU localement
-    mask_fixable_ia = (df['Real_Winner'].notna() & (df['Real_Winner'] != "")) & (df['Result'].isna() | (df['Result'] == ""))
-    mask_fixable_user = (df['Real_Winner'].notna() & (df['Real_Winner'] != "")) & (df['User_Prediction'].notna() & (df['User_Prediction'] != "")) & (df['User_Result'].isna() | (df['User_Result'] == ""))
-    
-    fix_indices = df[mask_fixable_ia | mask_fixable_user].index
-    if len(fix_indices) > 0:
-        print(f"[REPARATION] {len(fix_indices)} lignes à recalculer hors-ligne...")
-        for idx in fix_indices:
-            real_w = df.at[idx, 'Real_Winner']
-            # IA
-            if pd.isna(df.at[idx, 'Result']) or df.at[idx, 'Result'] == "":
-                pred_ia = df.at[idx, 'Predicted_Winner']
-                df.at[idx, 'Result'] = "GAGNE" if pred_ia == real_w else "PERDU"
-            # User
-            if pd.isna(df.at[idx, 'User_Result']) or df.at[idx, 'User_Result'] == "":
-                u_pred = df.at[idx, 'User_Prediction']
-                if pd.notna(u_pred) and u_pred != "":
-                    df.at[idx, 'User_Result'] = "GAGNE" if u_pred == real_w else "PERDU"
-        updates += len(fix_indices)
+    fixed = repair_offline(df)
+    if fixed > 0:
+        print(f"[REPARATION] {fixed} lignes recalculées hors-ligne.")
+        updates += fixed
 
     # --- ÉTAPE 1 : IDENTIFIER LES MATCHS VRAIMENT VIDE (API) ---
-    # On regarde si Real_Winner est vide ou null
-    mask_pending = df['Real_Winner'].isna() | (df['Real_Winner'] == "") | (df['Real_Winner'] == "En attente...")
-    
-    # On ne garde que les dates passées
+    # On regarde si Real_Winner est vide ou null, et on ne garde que les dates passées
     today_str = datetime.now().strftime('%Y-%m-%d')
-    mask_date = df['Date'] < today_str
+    mask_pending = (blank(df['Real_Winner']) | (df['Real_Winner'] == "En attente...")) & (df['Date'] < today_str)
     
-    pending_indices = df[mask_pending & mask_date].index
-    
-    if len(pending_indices) == 0:
+    if not mask_pending.any():
         if updates > 0:
             df.to_csv(HISTORY_FILE, index=False)
             print(f"[SUCCES] Recalcul terminé ({updates} lignes).")
         else:
             print("[INFO] Aucun match passé en attente de résultat.")
-        return
+        return True
 
-    print(f"[INFO] {len(pending_indices)} matchs à vérifier via API...")
-    # ... (reste du code API inchangé)
-    # Récupérer les dates uniques concernées pour ne pas spammer l'API
-    dates_to_check = df.loc[pending_indices, 'Date'].unique()
-    
-    for d_str in dates_to_check:
-        print(f"   -> Scan API pour le {d_str}...")
-        try:
-            # Format Date US pour l'API
-            d_us = datetime.strptime(d_str, '%Y-%m-%d').strftime('%m/%d/%Y')
-            
-            finder = leaguegamefinder.LeagueGameFinder(
-                date_from_nullable=d_us,
-                date_to_nullable=d_us,
-                league_id_nullable='00'
-            )
-            results = finder.get_data_frames()[0]
-            
-            if results.empty:
-                print("      (Pas de données API)")
-                continue
-
-            # On construit un mapping Nom -> Resultat depuis l'API pour cette date
-            team_results_day = {}
-            for _, r in results.iterrows():
-                tid = int(r['TEAM_ID'])
-                if tid in TEAMS_DB:
-                    tname = TEAMS_DB[tid]['full']
-                    outcome = "W" if r['WL'] == 'W' else "L"
-                    team_results_day[tname] = outcome
-
-            # Application au CSV
-            for idx in pending_indices:
-                if df.at[idx, 'Date'] == d_str:
-                    home = df.at[idx, 'Home']
-                    away = df.at[idx, 'Away']
-                    pred_ia = df.at[idx, 'Predicted_Winner']
-                    
-                    real_winner = None
-                    if team_results_day.get(home) == 'W': real_winner = home
-                    elif team_results_day.get(away) == 'W': real_winner = away
-                    
-                    if real_winner:
-                        df.at[idx, 'Real_Winner'] = real_winner
-                        df.at[idx, 'Result'] = "GAGNE" if pred_ia == real_winner else "PERDU"
-                        user_pred = df.at[idx, 'User_Prediction']
-                        if pd.notna(user_pred) and user_pred != "":
-                            df.at[idx, 'User_Result'] = "GAGNE" if user_pred == real_winner else "PERDU"
-                        updates += 1
-                        print(f"      [MAJ] {home} vs {away} -> Vainqueur: {real_winner}")
-
-            time.sleep(0.6) # Anti-ban
-
-        except Exception as e:
-            print(f"      [ERREUR] {e}")
+    # --- ÉTAPE 2 : UN SEUL APPEL API SUR TOUTE LA PLAGE EN ATTENTE ---
+    pending = df.loc[mask_pending, ['Date', 'Home', 'Away']]
+    d_min, d_max = pending['Date'].min(), pending['Date'].max()
+    print(f"[INFO] {len(pending)} matchs à vérifier via API (du {d_min} au {d_max})...")
+    try:
+        winners = fetch_winners(d_min, d_max)
+    except Exception as e:
+        print(f"      [ERREUR] {e}")
+        winners = pd.DataFrame(columns=['Date', 'Home', 'Away', 'Real_Winner'])
+
+    # --- ÉTAPE 3 : RÉSOLUTION PAR JOINTURE (Date, Home, Away) ---
+    resolved = pending.reset_index().merge(winners, on=['Date', 'Home', 'Away'], how='inner').set_index('index')
+    if not resolved.empty:
+        idx = resolved.index
+        df.loc[idx, 'Real_Winner'] = resolved['Real_Winner']
+        df.loc[idx, 'Result'] = grade(df.loc[idx, 'Predicted_Winner'], resolved['Real_Winner'])
+        has_user = idx[~blank(df.loc[idx, 'User_Prediction'])]
+        df.loc[has_user, 'User_Result'] = grade(df.loc[has_user, 'User_Prediction'], resolved.loc[has_user, 'Real_Winner'])
+        updates += len(resolved)
+        for _, row in resolved.iterrows():
+            print(f"      [MAJ] {row['Home']} vs {row['Away']} -> Vainqueur: {row['Real_Winner']}")
 
     if updates > 0:
         df.to_csv(HISTORY_FILE, index=False)
         print(f"\n[SUCCES] {updates} résultats mis à jour au total.")
     else:
         print("\n[INFO] Rien à mettre à jour.")
-if __name__ == "__main__":
-    verify()
+    return True
 
 if __name__ == "__main__":
-    verify()
\ No newline at end of file
+    sys.exit(0 if verify() else 1)
@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from src import supabase_client
+
+# File d'attente des votes (write-behind). Un clic écrit le vote dans un journal SQLite local
+# et rend la main tout de suite ; un thread envoie ensuite les votes en attente, chacun par un
+# PATCH filtré sur la clé du match (mise à jour seule, comme avant : jamais de ligne créée par un
+# vote), sur la session poolée du client. Si Supabase est lent ou injoignable, les votes restent
+# dans le journal (même après un redémarrage de l'app) et l'envoi est retenté avec un délai croissant.
+
+# --- CHEMINS ---
+JOURNAL_FILE = "data/vote_queue.db"
+
+# --- CONFIG ---
+TABLE = "bets_history"
+KEY_FIELDS = ['game_date', 'home_team', 'away_team']
+VOTE_FIELDS = ['user_prediction', 'user_reason']
+FLUSH_DELAY = 1.0       # secondes d'attente avant envoi : les clics rapprochés partent ensemble
+RETRY_BASE = 2          # premier délai après un échec (s), doublé à chaque nouvel échec
+RETRY_MAX = 120
+ORPHAN_RETRY = 30       # vote sur un pari pas encore confirmé côté cloud : nouvel essai après (s)
+ORPHAN_TTL = 10 * 60    # au-delà, le pari n'existe pas (ajout échoué / annulé) : vote abandonné
+
+class VoteQueue:
+    """Journal des votes + thread d'envoi groupé.
+
+    Un seul vote par match dans le journal : revoter avant l'envoi remplace le précédent.
+    Une ligne n'est retirée du journal qu'une fois le PATCH confirmé sur une ligne existante,
+    et seulement si elle n'a pas été revotée pendant l'envoi. Un vote sur un pari que le cloud
+    ne connaît pas encore (ajout write-through en cours) reste en attente, ORPHAN_TTL au plus.
+    """
+    def __init__(self, client, path=JOURNAL_FILE, table=TABLE):
+        self.client, self.path, self.table = client, path, table
+        self.flushed = 0
+        self.dropped = 0
+        self.last_error = None
+        self.retry_at = None
+        self.wake = threading.Event()
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder): os.makedirs(folder, exist_ok=True)
+        with self.connect() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS votes (
+                game_date TEXT, home_team TEXT, away_team TEXT,
+                user_prediction TEXT, user_reason TEXT, seq INTEGER, queued_at REAL,
+                PRIMARY KEY (game_date, home_team, away_team))""")
+        self.worker = threading.Thread(target=self.run, name="vote-queue", daemon=True)
+        self.worker.start()
+        # Votes restés dans le journal lors d'une session précédente
+        if self.pending(): self.wake.set()
+
+    @contextmanager
+    def connect(self):
+        # Une connexion par appel : le clic (thread Streamlit) et le thread d'envoi ne la partagent pas
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with db: yield db   # commit (ou rollback) à la sortie
+        finally:
+            db.close()
+
+    def enqueue(self, game_date, home_team, away_team, user_prediction, user_reason):
+        """Journalise le vote (durable dès le retour) et réveille le thread d'envoi"""
+        with self.connect() as db:
+            db.execute("INSERT OR REPLACE INTO votes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (game_date, home_team, away_team, user_prediction, user_reason, time.time_ns(), time.time()))
+        self.wake.set()
+
+    def pending(self):
+        """Votes pas encore confirmés par le cloud (dicts, du plus ancien au plus récent)"""
+        with self.connect() as db:
+            db.row_factory = sqlite3.Row
+            return [dict(r) for r in db.execute("SELECT * FROM votes ORDER BY seq")]
+
+    def flush(self):
+        """Envoie les votes en attente (un PATCH par match) ; retourne le nombre de votes restés en attente"""
+        rows = self.pending()
+        done, waiting = [], 0
+        try:
+            for r in rows:
+                filters = {k: supabase_client.eq(r[k]) for k in KEY_FIELDS}
+                updated = self.client.patch(self.table, filters, {k: r[k] for k in VOTE_FIELDS}, returning=True)
+                if updated:
+                    self.flushed += 1
+                elif time.time() - r['queued_at'] > ORPHAN_TTL:
+                    self.dropped += 1
+                    print(f"[VOTES] Pari introuvable dans le cloud, vote abandonné : {' / '.join(r[k] for k in KEY_FIELDS)}")
+                else:
+                    waiting += 1
+                    continue
+                done.append(r)
+        finally:
+            # Votes confirmés retirés même si un envoi suivant échoue
+            with self.connect() as db:
+                db.executemany("DELETE FROM votes WHERE game_date = ? AND home_team = ? AND away_team = ? AND seq = ?",
+                               [tuple(r[k] for k in KEY_FIELDS) + (r['seq'],) for r in done])
+        return waiting
+
+    def run(self):
+        delay = 0
+        while True:
+            # Sans échec en cours : on dort jusqu'au prochain vote ; sinon jusqu'au prochain essai
+            self.wake.wait(delay or None)
+            self.wake.clear()
+            time.sleep(FLUSH_DELAY)
+            try:
+                waiting = self.flush()
+                delay, self.last_error = (ORPHAN_RETRY if waiting else 0), None
+                self.retry_at = time.time() + delay if waiting else None
+            except Exception as e:
+                # Le thread ne doit jamais mourir : le journal garde les votes jusqu'au prochain essai
+                delay = min(RETRY_MAX, delay * 2 or RETRY_BASE)
+                self.last_error, self.retry_at = str(e), time.time() + delay
+
+    def status(self):
+        """{'pending', 'flushed', 'dropped', 'last_error', 'retry_in'} pour l'indicateur de l'app"""
+        retry_in = max(0, int(self.retry_at - time.time())) if self.retry_at else None
+        return {'pending': len(self.pending()), 'flushed': self.flushed, 'dropped': self.dropped,
+                'last_error': self.last_error, 'retry_in': retry_in}
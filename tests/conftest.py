@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Les tests importent les modules comme l'app : `from src import ...` depuis la racine du projet
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,97 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Mini PostgREST local pour les tests du client Supabase : select (projection, filtres eq / gte,
+# tri multi-colonnes, limit / offset), insert, upsert on_conflict (merge-duplicates) et patch
+# filtré, avec return=representation. `fail` : codes HTTP à renvoyer aux prochaines requêtes.
+
+class Stub:
+    def __init__(self):
+        self.tables = {}
+        self.fail = []          # ex : [503] -> la prochaine requête reçoit un 503
+        self.requests = []      # (méthode, chemin)
+        self.connections = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            def log_message(self, *args): pass
+            def setup(self):
+                with stub.lock: stub.connections += 1
+                super().setup()
+            def do_GET(self): stub.handle(self, 'GET')
+            def do_POST(self): stub.handle(self, 'POST')
+            def do_PATCH(self): stub.handle(self, 'PATCH')
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, method):
+        return sum(1 for m, _ in self.requests if m == method)
+
+    def send(self, handler, code, body=None):
+        data = json.dumps(body).encode() if body is not None else b''
+        handler.send_response(code)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def handle(self, handler, method):
+        url = urlparse(handler.path)
+        table = url.path.split('/')[-1]
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(handler.headers.get('Content-Length', 0))
+        payload = json.loads(handler.rfile.read(length)) if length else None
+        with self.lock:
+            self.requests.append((method, handler.path))
+            if self.fail: return self.send(handler, self.fail.pop(0), {'message': 'injected failure'})
+            rows = self.tables.setdefault(table, [])
+            representation = 'return=representation' in (handler.headers.get('Prefer') or '')
+            filters = {k: v for k, v in query.items() if k not in ('select', 'order', 'limit', 'offset', 'on_conflict')}
+
+            if method == 'GET':
+                out = [r for r in rows if matches(r, filters)]
+                for part in reversed(query.get('order', '').split(',') if query.get('order') else []):
+                    col = part.split('.')[0]
+                    out.sort(key=lambda r: (r.get(col) is None, r.get(col)))
+                offset, limit = int(query.get('offset', 0)), int(query.get('limit', 10 ** 9))
+                out = out[offset:offset + limit]
+                if query.get('select', '*') != '*':
+                    cols = query['select'].split(',')
+                    out = [{c: r.get(c) for c in cols} for r in out]
+                return self.send(handler, 200, out)
+
+            if method == 'POST':
+                batch = payload if isinstance(payload, list) else [payload]
+                keys = query['on_conflict'].split(',') if 'on_conflict' in query else None
+                written = []
+                for new in batch:
+                    hit = [r for r in rows if keys and all(r.get(k) == new.get(k) for k in keys)]
+                    if hit:
+                        hit[0].update(new)
+                        written.append(hit[0])
+                    else:
+                        rows.append(dict(new))
+                        written.append(rows[-1])
+                return self.send(handler, 201, written if representation else None)
+
+            hit = [r for r in rows if matches(r, filters)]
+            for r in hit: r.update(payload)
+            return self.send(handler, 200 if representation else 204, hit if representation else None)
+
+def matches(row, filters):
+    for col, expr in filters.items():
+        op, value = expr.split('.', 1)
+        cell = row.get(col)
+        if op == 'eq' and str(cell) != value: return False
+        if op == 'gte' and (cell is None or str(cell) < value): return False
+    return True
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from src import data_nba
+
+def games(rows):
+    df = pd.DataFrame(rows, columns=['GAME_ID', 'TEAM_ID', 'GAME_DATE', 'PTS'])
+    df['GAME_DATE'] = pd.to_datetime(df['GAME_DATE'])
+    return df
+
+EXISTING = games([('0022400001', 1, '2025-01-02', 100), ('0022400001', 2, '2025-01-02', 98),
+                  ('0022400002', 3, '2025-01-03', 110)])
+
+def test_merge_is_idempotent():
+    once = data_nba.merge_games(EXISTING, EXISTING)
+    twice = data_nba.merge_games(once, EXISTING)
+    assert len(once) == len(EXISTING)
+    pd.testing.assert_frame_equal(once.reset_index(drop=True), twice.reset_index(drop=True))
+
+def test_latest_api_version_wins():
+    corrected = games([('0022400001', 1, '2025-01-02', 102)])
+    merged = data_nba.merge_games(EXISTING, corrected)
+    assert len(merged) == len(EXISTING)
+    row = merged[(merged['GAME_ID'] == '0022400001') & (merged['TEAM_ID'] == 1)]
+    assert row['PTS'].tolist() == [102]
+
+def test_game_id_stays_text():
+    # Un GAME_ID lu comme nombre ne doit pas laisser une colonne mixte (la clé ne matcherait plus)
+    numeric = games([(22400003, 5, '2025-01-04', 105)]).astype({'GAME_ID': 'int64'})
+    merged = data_nba.merge_games(EXISTING, numeric)
+    assert merged['GAME_ID'].map(type).eq(str).all()
+    assert '22400003' in merged['GAME_ID'].tolist()
+
+def test_sorted_by_date():
+    older = games([('0022300999', 4, '2024-12-30', 90)])
+    merged = data_nba.merge_games(EXISTING, older)
+    assert merged['GAME_DATE'].is_monotonic_increasing
+    assert merged['GAME_ID'].iloc[0] == '0022300999'
@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src import features_nba
+
+GAMES_FILE = "data/nba_games.csv"
+
+@pytest.fixture
+def games():
+    if not os.path.exists(GAMES_FILE): pytest.skip("data/nba_games.csv absent")
+    df = pd.read_csv(GAMES_FILE, dtype={'GAME_ID': str})
+    return df[df['GAME_DATE'] >= '2025-01-01'].reset_index(drop=True)
+
+def run(tmp_path, name, df, **kwargs):
+    """Écrit df comme nba_games.csv puis construit les features dans tmp_path/name"""
+    folder = tmp_path / name
+    folder.mkdir(exist_ok=True)
+    df.to_csv(folder / "games.csv", index=False)
+    added = features_nba.build_features(str(folder / "games.csv"), str(folder / "ready.csv"), str(folder / "state.json"), **kwargs)
+    return added, (folder / "ready.csv").read_text(), (folder / "team_state.csv").read_text()
+
+def assert_same_as_full(tmp_path, df, **kwargs):
+    _, ready_inc, team_inc = run(tmp_path, "inc", df, **kwargs)
+    _, ready_full, team_full = run(tmp_path, "full", df, full=True, **kwargs)
+    assert ready_inc == ready_full
+    assert team_inc == team_full
+
+@pytest.mark.parametrize("windows, spans", [([5], []), ([5, 10], [10])])
+def test_incremental_matches_full(tmp_path, games, windows, spans):
+    dates = sorted(games['GAME_DATE'].unique())
+    run(tmp_path, "inc", games[games['GAME_DATE'] <= dates[len(dates) // 2]], windows=windows, spans=spans)
+    run(tmp_path, "inc", games[games['GAME_DATE'] <= dates[-10]], windows=windows, spans=spans)
+    assert_same_as_full(tmp_path, games, windows=windows, spans=spans)
+
+def test_no_new_games_writes_nothing(tmp_path, games):
+    run(tmp_path, "inc", games)
+    added, _, _ = run(tmp_path, "inc", games)
+    assert added == 0
+
+def test_corrected_box_score_is_recomputed(tmp_path, games):
+    run(tmp_path, "inc", games)
+    corrected = games.copy()
+    # Box score d'un match déjà traité rectifié : même nombre de matchs, contenu différent
+    row = corrected.index[len(corrected) // 2]
+    corrected.loc[row, 'FGM'] += 3
+    corrected.loc[row, 'PTS'] += 6
+    _, ready_before, _ = run(tmp_path, "before", games, full=True)
+    assert_same_as_full(tmp_path, corrected)
+    assert (tmp_path / "inc" / "ready.csv").read_text() != ready_before
+
+def test_backdated_game_is_recomputed(tmp_path, games):
+    dates = sorted(games['GAME_DATE'].unique())
+    missing = games[games['GAME_DATE'] == dates[len(dates) // 2]].index[:2]
+    run(tmp_path, "inc", games.drop(missing))
+    assert_same_as_full(tmp_path, games)
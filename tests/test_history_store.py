@@ -0,0 +1,46 @@
+import pandas as pd
+
+from src.history_store import HistoryStore
+
+DF = pd.DataFrame([
+    {'Date': '2025-01-02', 'Home': 'BOS', 'Away': 'NYK', 'Type': 'Auto', 'Result': 'GAGNE'},
+    {'Date': '2025-01-02', 'Home': 'BOS', 'Away': 'NYK', 'Type': 'Manual', 'Result': 'PERDU'},
+    {'Date': '2025-01-02', 'Home': 'LAL', 'Away': 'GSW', 'Type': 'Manual', 'Result': 'EN ATTENTE'},
+    {'Date': '2025-01-03', 'Home': 'MIA', 'Away': 'CHI', 'Type': 'Auto', 'Result': 'PERDU'},
+    {'Date': '2025-01-04', 'Home': 'DEN', 'Away': 'PHX', 'Type': 'Manual', 'Result': 'EN ATTENTE'},
+])
+
+def test_get_returns_first_bet():
+    store = HistoryStore(DF)
+    assert store.get('2025-01-02', 'BOS', 'NYK')['Type'] == 'Auto'
+    assert store.get('2025-01-02', 'NYK', 'BOS') is None
+
+def test_day_like_scan_schedule():
+    # Même usage que scan_schedule : paris manuels d'une date
+    store = HistoryStore(DF)
+    manual = pd.DataFrame([r for r in store.day('2025-01-02') if r.get('Type') == 'Manual'])
+    assert manual[['Home', 'Away']].values.tolist() == [['BOS', 'NYK'], ['LAL', 'GSW']]
+    assert store.day('2025-02-01') == []
+
+def test_result_dates_most_recent_first():
+    store = HistoryStore(DF)
+    assert store.result_dates() == ['2025-01-03', '2025-01-02']
+    assert store.result_dates(limit=1) == ['2025-01-03']
+
+def test_results_only_finished_bets():
+    store = HistoryStore(DF)
+    assert [r['Result'] for r in store.results('2025-01-02')] == ['GAGNE', 'PERDU']
+    assert store.results('2025-01-04') == []
+
+def test_empty_history():
+    for df in (None, pd.DataFrame()):
+        store = HistoryStore(df)
+        assert store.empty and len(store) == 0
+        assert store.get('2025-01-02', 'BOS', 'NYK') is None
+        assert store.day('2025-01-02') == [] and store.result_dates() == []
+
+def test_missing_key_columns():
+    store = HistoryStore(pd.DataFrame({'Date': ['2025-01-02'], 'Result': ['GAGNE']}))
+    assert not store.empty
+    assert store.get('2025-01-02', 'BOS', 'NYK') is None
+    assert store.result_dates() == []
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import nba_master
+from src import check_status, nba_client
+
+class Board:
+    def __init__(self, rows):
+        self.game_header = self
+        self.rows = rows
+
+    def get_data_frame(self):
+        return pd.DataFrame(self.rows, columns=['GAME_ID', 'GAME_STATUS_ID', 'GAME_STATUS_TEXT'])
+
+def test_postponed_game_settles_the_night(monkeypatch):
+    rows = [('0022400101', 3, 'Final'), ('0022400102', 1, 'PPD'), ('0022400103', 1, 'Cancelled'),
+            ('0022400104', 1, '7:30 pm ET')]
+    monkeypatch.setattr(check_status.nba_cache, 'fetch', lambda *a, **k: Board(rows))
+    status = check_status.night_status(date(2025, 1, 10))
+    assert (status['final'], status['called_off'], status['scheduled'], status['settled']) == (1, 2, 1, 3)
+    assert status['final_ids'] == ['0022400101']
+    assert list(status['tips']) == ['0022400104']
+
+def test_only_regular_season_games_are_awaited(tmp_path):
+    games = tmp_path / "nba_games.csv"
+    pd.DataFrame({'GAME_ID': ['0022400101']}).to_csv(games, index=False)
+    # Playoffs (004), play-in (005), présaison (001) : jamais dans nba_games.csv
+    assert nba_master.games_ingested(['0022400101', '0042400101', '0052400101', '0012400101'], str(games))
+    assert nba_master.games_ingested(['0042400101'], str(games))
+    assert not nba_master.games_ingested(['0022400101', '0022400102'], str(games))
+
+class Stop(Exception):
+    pass
+
+def test_unsettled_night_runs_routine_at_cutoff(monkeypatch, tmp_path):
+    nights = iter([date(2025, 1, 10), date(2025, 1, 10), date(2025, 1, 11)])
+    def current_night(now):
+        try: return next(nights)
+        except StopIteration: raise Stop
+    stuck = {'total': 2, 'scheduled': 1, 'live': 0, 'final': 1, 'called_off': 0, 'settled': 1,
+             'game_ids': ['0022400101', '0022400102'], 'final_ids': ['0022400101'], 'tips': {}}
+    runs = []
+    monkeypatch.setattr(nba_master, 'DAEMON_STATE_FILE', str(tmp_path / "daemon_state.json"))
+    monkeypatch.setattr(nba_master.time, 'sleep', lambda s: None)
+    monkeypatch.setattr(nba_master, 'run_night', lambda ids: runs.append(ids) or True)
+    monkeypatch.setattr(check_status, 'current_night', current_night)
+    monkeypatch.setattr(check_status, 'night_status', lambda night, max_age=None: dict(stuck))
+    monkeypatch.setattr(nba_client.STATS, 'reset_budget', lambda: None)
+    with pytest.raises(Stop):
+        nba_master.run_daemon()
+    assert runs == [['0022400101']]
+    assert nba_master.load_daemon_state()['last_night'] == '2025-01-10'
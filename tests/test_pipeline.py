@@ -0,0 +1,105 @@
+import threading
+
+from src import pipeline
+
+def recorder(calls, name, ok=True):
+    def action():
+        calls.append(name)
+        return ok
+    return action
+
+def make(tmp_path, steps):
+    return pipeline.Pipeline(steps, state_file=str(tmp_path / "state.json"))
+
+def test_skips_unchanged_inputs_and_reruns_on_change(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "out.csv"
+    src.write_text("a\n")
+    calls = []
+    def build():
+        calls.append('build')
+        out.write_text(src.read_text().upper())
+        return True
+    steps = [pipeline.Step('build', build, "Build", inputs=[str(src)], outputs=[str(out)])]
+
+    assert make(tmp_path, steps).run()['build']['status'] == 'ok'
+    assert make(tmp_path, steps).run()['build']['status'] == 'skipped'
+    assert make(tmp_path, steps).run(force=True)['build']['status'] == 'ok'
+    src.write_text("b\n")
+    assert make(tmp_path, steps).run()['build']['status'] == 'ok'
+    out.unlink()
+    assert make(tmp_path, steps).run()['build']['status'] == 'ok'
+    assert calls == ['build'] * 4
+
+def test_step_without_inputs_always_runs(tmp_path):
+    calls = []
+    steps = [pipeline.Step('fetch', recorder(calls, 'fetch'), "Fetch")]
+    make(tmp_path, steps).run()
+    make(tmp_path, steps).run()
+    assert calls == ['fetch', 'fetch']
+
+def test_critical_failure_blocks_dependants_only(tmp_path):
+    calls = []
+    steps = [
+        pipeline.Step('data', recorder(calls, 'data', ok=False), "Data", critical=True),
+        pipeline.Step('features', recorder(calls, 'features'), "Features", deps=['data']),
+        pipeline.Step('git', recorder(calls, 'git'), "Git", deps=['features']),
+        pipeline.Step('logos', recorder(calls, 'logos'), "Logos"),
+    ]
+    results = make(tmp_path, steps).run()
+    assert [results[n]['status'] for n in ('data', 'features', 'git', 'logos')] == ['failed', 'blocked', 'blocked', 'ok']
+    assert sorted(calls) == ['data', 'logos']
+
+def test_non_critical_failure_does_not_block(tmp_path):
+    calls = []
+    steps = [
+        pipeline.Step('sync', recorder(calls, 'sync', ok=False), "Sync"),
+        pipeline.Step('git', recorder(calls, 'git'), "Git", deps=['sync']),
+    ]
+    results = make(tmp_path, steps).run()
+    assert results['sync']['status'] == 'failed' and results['git']['status'] == 'ok'
+
+def test_exception_and_exit_are_failures(tmp_path):
+    def boom(): raise RuntimeError("boom")
+    def leave(): raise SystemExit(1)
+    results = make(tmp_path, [pipeline.Step('a', boom, "A"), pipeline.Step('b', leave, "B")]).run()
+    assert results['a']['status'] == 'failed' and results['b']['status'] == 'failed'
+
+def test_unknown_dependency_and_cycle_are_blocked(tmp_path):
+    calls = []
+    steps = [
+        pipeline.Step('orphan', recorder(calls, 'orphan'), "Orphan", deps=['missing']),
+        pipeline.Step('x', recorder(calls, 'x'), "X", deps=['y']),
+        pipeline.Step('y', recorder(calls, 'y'), "Y", deps=['x']),
+    ]
+    results = make(tmp_path, steps).run()
+    assert {r['status'] for r in results.values()} == {'blocked'}
+    assert calls == []
+
+def test_dependencies_run_first(tmp_path):
+    calls = []
+    steps = [
+        pipeline.Step('git', recorder(calls, 'git'), "Git", deps=['sync_a', 'sync_b']),
+        pipeline.Step('sync_a', recorder(calls, 'sync_a'), "A"),
+        pipeline.Step('sync_b', recorder(calls, 'sync_b'), "B"),
+    ]
+    make(tmp_path, steps).run()
+    assert calls[-1] == 'git'
+
+def test_parallel_output_is_prefixed_per_line(tmp_path, capsys):
+    barrier = threading.Barrier(2)
+    def talk(name):
+        def action():
+            barrier.wait()
+            for i in range(50): print(f"{name} ligne {i}")
+            return True
+        return action
+    make(tmp_path, [pipeline.Step('a', talk('a'), "A"), pipeline.Step('b', talk('b'), "B")]).run()
+    lines = [l for l in capsys.readouterr().out.splitlines() if 'ligne' in l]
+    assert len(lines) == 100
+    assert all(l.startswith(f"[{l.split()[1]}] ") for l in lines)
+
+def test_routine_git_waits_for_every_sync():
+    import daily_routine
+    steps = {s.name: s for s in daily_routine.STEPS}
+    syncs = {n for n in steps if n.startswith('sync_')}
+    assert syncs and syncs <= set(steps['git'].deps)
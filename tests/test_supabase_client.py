@@ -0,0 +1,70 @@
+import pytest
+import requests
+
+from src import supabase_client
+from tests.postgrest_stub import Stub
+
+@pytest.fixture
+def stub():
+    s = Stub()
+    yield s
+    s.close()
+
+@pytest.fixture
+def client(stub):
+    return supabase_client.SupabaseClient(stub.url, "test-key")
+
+def bet(i, **extra):
+    return {'game_date': f"2024-01-{i:02d}", 'home_team': f"H{i}", 'away_team': f"A{i}", 'user_prediction': None, **extra}
+
+def test_select_paginates_with_projection_on_one_connection(stub, client):
+    stub.tables['bets_history'] = [bet(i, type='Auto') for i in range(1, 8)]
+    rows = client.select('bets_history', columns='game_date,home_team', order='game_date.asc', page_size=3)
+    assert [r['home_team'] for r in rows] == [f"H{i}" for i in range(1, 8)]
+    assert set(rows[0]) == {'game_date', 'home_team'}
+    assert stub.count('GET') == 3           # 3 + 3 + 1
+    assert stub.connections == 1            # keep-alive : une seule connexion
+
+def test_get_retried_on_503(stub, client):
+    stub.tables['bets_history'] = [bet(1)]
+    stub.fail = [503]
+    assert len(client.select('bets_history')) == 1
+    assert stub.count('GET') == 2
+
+def test_insert_not_retried_after_5xx(stub, client):
+    stub.fail = [503]
+    with pytest.raises(requests.HTTPError):
+        client.insert('bets_history', bet(1))
+    assert stub.count('POST') == 1
+    assert stub.tables.get('bets_history', []) == []
+
+def test_upsert_on_conflict_retried_and_merged(stub, client):
+    stub.tables['bets_history'] = [bet(1), bet(2)]
+    stub.fail = [503]
+    sent = client.upsert('bets_history', [bet(1, user_prediction='H1'), bet(3)], on_conflict=['game_date', 'home_team', 'away_team'])
+    assert sent == 2
+    assert stub.count('POST') == 2          # 503 puis succès
+    rows = stub.tables['bets_history']
+    assert len(rows) == 3
+    assert rows[0]['user_prediction'] == 'H1'
+
+def test_upsert_batches(stub, client):
+    client.upsert('bets_history', [bet(i) for i in range(1, 6)], on_conflict=['game_date', 'home_team', 'away_team'], batch_size=2)
+    assert stub.count('POST') == 3
+    assert len(stub.tables['bets_history']) == 5
+
+def test_patch_filters_and_returning(stub, client):
+    stub.tables['bets_history'] = [bet(1), bet(2)]
+    rows = client.patch('bets_history', {'home_team': supabase_client.eq('H2')}, {'user_prediction': 'A2'}, returning=True)
+    assert rows == [bet(2, user_prediction='A2')]
+    assert stub.tables['bets_history'][0]['user_prediction'] is None
+
+def test_patch_without_filter_refused(client):
+    with pytest.raises(ValueError):
+        client.patch('bets_history', {}, {'user_prediction': 'X'})
+
+def test_get_client_needs_credentials(monkeypatch):
+    for var in ('SUPABASE_URL', 'SUPABASE_KEY', 'NEXT_PUBLIC_SUPABASE_URL', 'NEXT_PUBLIC_SUPABASE_ANON_KEY'):
+        monkeypatch.delenv(var, raising=False)
+    assert supabase_client.get_client() is None
+    assert supabase_client.get_client('http://x', 'k') is supabase_client.get_client('http://x', 'k')
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import tree_model
+
+xgb = pytest.importorskip("xgboost")
+
+MODEL_FILE = "models/nba_predictor.json"
+
+def sample(n_features, n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 1, (n, n_features)).astype(np.float32)
+    X[::7, 1] = np.nan   # branche par défaut (valeurs manquantes)
+    return X
+
+def test_parse_base_score_formats():
+    assert tree_model.parse_base_score('5E-1') == 0.5
+    assert tree_model.parse_base_score('[5.882986E-1]') == pytest.approx(0.5882986)
+    with pytest.raises(ValueError):
+        tree_model.parse_base_score('[1E-1,2E-1]')
+
+def test_matches_booster_on_trained_model(tmp_path):
+    rng = np.random.default_rng(1)
+    X = rng.normal(0, 1, (600, 5)).astype(np.float32)
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(0, 0.5, 600) > 0.3).astype(int)
+    X[::11, 1] = np.nan
+    model = xgb.XGBClassifier(n_estimators=30, max_depth=4, learning_rate=0.1, objective='binary:logistic')
+    model.fit(X, y)
+    path = str(tmp_path / "model.json")
+    model.save_model(path)
+
+    ens = tree_model.TreeEnsemble(tree_model.compile_trees(path))
+    test = sample(5)
+    np.testing.assert_allclose(ens.predict(test), model.predict_proba(test)[:, 1], atol=1e-6)
+
+def test_matches_booster_on_shipped_model():
+    """Le modèle du dépôt : même prior et mêmes probabilités que le xgboost épinglé"""
+    model = xgb.XGBClassifier()
+    model.load_model(MODEL_FILE)
+    ens = tree_model.TreeEnsemble(tree_model.compile_trees(MODEL_FILE))
+    X = sample(len(ens.feature_names)) * 0.2
+    expected = model.predict_proba(pd.DataFrame(X, columns=ens.feature_names))[:, 1]
+    np.testing.assert_allclose(ens.predict(X), expected, atol=1e-6)
+
+def test_exported_npz_matches_json(tmp_path):
+    out = tree_model.export_trees(MODEL_FILE, str(tmp_path / "model.npz"))
+    with np.load(out) as data:
+        from_npz = tree_model.TreeEnsemble({k: data[k] for k in data.files})
+    from_json = tree_model.TreeEnsemble(tree_model.compile_trees(MODEL_FILE))
+    assert from_npz.digest == from_json.digest
+    assert tree_model.TreeEnsemble.load(MODEL_FILE).digest == from_json.digest
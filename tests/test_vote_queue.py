@@ -0,0 +1,62 @@
+import pytest
+import requests
+
+from src import supabase_client, vote_queue
+from tests.postgrest_stub import Stub
+
+@pytest.fixture
+def stub():
+    s = Stub()
+    yield s
+    s.close()
+
+@pytest.fixture
+def queue(stub, tmp_path, monkeypatch):
+    # Thread d'envoi endormi : les tests appellent flush() eux-mêmes
+    monkeypatch.setattr(vote_queue, 'FLUSH_DELAY', 3600)
+    return vote_queue.VoteQueue(supabase_client.SupabaseClient(stub.url, "test-key"), path=str(tmp_path / "votes.db"))
+
+def bet(home, **extra):
+    return {'game_date': '2025-01-10', 'home_team': home, 'away_team': 'Boston Celtics',
+            'predicted_winner': home, 'type': 'Manual', 'user_prediction': None, 'user_reason': None, **extra}
+
+def test_vote_updates_existing_bet_only(stub, queue):
+    stub.tables['bets_history'] = [bet('Miami Heat')]
+    queue.enqueue('2025-01-10', 'Miami Heat', 'Boston Celtics', 'Miami Heat', 'Domicile')
+    assert queue.flush() == 0
+    assert stub.tables['bets_history'] == [bet('Miami Heat', user_prediction='Miami Heat', user_reason='Domicile')]
+    assert stub.count('POST') == 0
+    assert queue.pending() == []
+
+def test_vote_on_unconfirmed_bet_waits_then_drops(stub, queue, monkeypatch):
+    stub.tables['bets_history'] = []
+    queue.enqueue('2025-01-10', 'Miami Heat', 'Boston Celtics', 'Miami Heat', None)
+    assert queue.flush() == 1
+    assert stub.tables['bets_history'] == []          # aucune ligne fantôme
+    assert len(queue.pending()) == 1
+
+    # Le pari finit par arriver : le vote part au passage suivant
+    stub.tables['bets_history'] = [bet('Miami Heat')]
+    assert queue.flush() == 0
+    assert stub.tables['bets_history'][0]['user_prediction'] == 'Miami Heat'
+
+    # Pari jamais confirmé : abandon après ORPHAN_TTL
+    queue.enqueue('2025-01-10', 'Utah Jazz', 'Boston Celtics', 'Utah Jazz', None)
+    monkeypatch.setattr(vote_queue, 'ORPHAN_TTL', -1)
+    assert queue.flush() == 0
+    assert queue.pending() == [] and queue.dropped == 1
+
+def test_confirmed_votes_leave_journal_when_a_later_patch_fails(stub, queue):
+    stub.tables['bets_history'] = [bet('Miami Heat'), bet('Utah Jazz')]
+    queue.enqueue('2025-01-10', 'Miami Heat', 'Boston Celtics', 'Miami Heat', None)
+    queue.enqueue('2025-01-10', 'Utah Jazz', 'Boston Celtics', 'Utah Jazz', None)
+    original = queue.client.patch
+    calls = []
+    def patch(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 2: raise requests.ConnectionError("coupure")
+        return original(*args, **kwargs)
+    queue.client.patch = patch
+    with pytest.raises(requests.ConnectionError):
+        queue.flush()
+    assert [v['home_team'] for v in queue.pending()] == ['Utah Jazz']